@@ -1,27 +1,140 @@
-# Config/app_config.py
-from Config.database_config import DatabaseConfig
-# === App Info ===
-APP_NAME = "Long Chau Pharmacy"
-APP_VERSION = "1.0.0"
-
-# === Database ===
-DATABASE_FILE = 'Data/pharmacy.db'
-DATABASE_CONFIG = DatabaseConfig(DATABASE_FILE)
-
-# === Display Settings ===
-DISPLAY_WIDTH = 60
-DEFAULT_CURRENCY = "VND"
-
-# === Thresholds ===
-LOW_STOCK_THRESHOLD = 10
-
-# === Staff Roles ===
-ROLE_PHARMACIST = "Pharmacist"
-ROLE_MANAGER = "BranchManager"
-
-# === Date Format ===
-DATE_FORMAT = "%Y-%m-%d"
-DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
-
-# === System Messages ===
-WELCOME_MESSAGE = f"Welcome to {APP_NAME}!"
+# Config/app_config.py
+import os
+
+from Config.database_config import DatabaseConfig
+# === App Info ===
+APP_NAME = "Long Chau Pharmacy"
+APP_VERSION = "1.0.0"
+
+# === Database ===
+DATABASE_FILE = 'Data/pharmacy.db'
+
+# === Database Performance Profiles ===
+# Every connection DatabaseConfig opens gets one of these PRAGMA sets.
+# Pick one per deployment with the PHARMACY_DB_PROFILE environment variable.
+DB_PROFILES = {
+    # Counter terminals: many short checkout writes alongside catalog browsing
+    "oltp": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,        # KiB (negative) -> ~16 MB page cache
+        "mmap_size": 134217728,      # 128 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,        # ms
+    },
+    # Managers and reporting jobs: long scans and aggregates, few writes
+    "reporting": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,        # ~64 MB
+        "mmap_size": 536870912,      # 512 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 15000,
+    },
+    # One-off catalog/stock imports; trades crash durability for speed
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -131072,       # ~128 MB
+        "mmap_size": 268435456,      # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+    # Pre-WAL behaviour, for filesystems where WAL is unavailable
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+}
+DB_PROFILE = os.environ.get("PHARMACY_DB_PROFILE", "oltp")
+
+# === Connection Pool ===
+# Writes go through one serialized writer connection; reads use mode=ro readers
+DB_READ_POOL_SIZE = 8                 # Max read-only connections per database file
+DB_POOL_TIMEOUT = 5.0                 # Seconds to wait for a free connection
+DB_POOL_HEALTH_CHECK_INTERVAL = 30.0  # Ping connections idle longer than this
+
+# === Query Instrumentation ===
+QUERY_STATS_ENABLED = True
+QUERY_STATS_SAMPLE_RATE = 1.0         # Fraction of statements timed (0.0 - 1.0)
+SLOW_QUERY_THRESHOLD_MS = 100.0       # Log statements at least this slow
+SLOW_QUERY_LOG_FILE = 'Data/slow_queries.log'
+QUERY_STATS_FILE = 'Data/query_stats.json'
+
+# === Group Commit ===
+# When enabled, service writes go through one writer thread that commits
+# every job arriving within the window (up to the batch size) together;
+# see Config.write_queue. Worth it when many terminals write at once and
+# commits, not queries, are the bottleneck
+WRITE_QUEUE_ENABLED = os.environ.get("PHARMACY_WRITE_QUEUE", "0") == "1"
+WRITE_QUEUE_WINDOW_MS = 2.0           # How long a batch waits for more jobs
+WRITE_QUEUE_MAX_BATCH = 64            # Jobs per transaction at most
+
+DATABASE_CONFIG = DatabaseConfig(DATABASE_FILE)
+
+# === Caching ===
+# How often an in-memory catalog re-reads catalog_version to notice product
+# changes made by other processes (changes made in-process are seen at once)
+CATALOG_VERSION_CHECK_INTERVAL = 1.0  # seconds
+# Branch stock shown next to autocomplete suggestions is served from the
+# in-memory stock index, re-reading the ledger at most this often
+AUTOCOMPLETE_STOCK_MAX_AGE = 1.0  # seconds
+
+# === Inventory Ledger ===
+# A branch gets a new stock snapshot once this many movements have been
+# logged since its last one; stock-at-time queries replay at most about
+# this many ledger rows
+INVENTORY_SNAPSHOT_EVERY = 10000
+
+# === Cart Expiry ===
+# Carts untouched for CART_TTL_SECONDS are deleted by the background
+# sweeper (Services.cart_sweeper), CART_SWEEP_BATCH_SIZE lines per write
+# transaction so checkouts only ever wait for one short batch
+CART_TTL_SECONDS = 24 * 60 * 60
+CART_SWEEP_INTERVAL = 300.0           # Seconds between sweeps
+CART_SWEEP_BATCH_SIZE = 500
+
+# === Idempotency Keys ===
+# A checkout or payment retried with the same key within the TTL returns the
+# first attempt's result; older keys are purged in the background
+IDEMPOTENCY_KEY_TTL_SECONDS = 24 * 60 * 60
+IDEMPOTENCY_PURGE_INTERVAL = 600.0    # Seconds between purges
+IDEMPOTENCY_PURGE_BATCH_SIZE = 500
+
+# === Demand Forecasting ===
+# Models.demand_forecast turns recent daily sales into per-branch/product
+# reorder points (stored as forecast-sourced stock thresholds)
+FORECAST_HISTORY_DAYS = 56            # Window the demand rate and variability are measured over
+FORECAST_LEAD_TIME_DAYS = 7           # Days between placing a restock and it arriving
+FORECAST_REVIEW_PERIOD_DAYS = 7       # Days between restock orders (for the order-up-to level)
+FORECAST_SERVICE_LEVEL_Z = 1.65       # Safety stock in standard deviations (~95% cycle service)
+
+# === Display Settings ===
+DISPLAY_WIDTH = 60
+DEFAULT_CURRENCY = "VND"
+PRODUCT_PAGE_SIZE = 20                # Rows per page when browsing products
+ORDER_PAGE_SIZE = 20                  # Rows per page of a customer's order history
+
+# === Thresholds ===
+# Seeds the default row of stock_threshold (migration 7); per-branch and
+# per-product overrides are set with Inventory.set_stock_threshold
+LOW_STOCK_THRESHOLD = 10
+# Low-stock alerts published while the app runs are appended here
+LOW_STOCK_LOG_FILE = 'Data/low_stock_alerts.log'
+LOW_STOCK_PUBLISH_INTERVAL = 5.0      # Seconds between background alert publishes
+LOW_STOCK_PUBLISH_BATCH_SIZE = 500     # Alerts claimed per write transaction
+
+# === Staff Roles ===
+ROLE_PHARMACIST = "Pharmacist"
+ROLE_MANAGER = "BranchManager"
+
+# === Date Format ===
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# === System Messages ===
+WELCOME_MESSAGE = f"Welcome to {APP_NAME}!"
@@ -1,34 +1,385 @@
-# Config/database_config.py
-import os
-import sqlite3
-
-class DatabaseConfig:
-    """Database configuration and connection management"""
-    
-    def __init__(self, db_path='Data/pharmacy.db'):
-        self.db_path = db_path
-        self.ensure_db_exists()
-    
-    def ensure_db_exists(self):
-        """Ensure database file exists"""
-        if not os.path.exists(self.db_path):
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-            # Create empty database
-            self.create_connection().close()
-    
-    def create_connection(self):
-        """Create and return database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        return conn
-    
-    def get_db_path(self):
-        """Get database path"""
-        return self.db_path
-    
-    @staticmethod
-    def check_db_exists(db_path='Data/pharmacy.db'):
-        """Check if database exists"""
-        return os.path.exists(db_path)
-    
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+from Config.query_stats import InstrumentedConnection
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class PooledConnection:
+    """Connection borrowed from a ConnectionPool.
+
+    Behaves like a sqlite3.Connection; close() hands it back to the pool
+    instead of closing the underlying connection.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+        self._returned = False
+
+    def __getattr__(self, name):
+        if self._returned:
+            raise sqlite3.ProgrammingError("Cannot operate on a connection returned to the pool")
+        return getattr(self._conn, name)
+
+    def close(self):
+        """Return the connection to the pool"""
+        if not self._returned:
+            self._returned = True
+            self._pool.release(self._conn)
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of SQLite connections.
+
+    A thread that already holds a connection gets the same one back on
+    nested checkouts, so a service calling a model shares one connection
+    and one transaction. The connection goes back to the idle list when the
+    outermost borrower returns it. Waiting threads are served in arrival
+    order, so a thread that returns a connection and asks again at once
+    cannot starve the others.
+    """
+
+    def __init__(self, connect, max_size=5, timeout=5.0, health_check_interval=30.0):
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._cond = threading.Condition()
+        self._idle = []  # (connection, last_returned) pairs, most recent last
+        self._size = 0
+        self._queue = deque()  # tickets of threads waiting in _checkout, oldest first
+        self._next_ticket = 0
+        self._local = threading.local()
+        self._closed = False
+        self._counters = {
+            'created': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'discarded': 0,
+        }
+
+    def acquire(self):
+        """Check out a connection, reusing the calling thread's if it holds one"""
+        lease = getattr(self._local, 'lease', None)
+        if lease is not None:
+            lease[1] += 1
+            return PooledConnection(self, lease[0])
+
+        conn = self._checkout()
+        self._local.lease = [conn, 1]
+        return PooledConnection(self, conn)
+
+    def is_held(self):
+        """Whether the calling thread currently holds a connection from this pool"""
+        return getattr(self._local, 'lease', None) is not None
+
+    def release(self, conn):
+        """Return a connection previously handed out by acquire()"""
+        lease = getattr(self._local, 'lease', None)
+        if lease is None or lease[0] is not conn:
+            raise sqlite3.ProgrammingError("Connection must be returned by the thread that borrowed it")
+
+        lease[1] -= 1
+        if lease[1] > 0:
+            return
+
+        self._local.lease = None
+        self._checkin(conn)
+
+    def stats(self):
+        """Get pool size metrics and counters"""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': idle,
+                'in_use': self._size - idle,
+                **self._counters,
+            }
+
+    def close_all(self):
+        """Close every idle connection; borrowed ones close on return.
+
+        The pool hands out no more connections afterwards.
+        """
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for conn, _ in idle:
+            conn.close()
+
+    def _checkout(self):
+        deadline = time.monotonic() + self.timeout
+
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._queue.append(ticket)
+            try:
+                while True:
+                    if self._closed:
+                        raise sqlite3.ProgrammingError("Cannot check out from a closed connection pool")
+                    if self._queue[0] == ticket:
+                        if self._idle:
+                            conn, last_returned = self._idle.pop()
+                            if self._is_healthy(conn, last_returned):
+                                self._counters['checkouts'] += 1
+                                return conn
+                            self._discard(conn)
+                            continue
+
+                        if self._size < self.max_size:
+                            self._size += 1
+                            break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available within {self.timeout}s "
+                            f"(pool size {self.max_size})"
+                        )
+                    self._counters['waits'] += 1
+                    self._cond.wait(remaining)
+            finally:
+                self._queue.remove(ticket)
+                # Let the next thread in line look again
+                self._cond.notify_all()
+
+        # Open the new connection outside the lock; the slot is already reserved
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                conn.close()
+                raise sqlite3.ProgrammingError("Cannot check out from a closed connection pool")
+            self._counters['created'] += 1
+            self._counters['checkouts'] += 1
+        return conn
+
+    def _checkin(self, conn):
+        try:
+            # Never hand a half-finished transaction to the next borrower
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            with self._cond:
+                self._discard(conn)
+            return
+
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                conn.close()
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify_all()
+
+    def _is_healthy(self, conn, last_returned):
+        if time.monotonic() - last_returned < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        # Caller holds self._cond
+        self._size -= 1
+        self._counters['discarded'] += 1
+        self._cond.notify_all()
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+class DatabaseConfig:
+    """Database configuration and connection management"""
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    # PRAGMAs a performance profile sets, in the order they are applied
+    PROFILE_PRAGMAS = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout')
+
+    def __init__(self, db_path='Data/pharmacy.db', profile=None):
+        self.db_path = db_path
+        self.profile = profile
+        self.ensure_db_exists()
+
+    def ensure_db_exists(self):
+        """Ensure database file exists"""
+        if not os.path.exists(self.db_path):
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            # Create empty database
+            self.create_connection().close()
+
+    def create_connection(self):
+        """Create and return a new, unpooled database connection"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=InstrumentedConnection)
+        conn.execute("PRAGMA foreign_keys = ON")
+        self.apply_profile(conn)
+        return conn
+
+    def create_readonly_connection(self):
+        """Create a new, unpooled read-only (mode=ro) database connection"""
+        uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, factory=InstrumentedConnection)
+        # journal_mode is a property of the database file; only writers may change it
+        self.apply_profile(conn, skip=('journal_mode',))
+        return conn
+
+    def get_profile(self, name=None):
+        """Get the name and PRAGMA settings of the active (or the named) performance profile"""
+        from Config.app_config import DB_PROFILES, DB_PROFILE
+
+        name = name or self.profile or DB_PROFILE
+        if name not in DB_PROFILES:
+            raise ValueError(f"Unknown database profile '{name}'. Choose from: {', '.join(DB_PROFILES)}")
+        return name, DB_PROFILES[name]
+
+    def apply_profile(self, conn, skip=(), name=None):
+        """Apply the performance profile PRAGMAs to a connection"""
+        _, settings = self.get_profile(name)
+        for pragma in self.PROFILE_PRAGMAS:
+            if pragma in settings and pragma not in skip:
+                conn.execute(f"PRAGMA {pragma} = {settings[pragma]}")
+
+    @contextmanager
+    def profile_applied(self, conn, name):
+        """Switch a borrowed connection to another profile's PRAGMAs for a with-block.
+
+        journal_mode belongs to the database file and is left alone. The
+        connection gets this config's own profile back afterwards, so the
+        shared writer can run a bulk job without a second writer connection.
+        """
+        self.apply_profile(conn, skip=('journal_mode',), name=name)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self.apply_profile(conn, skip=('journal_mode',))
+
+    @property
+    def write_pool(self):
+        """The single serialized writer connection for this database file"""
+        return self._shared_pool('writer', self.create_connection, 1)
+
+    @property
+    def read_pool(self):
+        """Pool of read-only connections for this database file"""
+        from Config.app_config import DB_READ_POOL_SIZE
+        return self._shared_pool('reader', self.create_readonly_connection, DB_READ_POOL_SIZE)
+
+    def _shared_pool(self, role, connect, max_size):
+        key = (os.path.abspath(self.db_path), self.get_profile()[0], role)
+        with DatabaseConfig._pools_lock:
+            pool = DatabaseConfig._pools.get(key)
+            if pool is None:
+                from Config.app_config import DB_POOL_TIMEOUT, DB_POOL_HEALTH_CHECK_INTERVAL
+                pool = ConnectionPool(
+                    connect,
+                    max_size=max_size,
+                    timeout=DB_POOL_TIMEOUT,
+                    health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL,
+                )
+                DatabaseConfig._pools[key] = pool
+            return pool
+
+    def get_connection(self, readonly=False):
+        """Borrow a pooled connection; call close() to return it.
+
+        Read-only requests made while the calling thread holds the writer
+        reuse the writer, so they see that thread's uncommitted changes.
+        """
+        if readonly and not self.write_pool.is_held():
+            return self.read_pool.acquire()
+        return self.write_pool.acquire()
+
+    @contextmanager
+    def reader(self):
+        """Borrow a read-only connection for the duration of a with-block"""
+        conn = self.get_connection(readonly=True)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def writer(self):
+        """Borrow the writer connection for the duration of a with-block"""
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def transact(self, job):
+        """Run job(cursor) as a write transaction and return what it returns.
+
+        If job raises, its writes are rolled back and the exception is
+        re-raised. With WRITE_QUEUE_ENABLED the job goes through this
+        database's WriteQueue and may share its commit with other callers'
+        jobs. A thread that already holds the writer runs the job itself,
+        as a savepoint if a transaction is open.
+        """
+        from Config.app_config import WRITE_QUEUE_ENABLED
+        from Config.write_queue import WriteQueue, run_in_savepoint
+
+        if WRITE_QUEUE_ENABLED and not self.write_pool.is_held():
+            return WriteQueue.for_database(self).submit(job).result()
+
+        with self.writer() as conn:
+            cursor = conn.cursor()
+            if conn.in_transaction:
+                return run_in_savepoint(cursor, job)
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = job(cursor)
+                conn.commit()
+                return result
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def pool_stats(self):
+        """Get connection pool metrics for the writer and the readers"""
+        return {
+            'writer': self.write_pool.stats(),
+            'readers': self.read_pool.stats(),
+        }
+
+    def get_db_path(self):
+        """Get database path"""
+        return self.db_path
+
+    @staticmethod
+    def check_db_exists(db_path='Data/pharmacy.db'):
+        """Check if database exists"""
+        return os.path.exists(db_path)
+
@@ -0,0 +1,132 @@
+# Config/index_advisor.py
+"""Missing-index advisor.
+
+Collects the SQL statements written in the Models and Services packages,
+runs each through EXPLAIN QUERY PLAN against the database and reports full
+table scans and temporary B-tree sorts.
+
+    python -m Config.index_advisor
+    python -m Config.index_advisor --recorded   # also check Data/query_stats.json
+"""
+import argparse
+import ast
+import os
+import re
+import sqlite3
+
+from Config.database_config import DatabaseConfig
+
+SOURCE_PACKAGES = ('Models', 'Services')
+_SQL_START = re.compile(r'^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\s')
+_FORMAT_FIELD = re.compile(r'\{[^}]*\}')
+
+
+class QueryFinding:
+    """Plan problems found for one statement"""
+
+    def __init__(self, location, sql, plan, error=None):
+        self.location = location
+        self.sql = sql
+        self.plan = plan
+        self.error = error
+
+    @property
+    def full_scans(self):
+        # FTS5 MATCH lookups show up as "SCAN x VIRTUAL TABLE INDEX 0:M..." but use the index
+        return [line for line in self.plan
+                if line.startswith('SCAN ') and 'CONSTANT ROW' not in line and ':M' not in line]
+
+    @property
+    def temp_sorts(self):
+        return [line for line in self.plan if 'USE TEMP B-TREE' in line]
+
+    @property
+    def has_issues(self):
+        return bool(self.full_scans or self.temp_sorts or self.error)
+
+
+def collect_queries(root='.', packages=SOURCE_PACKAGES):
+    """Find SQL string literals in the given packages as (location, sql) pairs"""
+    queries = []
+    for package in packages:
+        package_dir = os.path.join(root, package)
+        for filename in sorted(os.listdir(package_dir)):
+            if not filename.endswith('.py'):
+                continue
+            path = os.path.join(package_dir, filename)
+            with open(path, encoding='utf-8') as f:
+                tree = ast.parse(f.read(), filename=path)
+            # Pieces of f-strings are not complete statements
+            fragments = {id(part) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr)
+                         for part in node.values}
+            for node in ast.walk(tree):
+                if id(node) in fragments:
+                    continue
+                if isinstance(node, ast.Constant) and isinstance(node.value, str) and _SQL_START.match(node.value):
+                    queries.append((f"{package}/{filename}:{node.lineno}", node.value))
+    return queries
+
+
+def explain(conn, sql):
+    """Run EXPLAIN QUERY PLAN with NULL for every parameter"""
+    # str.format() templates (e.g. "-{} days") get a harmless literal
+    sql = _FORMAT_FIELD.sub('0', sql)
+    cursor = sqlite3.Cursor(conn)
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}", (None,) * sql.count('?'))
+    return [row[3] for row in cursor.fetchall()]
+
+
+def analyze(queries, db_path='Data/pharmacy.db'):
+    """Explain each (location, sql) pair and return a QueryFinding per statement"""
+    conn = DatabaseConfig(db_path).create_readonly_connection()
+    findings = []
+    try:
+        for location, sql in queries:
+            try:
+                findings.append(QueryFinding(location, sql, explain(conn, sql)))
+            except sqlite3.Error as e:
+                findings.append(QueryFinding(location, sql, [], error=str(e)))
+    finally:
+        conn.close()
+    return findings
+
+
+def print_report(findings, show_all=False):
+    flagged = [f for f in findings if f.has_issues]
+    for finding in (findings if show_all else flagged):
+        print(f"\n{finding.location}")
+        print(f"  {' '.join(finding.sql.split())[:150]}")
+        if finding.error:
+            print(f"  ! could not explain: {finding.error}")
+        for line in finding.full_scans:
+            print(f"  ! full scan: {line}")
+        for line in finding.temp_sorts:
+            print(f"  ! temp sort: {line}")
+        if show_all:
+            for line in finding.plan:
+                print(f"    plan: {line}")
+
+    print(f"\n{len(findings)} statements checked, {len(flagged)} with full scans, temp sorts or errors.")
+
+
+def main():
+    from Config.app_config import DATABASE_FILE, QUERY_STATS_FILE
+    from Config.query_stats import load_snapshot
+
+    parser = argparse.ArgumentParser(description="Report full table scans and temp B-tree sorts")
+    parser.add_argument('--db', default=DATABASE_FILE)
+    parser.add_argument('--recorded', action='store_true',
+                        help="also check statements recorded in the query stats snapshot")
+    parser.add_argument('--all', action='store_true', help="print every plan, not only flagged ones")
+    args = parser.parse_args()
+
+    queries = collect_queries()
+    if args.recorded:
+        queries += [("recorded", s.sql) for s in load_snapshot(QUERY_STATS_FILE)
+                    if _SQL_START.match(s.sql) and '?, ...' not in s.sql]
+
+    print_report(analyze(queries, args.db), args.all)
+
+
+if __name__ == "__main__":
+    main()
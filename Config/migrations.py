@@ -0,0 +1,594 @@
+# Config/migrations.py
+"""Versioned schema migrations tracked in PRAGMA user_version.
+
+Each migration has a number and runs at most once per database. Pending
+migrations are applied in order, each in its own transaction together with
+the user_version bump, so a failure leaves the database at the previous
+version. A database that is already current costs one PRAGMA read.
+
+Schema changes go here as a new numbered Migration at the end of
+MIGRATIONS -- never edit one that has shipped.
+"""
+import time
+
+from Config.database_config import DatabaseConfig
+from Config.schema_setup import SchemaSetup
+
+
+class Migration:
+    """One numbered schema change.
+
+    apply(conn) runs inside a BEGIN IMMEDIATE transaction. Migrations marked
+    transactional=False manage their own commits (batched backfills, index
+    builds one at a time) and must be safe to re-run if interrupted.
+    """
+
+    def __init__(self, version, description, apply, transactional=True):
+        self.version = version
+        self.description = description
+        self.apply = apply
+        self.transactional = transactional
+
+
+# === Helpers for long-running migrations ===
+
+def build_indexes(conn, statements):
+    """Build each index in its own short transaction.
+
+    SQLite holds the write lock while an index is built, so committing per
+    index lets queued checkouts run between builds instead of waiting for
+    the whole set.
+    """
+    for sql in statements:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(sql)
+        conn.commit()
+
+
+def backfill(conn, table, set_clause, pending_where, params=(), batch_size=1000, pause=0.0):
+    """Apply an UPDATE to pending rows in batches, committing after each.
+
+    pending_where must stop matching a row once it has been updated, so the
+    loop terminates and an interrupted backfill resumes where it stopped.
+    Returns the number of rows updated.
+    """
+    total = 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute(f"""
+            UPDATE {table} SET {set_clause}
+            WHERE rowid IN (SELECT rowid FROM {table} WHERE {pending_where} LIMIT ?)
+        """, (*params, batch_size))
+        updated = cursor.rowcount
+        conn.commit()
+        total += updated
+        if updated < batch_size:
+            return total
+        if pause:
+            time.sleep(pause)
+
+
+def retrigger(conn, table, column, batch_size=1000, pause=0.0):
+    """Rewrite column to itself over every row in rowid batches, committing after each.
+
+    Runs the table's UPDATE OF column triggers over existing rows without
+    holding the write lock for the whole table. The triggers must be safe
+    to run twice on a row, since an interrupted pass starts over.
+    Returns the number of rows touched.
+    """
+    total, last_rowid = 0, 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        rowids = conn.execute(f"""
+            UPDATE {table} SET {column} = {column}
+            WHERE rowid IN (SELECT rowid FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?)
+            RETURNING rowid
+        """, (last_rowid, batch_size)).fetchall()
+        conn.commit()
+        total += len(rowids)
+        if len(rowids) < batch_size:
+            return total
+        last_rowid = max(rowid for rowid, in rowids)
+        if pause:
+            time.sleep(pause)
+
+
+def copy_in_batches(conn, name, table, key, insert_sql, batch_size=1000, pause=0.0):
+    """Run an INSERT ... SELECT over table in key ranges, committing after each.
+
+    insert_sql reads the rows with :lo < key <= :hi. Only rows present when
+    the copy starts are copied; the high-water mark is taken in the caller's
+    open transaction if there is one, so triggers created in that transaction
+    pick up every row after it. Progress is saved under name with each batch,
+    so an interrupted copy resumes after the last committed range instead of
+    copying rows twice. Returns the number of rows written.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    conn.execute("""CREATE TABLE IF NOT EXISTS migration_progress (
+        name TEXT PRIMARY KEY,
+        last_key INTEGER NOT NULL,
+        high_water INTEGER NOT NULL
+    )""")
+    conn.execute(f"""
+        INSERT OR IGNORE INTO migration_progress (name, last_key, high_water)
+        SELECT ?, COALESCE(MIN({key}) - 1, 0), COALESCE(MAX({key}), 0) FROM {table}
+    """, (name,))
+    last_key, high_water = conn.execute(
+        "SELECT last_key, high_water FROM migration_progress WHERE name = ?", (name,)).fetchone()
+    conn.commit()
+
+    total = 0
+    while last_key < high_water:
+        conn.execute("BEGIN IMMEDIATE")
+        upper = conn.execute(f"""
+            SELECT MAX({key}) FROM (
+                SELECT {key} FROM {table} WHERE {key} > ? AND {key} <= ? ORDER BY {key} LIMIT ?)
+        """, (last_key, high_water, batch_size)).fetchone()[0]
+        if upper is None:
+            upper = high_water
+        else:
+            total += conn.execute(insert_sql, {'lo': last_key, 'hi': upper}).rowcount
+        conn.execute("UPDATE migration_progress SET last_key = ? WHERE name = ?", (upper, name))
+        conn.commit()
+        last_key = upper
+        if pause and last_key < high_water:
+            time.sleep(pause)
+    return total
+
+
+# === Migrations ===
+
+def _baseline_schema(conn):
+    # Same DDL SchemaSetup has always run; IF NOT EXISTS makes it a no-op on
+    # databases created before versioning
+    db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    SchemaSetup(db_path).create_schema(conn.cursor())
+
+
+# SQLite's unicode61 tokenizer strips Vietnamese tone marks but does not
+# fold d-stroke, so the index (and Models.product.build_fts_query) map it to d
+_FTS_FOLD = "replace(replace({0}, 'đ', 'd'), 'Đ', 'D')"
+
+
+def _product_search_index(conn):
+    name, description = _FTS_FOLD.format("new.product_name"), _FTS_FOLD.format("new.product_description")
+    statements = [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(
+            product_name,
+            product_description,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS product_fts_after_insert AFTER INSERT ON product BEGIN
+            INSERT INTO product_fts (rowid, product_name, product_description)
+            VALUES (new.product_id, {name}, {description});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS product_fts_after_update
+        AFTER UPDATE OF product_name, product_description ON product BEGIN
+            UPDATE product_fts SET product_name = {name}, product_description = {description}
+            WHERE rowid = new.product_id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS product_fts_after_delete AFTER DELETE ON product BEGIN
+            DELETE FROM product_fts WHERE rowid = old.product_id;
+        END""",
+    ]
+    conn.execute("BEGIN IMMEDIATE")
+    for sql in statements:
+        conn.execute(sql)
+    # Products added from here on are indexed by the trigger; edits and
+    # deletes of rows not copied yet are no-ops the copy then catches up on
+    copy_in_batches(conn, "product_fts", "product", "product_id", f"""
+        INSERT INTO product_fts (rowid, product_name, product_description)
+        SELECT product_id, {_FTS_FOLD.format("product_name")}, {_FTS_FOLD.format("product_description")}
+        FROM product
+        WHERE product_id > :lo AND product_id <= :hi""")
+
+
+def _catalog_version(conn):
+    conn.execute("""CREATE TABLE IF NOT EXISTS catalog_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL DEFAULT 0
+    )""")
+    conn.execute("INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)")
+
+
+def _product_browse_indexes(conn):
+    # Keyset pagination seeks on (sort column, product_id); the category
+    # index serves filtered browsing in name order
+    for sql in (
+        "CREATE INDEX IF NOT EXISTS idx_product_name_id ON product(product_name, product_id)",
+        "CREATE INDEX IF NOT EXISTS idx_product_price_id ON product(unit_price, product_id)",
+        "CREATE INDEX IF NOT EXISTS idx_product_category_name ON product(product_category, product_name, product_id)",
+    ):
+        conn.execute(sql)
+
+
+def _product_natural_key(conn):
+    # Catalog imports upsert on (product_category, product_name); the unique
+    # index also takes over browsing by category from idx_product_category_name
+    duplicates = conn.execute("""
+        SELECT product_category, product_name FROM product
+        GROUP BY product_category, product_name HAVING COUNT(*) > 1
+        LIMIT 5
+    """).fetchall()
+    if duplicates:
+        raise RuntimeError("Products share a category and name; merge them before migrating: "
+                           + ", ".join(f"{c}/{n}" for c, n in duplicates))
+    conn.execute("DROP INDEX IF EXISTS idx_product_category_name")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_product_category_name ON product(product_category, product_name)")
+
+
+def _inventory_ledger(conn):
+    statements = [
+        """CREATE TABLE IF NOT EXISTS inventory_movement (
+            movement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            branch_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            movement_type TEXT NOT NULL
+                CHECK (movement_type IN ('restock', 'reservation', 'release', 'sale', 'adjustment')),
+            quantity_change INTEGER NOT NULL,
+            reason TEXT,
+            reference TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (branch_id) REFERENCES branch(branch_id),
+            FOREIGN KEY (product_id) REFERENCES product(product_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_movement_branch_time ON inventory_movement(branch_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_movement_branch_product_time ON inventory_movement(branch_id, product_id, created_at)",
+        # Per-branch stock levels as of last_movement_id; stock-at-time queries
+        # start from the latest one and replay the ledger after it
+        """CREATE TABLE IF NOT EXISTS inventory_snapshot (
+            snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            branch_id INTEGER NOT NULL,
+            last_movement_id INTEGER NOT NULL,
+            taken_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (branch_id) REFERENCES branch(branch_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_snapshot_branch_time ON inventory_snapshot(branch_id, taken_at)",
+        """CREATE TABLE IF NOT EXISTS inventory_snapshot_item (
+            snapshot_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            PRIMARY KEY (snapshot_id, product_id),
+            FOREIGN KEY (snapshot_id) REFERENCES inventory_snapshot(snapshot_id)
+        ) WITHOUT ROWID""",
+    ]
+    conn.execute("BEGIN IMMEDIATE")
+    for sql in statements:
+        conn.execute(sql)
+    # Existing stock enters the ledger as an opening balance (the same
+    # 'adjustment' rows Data.sample_data writes)
+    copy_in_batches(conn, "inventory_movement", "inventory", "inventory_id", """
+        INSERT INTO inventory_movement (branch_id, product_id, movement_type, quantity_change, reason)
+        SELECT branch_id, product_id, 'adjustment', quantity_in_stock, 'Opening balance'
+        FROM inventory
+        WHERE inventory_id > :lo AND inventory_id <= :hi AND quantity_in_stock <> 0""")
+
+
+# Most specific threshold wins: branch+product, product, branch, then the
+# default row; 0 in stock_threshold means "any branch/product"
+_EFFECTIVE_THRESHOLD = """COALESCE(
+    (SELECT threshold FROM stock_threshold WHERE branch_id = new.branch_id AND product_id = new.product_id),
+    (SELECT threshold FROM stock_threshold WHERE branch_id = 0 AND product_id = new.product_id),
+    (SELECT threshold FROM stock_threshold WHERE branch_id = new.branch_id AND product_id = 0),
+    (SELECT threshold FROM stock_threshold WHERE branch_id = 0 AND product_id = 0))"""
+
+
+def _low_stock_alerts(conn):
+    from Config.app_config import LOW_STOCK_THRESHOLD
+
+    raise_alert = f"""INSERT INTO low_stock_alert (branch_id, product_id, quantity_in_stock, threshold)
+            SELECT new.branch_id, new.product_id, new.quantity_in_stock, t.threshold
+            FROM (SELECT {_EFFECTIVE_THRESHOLD} AS threshold) t
+            WHERE new.quantity_in_stock <= t.threshold
+            ON CONFLICT (branch_id, product_id) DO UPDATE SET
+                quantity_in_stock = excluded.quantity_in_stock,
+                threshold = excluded.threshold;"""
+    statements = [
+        """CREATE TABLE IF NOT EXISTS stock_threshold (
+            branch_id INTEGER NOT NULL DEFAULT 0,
+            product_id INTEGER NOT NULL DEFAULT 0,
+            threshold INTEGER NOT NULL CHECK (threshold >= 0),
+            PRIMARY KEY (branch_id, product_id)
+        ) WITHOUT ROWID""",
+        # One row per (branch, product) at or below its threshold. A row is
+        # inserted only when stock crosses down, so notified tracks one event
+        # per crossing
+        """CREATE TABLE IF NOT EXISTS low_stock_alert (
+            branch_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity_in_stock INTEGER NOT NULL,
+            threshold INTEGER NOT NULL,
+            raised_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            notified BOOLEAN NOT NULL DEFAULT 0,
+            PRIMARY KEY (branch_id, product_id)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_low_stock_pending ON low_stock_alert(notified) WHERE notified = 0",
+        f"""CREATE TRIGGER IF NOT EXISTS inventory_low_stock_after_insert AFTER INSERT ON inventory BEGIN
+            {raise_alert}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS inventory_low_stock_after_update
+        AFTER UPDATE OF quantity_in_stock ON inventory BEGIN
+            {raise_alert}
+            DELETE FROM low_stock_alert
+            WHERE branch_id = new.branch_id AND product_id = new.product_id
+              AND new.quantity_in_stock > {_EFFECTIVE_THRESHOLD};
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS inventory_low_stock_after_delete AFTER DELETE ON inventory BEGIN
+            DELETE FROM low_stock_alert WHERE branch_id = old.branch_id AND product_id = old.product_id;
+        END""",
+    ]
+    conn.execute("BEGIN IMMEDIATE")
+    for sql in statements:
+        conn.execute(sql)
+    conn.execute("INSERT OR IGNORE INTO stock_threshold (branch_id, product_id, threshold) VALUES (0, 0, ?)",
+                 (LOW_STOCK_THRESHOLD,))
+    conn.commit()
+    # A no-op update runs the trigger over existing stock; raising an alert
+    # is an upsert, so a resumed pass is harmless
+    retrigger(conn, "inventory", "quantity_in_stock")
+
+
+def _branch_inventory_summary(conn):
+    price = "(SELECT unit_price FROM product WHERE product_id = {0}.product_id)"
+    add_row = f"""INSERT INTO branch_inventory_summary (branch_id, total_products, total_stock, inventory_value)
+            SELECT new.branch_id, 1, new.quantity_in_stock, new.quantity_in_stock * {price.format('new')}
+            WHERE 1
+            ON CONFLICT (branch_id) DO UPDATE SET
+                total_products = total_products + 1,
+                total_stock = total_stock + excluded.total_stock,
+                inventory_value = inventory_value + excluded.inventory_value;"""
+    remove_row = f"""UPDATE branch_inventory_summary SET
+                total_products = total_products - 1,
+                total_stock = total_stock - old.quantity_in_stock,
+                inventory_value = inventory_value - old.quantity_in_stock * {price.format('old')}
+            WHERE branch_id = old.branch_id;"""
+    statements = [
+        """CREATE TABLE IF NOT EXISTS branch_inventory_summary (
+            branch_id INTEGER PRIMARY KEY,
+            total_products INTEGER NOT NULL DEFAULT 0,
+            total_stock INTEGER NOT NULL DEFAULT 0,
+            inventory_value REAL NOT NULL DEFAULT 0,
+            FOREIGN KEY (branch_id) REFERENCES branch(branch_id)
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS inventory_summary_after_insert AFTER INSERT ON inventory BEGIN
+            {add_row}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS inventory_summary_after_delete AFTER DELETE ON inventory BEGIN
+            {remove_row}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS inventory_summary_after_quantity_update
+        AFTER UPDATE OF quantity_in_stock ON inventory
+        WHEN new.branch_id = old.branch_id AND new.product_id = old.product_id
+        BEGIN
+            UPDATE branch_inventory_summary SET
+                total_stock = total_stock + new.quantity_in_stock - old.quantity_in_stock,
+                inventory_value = inventory_value
+                    + (new.quantity_in_stock - old.quantity_in_stock) * {price.format('new')}
+            WHERE branch_id = new.branch_id;
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS inventory_summary_after_move
+        AFTER UPDATE OF branch_id, product_id ON inventory
+        WHEN new.branch_id <> old.branch_id OR new.product_id <> old.product_id
+        BEGIN
+            {remove_row}
+            {add_row}
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS product_summary_after_price_update
+        AFTER UPDATE OF unit_price ON product
+        WHEN new.unit_price <> old.unit_price
+        BEGIN
+            UPDATE branch_inventory_summary SET
+                inventory_value = inventory_value + (new.unit_price - old.unit_price) * (
+                    SELECT quantity_in_stock FROM inventory
+                    WHERE product_id = new.product_id AND branch_id = branch_inventory_summary.branch_id)
+            WHERE branch_id IN (SELECT branch_id FROM inventory WHERE product_id = new.product_id);
+        END""",
+    ]
+    conn.execute("BEGIN IMMEDIATE")
+    for sql in statements:
+        conn.execute(sql)
+    conn.commit()
+    # With the triggers in place, each branch's recompute stays exact once
+    # written; one transaction per branch keeps the write lock short
+    from Models.inventory import Inventory
+
+    db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    Inventory(db_path).rebuild_inventory_summary()
+
+
+def _demand_forecast(conn):
+    add_sales = """INSERT INTO daily_product_sales (sale_date, branch_id, product_id, units)
+            SELECT date(o.order_date), o.branch_id, new.product_id, {units}
+            FROM orders o
+            WHERE o.order_id = new.order_id AND o.order_status <> 'Cancelled'
+            ON CONFLICT (sale_date, branch_id, product_id) DO UPDATE SET units = units + excluded.units;"""
+    statements = [
+        # Units sold per day, branch and product (cancelled orders excluded),
+        # kept by triggers so forecasts read SKU-days instead of order lines
+        """CREATE TABLE IF NOT EXISTS daily_product_sales (
+            sale_date TEXT NOT NULL,
+            branch_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            units INTEGER NOT NULL,
+            PRIMARY KEY (sale_date, branch_id, product_id)
+        ) WITHOUT ROWID""",
+        f"""CREATE TRIGGER IF NOT EXISTS order_item_sales_after_insert AFTER INSERT ON order_item BEGIN
+            {add_sales.format(units='new.quantity')}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS order_item_sales_after_quantity_update
+        AFTER UPDATE OF quantity ON order_item BEGIN
+            {add_sales.format(units='new.quantity - old.quantity')}
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS order_item_sales_after_delete AFTER DELETE ON order_item BEGIN
+            UPDATE daily_product_sales SET units = units - old.quantity
+            WHERE (sale_date, branch_id, product_id) = (
+                SELECT date(order_date), branch_id, old.product_id FROM orders
+                WHERE order_id = old.order_id AND order_status <> 'Cancelled');
+        END""",
+        # Cancelling an order takes its units back out; un-cancelling restores them
+        """CREATE TRIGGER IF NOT EXISTS orders_sales_after_cancel
+        AFTER UPDATE OF order_status ON orders
+        WHEN (new.order_status = 'Cancelled') <> (old.order_status = 'Cancelled')
+        BEGIN
+            INSERT INTO daily_product_sales (sale_date, branch_id, product_id, units)
+            SELECT date(new.order_date), new.branch_id, oi.product_id,
+                   CASE WHEN new.order_status = 'Cancelled' THEN -SUM(oi.quantity) ELSE SUM(oi.quantity) END
+            FROM order_item oi
+            WHERE oi.order_id = new.order_id
+            GROUP BY oi.product_id
+            ON CONFLICT (sale_date, branch_id, product_id) DO UPDATE SET units = units + excluded.units;
+        END""",
+        # Latest per-SKU demand statistics from Models.demand_forecast
+        """CREATE TABLE IF NOT EXISTS demand_forecast (
+            branch_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            daily_demand REAL NOT NULL,
+            demand_std REAL NOT NULL,
+            reorder_point INTEGER NOT NULL,
+            order_up_to INTEGER NOT NULL,
+            computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (branch_id, product_id)
+        ) WITHOUT ROWID""",
+    ]
+    conn.execute("BEGIN IMMEDIATE")
+    for sql in statements:
+        conn.execute(sql)
+    # Reorder points are written as (branch, product) thresholds; SKUs
+    # under a manual threshold are skipped by a forecast run
+    if 'source' not in [column[1] for column in conn.execute("PRAGMA table_info(stock_threshold)")]:
+        conn.execute("""ALTER TABLE stock_threshold ADD COLUMN source TEXT NOT NULL DEFAULT 'manual'
+            CHECK (source IN ('manual', 'forecast'))""")
+    # Orders placed from here on are counted by the triggers; checkout writes
+    # an order and its lines together, so the copy sees every line of the
+    # orders below the mark
+    copy_in_batches(conn, "daily_product_sales", "orders", "order_id", """
+        INSERT INTO daily_product_sales (sale_date, branch_id, product_id, units)
+        SELECT date(o.order_date), o.branch_id, oi.product_id, SUM(oi.quantity)
+        FROM orders o
+        JOIN order_item oi ON oi.order_id = o.order_id
+        WHERE o.order_id > :lo AND o.order_id <= :hi AND o.order_status <> 'Cancelled'
+        GROUP BY 1, 2, 3
+        ON CONFLICT (sale_date, branch_id, product_id) DO UPDATE SET units = units + excluded.units""")
+
+
+def _cart_expiry_index(conn):
+    # The expiry sweeper takes the oldest lines first, a bounded batch at a time
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_cart_reserved_at ON cart(reserved_at)")
+
+
+def _idempotency_keys(conn):
+    statements = [
+        # Result of each checkout/payment made with a client-supplied key, so
+        # a retry gets the original answer instead of running again
+        """CREATE TABLE IF NOT EXISTS idempotency_key (
+            scope TEXT NOT NULL,
+            idempotency_key TEXT NOT NULL,
+            request_fingerprint TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (scope, idempotency_key)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_idempotency_key_created ON idempotency_key(created_at)",
+    ]
+    for sql in statements:
+        conn.execute(sql)
+
+
+def _order_history_indexes(conn):
+    statements = [
+        # Newest-first keyset pages of a customer's orders, with the status,
+        # branch and amount filters and columns read from the index alone
+        """CREATE INDEX IF NOT EXISTS idx_order_customer_history
+        ON orders(customer_id, order_date DESC, order_id DESC, order_status, branch_id, total_amount)""",
+        # Covered by the index above
+        "DROP INDEX IF EXISTS idx_order_customer",
+    ]
+    build_indexes(conn, statements)
+
+
+MIGRATIONS = [
+    Migration(1, "Baseline pharmacy schema", _baseline_schema),
+    Migration(2, "FTS5 product search index", _product_search_index, transactional=False),
+    Migration(3, "Catalog version counter for cache invalidation", _catalog_version),
+    Migration(4, "Product indexes for keyset-paginated browsing", _product_browse_indexes),
+    Migration(5, "Unique product category and name for catalog upserts", _product_natural_key),
+    Migration(6, "Inventory movement ledger and stock snapshots", _inventory_ledger, transactional=False),
+    Migration(7, "Trigger-maintained low-stock alerts with per-branch/product thresholds", _low_stock_alerts,
+              transactional=False),
+    Migration(8, "Trigger-maintained per-branch inventory valuation summary", _branch_inventory_summary,
+              transactional=False),
+    Migration(9, "Daily sales rollup, demand forecasts and forecast-sourced stock thresholds", _demand_forecast,
+              transactional=False),
+    Migration(10, "Cart reserved_at index for the expiry sweeper", _cart_expiry_index),
+    Migration(11, "Idempotency keys for checkout and payment retries", _idempotency_keys),
+    Migration(12, "Covering indexes for paginated customer order history", _order_history_indexes,
+              transactional=False),
+]
+
+
+class MigrationRunner:
+    """Applies pending migrations on top of SchemaSetup's baseline schema"""
+
+    def __init__(self, db_path='Data/pharmacy.db', migrations=None):
+        self.db_config = DatabaseConfig(db_path)
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+
+    @property
+    def latest_version(self):
+        return self.migrations[-1].version if self.migrations else 0
+
+    def current_version(self):
+        """Get the schema version recorded in the database"""
+        with self.db_config.reader() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def pending(self):
+        """Get migrations that have not been applied yet"""
+        current = self.current_version()
+        return [m for m in self.migrations if m.version > current]
+
+    def migrate(self, verbose=True):
+        """Apply every pending migration; return the versions applied"""
+        pending = self.pending()
+        if not pending:
+            return []
+
+        conn = self.db_config.create_connection()
+        applied = []
+        try:
+            for migration in pending:
+                if verbose:
+                    print(f"Applying migration {migration.version}: {migration.description}")
+                self._apply(conn, migration)
+                applied.append(migration.version)
+        finally:
+            conn.close()
+        return applied
+
+    def _apply(self, conn, migration):
+        if not migration.transactional:
+            migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= migration.version:
+                conn.rollback()
+                return
+            migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    runner = MigrationRunner()
+    applied = runner.migrate()
+    print(f"Schema at version {runner.current_version()}"
+          + (f" (applied {', '.join(map(str, applied))})" if applied else " (already current)"))
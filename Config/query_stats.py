@@ -0,0 +1,300 @@
+# Config/query_stats.py
+"""Per-statement latency statistics and slow-query logging.
+
+Every connection DatabaseConfig opens uses InstrumentedConnection, whose
+cursors time each execute() and feed the timings into a process-wide
+QueryStats. Statements slower than SLOW_QUERY_THRESHOLD_MS are logged
+together with their EXPLAIN QUERY PLAN.
+
+Print the worst statements recorded by the application:
+
+    python -m Config.query_stats --limit 10 --sort p99
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKET_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Statements that have no useful query plan
+_NO_PLAN_PREFIXES = ('BEGIN', 'COMMIT', 'END', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'PRAGMA', 'CREATE', 'DROP', 'ALTER', 'EXPLAIN')
+
+_WHITESPACE = re.compile(r'\s+')
+_PLACEHOLDER_LIST = re.compile(r'\?(?:\s*,\s*\?)+')
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and IN-list placeholders so equivalent statements share stats"""
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    return _PLACEHOLDER_LIST.sub('?, ...', sql)
+
+
+class StatementStats:
+    """Call count and latency histogram for one normalized statement"""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow_calls = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.plan = None
+
+    def add(self, elapsed_ms):
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        index = 0
+        while index < len(BUCKET_BOUNDS_MS) and elapsed_ms > BUCKET_BOUNDS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+
+    def percentile(self, pct):
+        """Approximate percentile: upper bound of the bucket holding it"""
+        if not self.calls:
+            return 0.0
+        target = self.calls * pct / 100.0
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            'sql': self.sql,
+            'calls': self.calls,
+            'total_ms': self.total_ms,
+            'max_ms': self.max_ms,
+            'slow_calls': self.slow_calls,
+            'buckets': self.buckets,
+            'plan': self.plan,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data['sql'])
+        stats.calls = data['calls']
+        stats.total_ms = data['total_ms']
+        stats.max_ms = data['max_ms']
+        stats.slow_calls = data.get('slow_calls', 0)
+        stats.buckets = list(data['buckets'])
+        stats.plan = data.get('plan')
+        return stats
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.slow_calls += other.slow_calls
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.plan = self.plan or other.plan
+
+
+class QueryStats:
+    """Process-wide registry of statement statistics"""
+
+    SORT_KEYS = {
+        'total': lambda s: s.total_ms,
+        'calls': lambda s: s.calls,
+        'p50': lambda s: s.percentile(50),
+        'p95': lambda s: s.percentile(95),
+        'p99': lambda s: s.percentile(99),
+        'max': lambda s: s.max_ms,
+    }
+
+    def __init__(self, enabled=True, sample_rate=1.0, slow_threshold_ms=100.0, logger=None):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.logger = logger or logging.getLogger('pharmacy.slow_query')
+        self._lock = threading.Lock()
+        self._statements = {}
+
+    def should_sample(self):
+        """Decide whether to time the next statement"""
+        if not self.enabled:
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, sql, elapsed_ms, conn=None, parameters=None):
+        """Record one timed execution; log and explain it if it was slow"""
+        key = normalize_sql(sql)
+        slow = elapsed_ms >= self.slow_threshold_ms
+
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = StatementStats(key)
+            stats.add(elapsed_ms)
+            if slow:
+                stats.slow_calls += 1
+            capture_plan = slow and stats.plan is None
+
+        if not slow:
+            return
+
+        if capture_plan and conn is not None:
+            stats.plan = explain_query_plan(conn, sql, parameters)
+        self.logger.warning("Slow query (%.1f ms): %s\n  Plan: %s", elapsed_ms, key,
+                            "; ".join(stats.plan or []) or "n/a")
+
+    def statements(self):
+        with self._lock:
+            return list(self._statements.values())
+
+    def top(self, limit=10, sort_by='total'):
+        """Get the worst statements ordered by the given metric"""
+        return sorted(self.statements(), key=self.SORT_KEYS[sort_by], reverse=True)[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+    def save(self, path):
+        """Merge the in-memory statistics into a JSON snapshot file"""
+        merged = {s.sql: s for s in load_snapshot(path)}
+        for stats in self.statements():
+            if stats.sql in merged:
+                merged[stats.sql].merge(stats)
+            else:
+                merged[stats.sql] = stats
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([s.to_dict() for s in merged.values()], f)
+
+
+def explain_query_plan(conn, sql, parameters=None):
+    """Get EXPLAIN QUERY PLAN detail lines for a statement, or None"""
+    if sql.lstrip().upper().startswith(_NO_PLAN_PREFIXES):
+        return None
+    if parameters is None:
+        parameters = (None,) * sql.count('?')
+    try:
+        # A plain cursor, so explaining is not itself timed
+        cursor = sqlite3.Cursor(conn)
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+    except sqlite3.Error:
+        return None
+
+
+def load_snapshot(path):
+    """Load statement statistics saved by QueryStats.save()"""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [StatementStats.from_dict(item) for item in json.load(f)]
+
+
+_query_stats = None
+_query_stats_lock = threading.Lock()
+
+
+def get_query_stats():
+    """Get the process-wide QueryStats, configured from app_config"""
+    global _query_stats
+    if _query_stats is None:
+        with _query_stats_lock:
+            if _query_stats is None:
+                from Config.app_config import (QUERY_STATS_ENABLED, QUERY_STATS_SAMPLE_RATE,
+                                               SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_LOG_FILE)
+                logger = logging.getLogger('pharmacy.slow_query')
+                if SLOW_QUERY_LOG_FILE and not logger.handlers:
+                    os.makedirs(os.path.dirname(SLOW_QUERY_LOG_FILE) or '.', exist_ok=True)
+                    handler = logging.FileHandler(SLOW_QUERY_LOG_FILE, encoding='utf-8', delay=True)
+                    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+                    logger.addHandler(handler)
+                    logger.propagate = False
+                _query_stats = QueryStats(QUERY_STATS_ENABLED, QUERY_STATS_SAMPLE_RATE,
+                                          SLOW_QUERY_THRESHOLD_MS, logger)
+    return _query_stats
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times execute() and executemany().
+
+    SQLite does most of the work for sorts and aggregates before the first
+    row comes back, so timing execute() captures the expensive part of a
+    query without wrapping every fetch.
+    """
+
+    def execute(self, sql, parameters=()):
+        stats = get_query_stats()
+        if not stats.should_sample():
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            stats.record(sql, (time.perf_counter() - start) * 1000, self.connection, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        stats = get_query_stats()
+        if not stats.should_sample():
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            stats.record(sql, (time.perf_counter() - start) * 1000, self.connection)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors (including execute() shortcuts) are instrumented"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def print_top_queries(statements, limit=10, sort_by='total'):
+    """Print the top offending statements as a table"""
+    ranked = sorted(statements, key=QueryStats.SORT_KEYS[sort_by], reverse=True)[:limit]
+    if not ranked:
+        print("No query statistics recorded.")
+        return
+
+    print(f"{'Calls':>8}{'Total ms':>12}{'p50':>9}{'p95':>9}{'p99':>9}{'Max':>10}{'Slow':>6}  Statement")
+    print("-" * 100)
+    for s in ranked:
+        print(f"{s.calls:>8}{s.total_ms:>12.1f}{s.percentile(50):>9.2f}{s.percentile(95):>9.2f}"
+              f"{s.percentile(99):>9.2f}{s.max_ms:>10.2f}{s.slow_calls:>6}  {s.sql[:120]}")
+        if s.plan:
+            for line in s.plan:
+                print(f"{'':>65}plan: {line}")
+
+
+def main():
+    from Config.app_config import QUERY_STATS_FILE
+
+    parser = argparse.ArgumentParser(description="Print the slowest recorded SQL statements")
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--sort', choices=sorted(QueryStats.SORT_KEYS), default='total')
+    parser.add_argument('--file', default=QUERY_STATS_FILE)
+    parser.add_argument('--reset', action='store_true', help="delete the snapshot after printing")
+    args = parser.parse_args()
+
+    print_top_queries(load_snapshot(args.file), args.limit, args.sort)
+    if args.reset and os.path.exists(args.file):
+        os.remove(args.file)
+
+
+if __name__ == "__main__":
+    main()
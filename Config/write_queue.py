@@ -0,0 +1,160 @@
+# Config/write_queue.py
+"""Group commit for small write transactions.
+
+With WRITE_QUEUE_ENABLED, DatabaseConfig.transact() hands each write job to
+a per-database WriteQueue instead of committing it on the caller's thread.
+One background thread takes the first job waiting and, if others are
+already queued behind it, gathers whatever arrives within
+WRITE_QUEUE_WINDOW_MS (up to WRITE_QUEUE_MAX_BATCH jobs). It runs the
+batch in one transaction, each inside its own savepoint, so a
+failing job is undone without touching the others. Every caller's future
+is resolved only after the shared COMMIT, with the job's return value or
+its exception. Under load many callers then share one commit (and one
+fsync) instead of queueing for the writer one commit at a time.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+def run_in_savepoint(cursor, job):
+    """Run job(cursor) inside the open transaction, undoing its writes if it raises"""
+    cursor.execute("SAVEPOINT write_job")
+    try:
+        result = job(cursor)
+    except BaseException:
+        cursor.execute("ROLLBACK TO write_job")
+        cursor.execute("RELEASE write_job")
+        raise
+    cursor.execute("RELEASE write_job")
+    return result
+
+
+class WriteQueue:
+    """Single writer thread committing queued jobs in batches"""
+
+    _queues = {}
+    _queues_lock = threading.Lock()
+
+    def __init__(self, db_config, window_ms=None, max_batch=None):
+        from Config import app_config
+        self.db_config = db_config
+        self.window = (app_config.WRITE_QUEUE_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_batch = max_batch or app_config.WRITE_QUEUE_MAX_BATCH
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._counters = {
+            'jobs': 0,
+            'failed_jobs': 0,
+            'batches': 0,
+            'max_batch': 0,
+        }
+
+    @classmethod
+    def for_database(cls, db_config) -> 'WriteQueue':
+        """Get the queue shared by every writer to this database file and profile"""
+        key = (os.path.abspath(db_config.get_db_path()), db_config.get_profile()[0])
+        with cls._queues_lock:
+            write_queue = cls._queues.get(key)
+            if write_queue is None:
+                write_queue = cls._queues[key] = cls(db_config)
+            return write_queue
+
+    def submit(self, job) -> Future:
+        """Queue job(cursor) for the next batch; the future gets its result after commit"""
+        future = Future()
+        self._jobs.put((job, future))
+        # After the put, so a writer thread that died meanwhile is replaced
+        self._ensure_started()
+        return future
+
+    def stats(self):
+        """Get job and batch counters"""
+        return dict(self._counters, pending=self._jobs.qsize())
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                batch = [self._jobs.get()]
+                # A lone job is committed at once; the window is only waited out
+                # when others are already queued, i.e. when writers are contending
+                wait = not self._jobs.empty()
+                deadline = time.monotonic() + self.window
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        batch.append(self._jobs.get(timeout=remaining) if wait and remaining > 0
+                                     else self._jobs.get_nowait())
+                    except queue.Empty:
+                        break
+                self._commit_batch(batch)
+        finally:
+            # Never leave callers waiting on a thread that is gone; the next
+            # submit starts a new one
+            with self._start_lock:
+                self._thread = None
+            error = RuntimeError("write queue thread stopped")
+            while True:
+                try:
+                    _, future = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                self._fail(future, error)
+
+    def _commit_batch(self, batch):
+        outcomes = []
+        try:
+            with self.db_config.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    for job, future in batch:
+                        if not future.set_running_or_notify_cancel():
+                            continue
+                        try:
+                            outcomes.append((future, run_in_savepoint(cursor, job), None))
+                        except BaseException as e:
+                            # Even KeyboardInterrupt/SystemExit only fail this job
+                            outcomes.append((future, None, e))
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+        except BaseException as e:
+            # BEGIN or COMMIT failed, or the thread is being torn down:
+            # nothing in the batch was written
+            for job, future in batch:
+                self._fail(future, e)
+            self._counters['failed_jobs'] += len(batch)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        self._counters['jobs'] += len(outcomes)
+        self._counters['batches'] += 1
+        self._counters['max_batch'] = max(self._counters['max_batch'], len(batch))
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                self._counters['failed_jobs'] += 1
+                future.set_exception(error)
+
+    @staticmethod
+    def _fail(future, error):
+        if future.done():
+            return
+        if not future.running() and not future.set_running_or_notify_cancel():
+            return
+        future.set_exception(error)
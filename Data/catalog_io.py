@@ -0,0 +1,254 @@
+# Data/catalog_io.py
+"""Streaming product catalog import/export.
+
+Files are CSV (with a header row) or JSON Lines, chosen by extension, with
+the columns in CATALOG_FIELDS. Imports read the file in fixed-size chunks and
+upsert each chunk with one executemany in one transaction, keyed on
+(product_category, product_name); rows that did not change are left alone
+and counted as unchanged. Chunks are written on the application's shared
+writer connection, switched to the bulk-load PRAGMAs while it is borrowed.
+Bad rows are rejected and reported without aborting the rest of the file.
+
+    python -m Data.catalog_io import supplier_catalog.csv
+    python -m Data.catalog_io export catalog.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import time
+
+from Config.database_config import DatabaseConfig
+from Models.catalog_cache import CatalogCache, bump_catalog_version
+
+CATALOG_FIELDS = ('product_name', 'product_description', 'product_category',
+                  'unit_price', 'requires_prescription')
+DEFAULT_CHUNK_SIZE = 5000
+# PRAGMA profile for import chunks (synchronous=OFF, large cache)
+IMPORT_PROFILE = 'bulk-load'
+
+_UPSERT_SQL = """
+    INSERT INTO product (product_name, product_description, product_category,
+                         unit_price, requires_prescription)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (product_category, product_name) DO UPDATE SET
+        product_description = excluded.product_description,
+        unit_price = excluded.unit_price,
+        requires_prescription = excluded.requires_prescription
+    WHERE product.product_description IS NOT excluded.product_description
+       OR product.unit_price IS NOT excluded.unit_price
+       OR product.requires_prescription IS NOT excluded.requires_prescription
+"""
+
+_TRUE = {'1', 'true', 'yes', 'y'}
+_FALSE = {'0', 'false', 'no', 'n', ''}
+
+
+def file_format(path):
+    """Get 'csv' or 'jsonl' from a catalog file name"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return 'csv'
+    if ext in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Unsupported catalog file type '{ext}' (use .csv or .jsonl)")
+
+
+def read_records(path):
+    """Yield (line_number, record) pairs; record is a dict, or an error message"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format(path) == 'csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+            return
+
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, f"invalid JSON: {e.msg}"
+                continue
+            yield line_number, record if isinstance(record, dict) else "expected a JSON object"
+
+
+def _parse_flag(value):
+    if isinstance(value, bool):
+        return int(value)
+    text = '' if value is None else str(value).strip().lower()
+    if text in _TRUE:
+        return 1
+    if text in _FALSE:
+        return 0
+    raise ValueError(f"requires_prescription is not a boolean: {value!r}")
+
+
+def parse_record(record):
+    """Validate one record and return its product row; raise ValueError if bad"""
+    name = str(record.get('product_name') or '').strip()
+    category = str(record.get('product_category') or '').strip()
+    if not name:
+        raise ValueError("product_name is required")
+    if not category:
+        raise ValueError("product_category is required")
+
+    try:
+        price = float(record.get('unit_price'))
+    except (TypeError, ValueError):
+        raise ValueError(f"unit_price is not a number: {record.get('unit_price')!r}")
+    if not price >= 0:
+        raise ValueError(f"unit_price must be zero or more: {price}")
+
+    description = str(record.get('product_description') or '').strip() or None
+    return (name, description, category, price, _parse_flag(record.get('requires_prescription')))
+
+
+class CatalogImporter:
+    """Upserts catalog files into the product table chunk by chunk"""
+
+    def __init__(self, db_path='Data/pharmacy.db', chunk_size=DEFAULT_CHUNK_SIZE, profile=IMPORT_PROFILE):
+        self.db_config = DatabaseConfig(db_path)
+        self.chunk_size = chunk_size
+        self.profile = profile
+
+    def import_file(self, path, progress=None):
+        """Import a catalog file.
+
+        Returns a summary dict with the rows inserted or changed
+        ('upserted'), the valid rows that matched the catalog already
+        ('unchanged'), the rejected rows as (line_number, reason) pairs,
+        elapsed seconds and rows per second.
+        progress, if given, is called with the running summary after each chunk.
+        """
+        summary = {'upserted': 0, 'unchanged': 0, 'rejected': [], 'seconds': 0.0, 'rows_per_sec': 0.0}
+        start = time.perf_counter()
+        chunk = []
+
+        def flush():
+            self._write_chunk(chunk, summary)
+            chunk.clear()
+            elapsed = time.perf_counter() - start
+            summary['seconds'] = elapsed
+            written = summary['upserted'] + summary['unchanged']
+            summary['rows_per_sec'] = written / elapsed if elapsed else 0.0
+            if progress:
+                progress(summary)
+
+        for line_number, record in read_records(path):
+            if isinstance(record, str):
+                summary['rejected'].append((line_number, record))
+                continue
+            try:
+                chunk.append((line_number, parse_record(record)))
+            except ValueError as e:
+                summary['rejected'].append((line_number, str(e)))
+                continue
+            if len(chunk) >= self.chunk_size:
+                flush()
+        flush()
+
+        CatalogCache.for_database(self.db_config).invalidate()
+        return summary
+
+    def _write_chunk(self, chunk, summary):
+        if not chunk:
+            return
+        with self.db_config.writer() as conn, self.db_config.profile_applied(conn, self.profile):
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.executemany(_UPSERT_SQL, [row for _, row in chunk])
+                # The upsert's WHERE skips unchanged rows, so they are not in rowcount
+                changed = cursor.rowcount
+                bump_catalog_version(cursor)
+                conn.commit()
+                summary['upserted'] += changed
+                summary['unchanged'] += len(chunk) - changed
+                return
+            except sqlite3.IntegrityError:
+                conn.rollback()
+
+            # Something in the chunk violates a constraint: redo it row by
+            # row so only the offending rows are rejected
+            cursor.execute("BEGIN IMMEDIATE")
+            for line_number, row in chunk:
+                cursor.execute("SAVEPOINT catalog_row")
+                try:
+                    cursor.execute(_UPSERT_SQL, row)
+                    summary['upserted' if cursor.rowcount else 'unchanged'] += 1
+                except sqlite3.IntegrityError as e:
+                    cursor.execute("ROLLBACK TO catalog_row")
+                    summary['rejected'].append((line_number, str(e)))
+                cursor.execute("RELEASE catalog_row")
+            bump_catalog_version(cursor)
+            conn.commit()
+
+
+def export_catalog(path, db_path='Data/pharmacy.db', batch_size=DEFAULT_CHUNK_SIZE):
+    """Stream the product table to a CSV or JSONL file; return the row count"""
+    fmt = file_format(path)
+    count = 0
+    with DatabaseConfig(db_path).reader() as conn, open(path, 'w', newline='', encoding='utf-8') as f:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT product_name, product_description, product_category,
+                   unit_price, requires_prescription
+            FROM product
+            ORDER BY product_category, product_name
+        """)
+        writer = csv.writer(f) if fmt == 'csv' else None
+        if writer:
+            writer.writerow(CATALOG_FIELDS)
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if writer:
+                writer.writerows(rows)
+            else:
+                f.writelines(json.dumps(dict(zip(CATALOG_FIELDS, row)), ensure_ascii=False) + '\n'
+                             for row in rows)
+            count += len(rows)
+    return count
+
+
+def main():
+    from Config.app_config import DATABASE_FILE
+
+    parser = argparse.ArgumentParser(description="Bulk import/export the product catalog (CSV or JSONL)")
+    parser.add_argument('action', choices=('import', 'export'))
+    parser.add_argument('path')
+    parser.add_argument('--db', default=DATABASE_FILE)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--rejects', help="write rejected rows (line, reason) to this CSV file")
+    args = parser.parse_args()
+
+    if args.action == 'export':
+        start = time.perf_counter()
+        count = export_catalog(args.path, args.db, args.chunk_size)
+        elapsed = time.perf_counter() - start
+        print(f"Exported {count} products to {args.path} in {elapsed:.2f}s "
+              f"({count / elapsed if elapsed else 0:.0f} rows/s)")
+        return
+
+    def progress(summary):
+        print(f"  {summary['upserted'] + summary['unchanged']} rows, {summary['rows_per_sec']:.0f} rows/s",
+              end='\r')
+
+    summary = CatalogImporter(args.db, args.chunk_size).import_file(args.path, progress)
+    print(f"\nImported {summary['upserted']} products ({summary['unchanged']} unchanged) "
+          f"in {summary['seconds']:.2f}s ({summary['rows_per_sec']:.0f} rows/s), "
+          f"rejected {len(summary['rejected'])}")
+    for line_number, reason in summary['rejected'][:10]:
+        print(f"  line {line_number}: {reason}")
+    if args.rejects:
+        with open(args.rejects, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows([('line', 'reason'), *summary['rejected']])
+
+
+if __name__ == "__main__":
+    main()
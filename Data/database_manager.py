@@ -1,16 +1,62 @@
-from Config.schema_setup import SchemaSetup
-from Data.sample_data import insert_sample_data
-
-def reset_database(with_data=True):
-    print("⚙️ Resetting database...")
-    
-    schema = SchemaSetup()
-    schema.create_all_tables()
-
-    print("✅ Tables created.")
-
-    if with_data:
-        insert_sample_data()
-
-if __name__ == "__main__":
-    reset_database()
+import argparse
+
+from Config.migrations import MigrationRunner
+from Data.sample_data import insert_sample_data
+from Models.inventory import Inventory
+
+def migrate_database():
+    """Apply pending schema migrations only; existing data is kept"""
+    runner = MigrationRunner()
+    applied = runner.migrate()
+    if applied:
+        print(f"✅ Schema migrated to version {runner.current_version()}.")
+    else:
+        print(f"✅ Schema already at version {runner.current_version()}.")
+
+def check_inventory_summary(rebuild=False):
+    """Verify branch_inventory_summary against a full recomputation, optionally rebuilding it"""
+    inventory = Inventory()
+    mismatches = inventory.verify_inventory_summary()
+    for m in mismatches:
+        print(f"❌ Branch {m['branch_id']}: stored {m['stored']}, expected {m['expected']}")
+    if not mismatches:
+        print("✅ Inventory summary matches inventory.")
+    elif rebuild:
+        inventory.rebuild_inventory_summary()
+        print("✅ Inventory summary rebuilt.")
+    return not mismatches
+
+def refresh_forecasts():
+    """Recompute demand forecasts and the reorder-point thresholds they drive"""
+    from Services.inventory_service import InventoryService
+
+    count = InventoryService().refresh_reorder_points()
+    print(f"✅ Reorder points updated for {count} branch products.")
+
+def reset_database(with_data=True):
+    print("⚙️ Resetting database...")
+    
+    migrate_database()
+
+    if with_data:
+        insert_sample_data()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Set up the pharmacy database")
+    parser.add_argument('--migrate', action='store_true', help="apply pending migrations without reloading sample data")
+    parser.add_argument('--verify-summary', action='store_true',
+                        help="check branch_inventory_summary against the inventory table")
+    parser.add_argument('--rebuild-summary', action='store_true',
+                        help="like --verify-summary, then rebuild the summary if it is off")
+    parser.add_argument('--forecast', action='store_true',
+                        help="recompute demand forecasts and reorder-point thresholds (needs numpy)")
+    args = parser.parse_args()
+
+    if args.forecast:
+        refresh_forecasts()
+    elif args.verify_summary or args.rebuild_summary:
+        check_inventory_summary(rebuild=args.rebuild_summary)
+    elif args.migrate:
+        migrate_database()
+    else:
+        reset_database()
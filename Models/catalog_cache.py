@@ -0,0 +1,223 @@
+# Models/catalog_cache.py
+import os
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from Config.database_config import DatabaseConfig
+
+
+def normalize_search_text(text: str) -> str:
+    """Fold case and Vietnamese d-stroke the same way the product_fts index does"""
+    return text.replace('đ', 'd').replace('Đ', 'D').casefold()
+
+
+def fold_prefix_text(text: str) -> str:
+    """normalize_search_text plus tone-mark removal, for prefix matching"""
+    decomposed = unicodedata.normalize('NFD', normalize_search_text(text))
+    return ' '.join(''.join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+
+class CatalogSnapshot:
+    """In-memory copy of the product table at one catalog version.
+
+    Built from a full read and never changed once published: in-process
+    product writes build a patched copy (see patched and CatalogCache.apply)
+    and swap it in, so a reader holding a snapshot always sees it whole.
+    """
+
+    def __init__(self, version: int, rows: List[Tuple]):
+        self.version = version
+        # (product_id, product_name, product_description, unit_price,
+        #  requires_prescription, product_category), ordered by name then id
+        self.products: Dict[int, Tuple] = {}
+        self.by_category: Dict[str, List[int]] = {}
+        self.prescription_ids: List[int] = []
+        self.categories: List[str] = []
+        # Sorted (folded name from each word start, product_name, product_id)
+        # entries for prefix completion with bisect
+        self.prefix_keys: List[Tuple[str, str, int]] = []
+
+        for row in rows:
+            self.products[row[0]] = row
+            if row[5] is not None:
+                self.by_category.setdefault(row[5], []).append(row[0])
+            if row[4]:
+                self.prescription_ids.append(row[0])
+            self.prefix_keys.extend(self._prefix_entries(row))
+
+        self.categories = sorted(self.by_category)
+        self.prefix_keys.sort()
+
+    @staticmethod
+    def _prefix_entries(row):
+        words = fold_prefix_text(row[1]).split(' ')
+        return [(' '.join(words[i:]), row[1], row[0]) for i in range(len(words))]
+
+    @staticmethod
+    def _name_order(products):
+        return lambda product_id: (products[product_id][1], product_id)
+
+    def patched(self, version: int, product_id: int, row: Optional[Tuple]) -> 'CatalogSnapshot':
+        """Get a copy at version with one product replaced by row (deleted if None).
+
+        The copy shares every index the change leaves alone with this
+        snapshot: a price or description edit copies only the products dict,
+        and a rename copies just the lists its name sorts into. No rows are
+        re-read or re-sorted.
+        """
+        old = self.products.get(product_id)
+        copy = object.__new__(CatalogSnapshot)
+        copy.__dict__.update(self.__dict__)
+        copy.version = version
+        copy.products = dict(self.products)
+        if row is None:
+            copy.products.pop(product_id, None)
+        else:
+            copy.products[product_id] = row
+        # Removals bisect by the old name, insertions by the new one
+        old_order, new_order = self._name_order(self.products), self._name_order(copy.products)
+        renamed = old is None or row is None or old[1] != row[1]
+
+        old_category = old[5] if old is not None else None
+        new_category = row[5] if row is not None else None
+        if renamed or old_category != new_category:
+            copy.by_category = dict(self.by_category)
+            if old_category is not None:
+                ids = copy.by_category[old_category] = list(self.by_category[old_category])
+                ids.pop(bisect_left(ids, old_order(product_id), key=old_order))
+                if not ids:
+                    del copy.by_category[old_category]
+            if new_category is not None:
+                ids = copy.by_category[new_category] = list(copy.by_category.get(new_category, []))
+                insort(ids, product_id, key=new_order)
+            if set(copy.by_category) != set(self.by_category):
+                copy.categories = sorted(copy.by_category)
+
+        old_prescription = old is not None and bool(old[4])
+        new_prescription = row is not None and bool(row[4])
+        if (old_prescription or new_prescription) and (renamed or old_prescription != new_prescription):
+            copy.prescription_ids = list(self.prescription_ids)
+            if old_prescription:
+                copy.prescription_ids.pop(bisect_left(copy.prescription_ids, old_order(product_id),
+                                                      key=old_order))
+            if new_prescription:
+                insort(copy.prescription_ids, product_id, key=new_order)
+
+        if renamed:
+            copy.prefix_keys = list(self.prefix_keys)
+            if old is not None:
+                for entry in self._prefix_entries(old):
+                    copy.prefix_keys.pop(bisect_left(copy.prefix_keys, entry))
+            if row is not None:
+                for entry in self._prefix_entries(row):
+                    insort(copy.prefix_keys, entry)
+        return copy
+
+    def complete(self, prefix: str, limit: int = 10) -> List[int]:
+        """Get up to limit product ids whose name, or a word in it, starts with prefix"""
+        prefix = fold_prefix_text(prefix)
+        if not prefix:
+            return []
+        matches = []
+        for i in range(bisect_left(self.prefix_keys, (prefix,)), len(self.prefix_keys)):
+            key, _, product_id = self.prefix_keys[i]
+            if not key.startswith(prefix):
+                break
+            if product_id not in matches:
+                matches.append(product_id)
+                if len(matches) == limit:
+                    break
+        return matches
+
+
+class CatalogCache:
+    """Read-through product catalog cache shared per database file.
+
+    Product write methods bump catalog_version in the same transaction as the
+    change; the cache reloads whenever the stored version differs from the
+    one it loaded, so other processes' writes are picked up too.
+    """
+
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, db_config: DatabaseConfig, check_interval: Optional[float] = None):
+        if check_interval is None:
+            from Config.app_config import CATALOG_VERSION_CHECK_INTERVAL
+            check_interval = CATALOG_VERSION_CHECK_INTERVAL
+        self.db_config = db_config
+        self.check_interval = check_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_database(cls, db_config: DatabaseConfig) -> 'CatalogCache':
+        """Get the cache shared by every model using this database file"""
+        key = os.path.abspath(db_config.get_db_path())
+        with cls._caches_lock:
+            cache = cls._caches.get(key)
+            if cache is None:
+                cache = cls._caches[key] = cls(db_config)
+            return cache
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Get the current catalog, reloading it if the version moved"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            # Always a real reader, even on a thread holding the writer: reader()
+            # would hand back the writer, and the cache would keep product rows
+            # from a transaction that may still roll back
+            conn = self.db_config.read_pool.acquire()
+            try:
+                # One read transaction, so the rows match the version
+                conn.execute("BEGIN")
+                version = conn.execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()[0]
+                if self._snapshot is None or self._snapshot.version != version:
+                    rows = conn.execute("""
+                        SELECT product_id, product_name, product_description,
+                               unit_price, requires_prescription, product_category
+                        FROM product
+                        ORDER BY product_name, product_id
+                    """).fetchall()
+                    self._snapshot = CatalogSnapshot(version, rows)
+                conn.rollback()
+            finally:
+                conn.close()
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def apply(self, version: int, product_id: int, row: Optional[Tuple]):
+        """Patch the snapshot with one committed product change.
+
+        version is what bump_catalog_version returned for the change; row is
+        the product's new catalog row, or None if it was deleted. If other
+        changes landed in between, the next access reloads instead.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version >= version:
+                return
+            if snapshot.version != version - 1:
+                self._checked_at = 0.0
+                return
+            self._snapshot = snapshot.patched(version, product_id, row)
+
+    def invalidate(self):
+        """Force a version check on next access (after an in-process write)"""
+        self._checked_at = 0.0
+
+
+def bump_catalog_version(cursor) -> int:
+    """Mark the catalog as changed and return the new version.
+
+    Call inside the transaction making the change.
+    """
+    cursor.execute("UPDATE catalog_version SET version = version + 1 WHERE id = 1 RETURNING version")
+    return cursor.fetchone()[0]
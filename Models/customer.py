@@ -1,147 +1,193 @@
-# Models/customer.py
-import sqlite3
-from Config.database_config import DatabaseConfig
-
-class Customer:
-    """Customer model and database operations"""
-    
-    def __init__(self):
-        self.db_config = DatabaseConfig()
-    
-    def authenticate(self, email, phone):
-        """Authenticate customer with email and phone"""
-        conn = self.db_config.create_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                SELECT customer_id, first_name, last_name
-                FROM customer 
-                WHERE email = ? AND phone = ?
-            """, (email, phone))
-            
-            result = cursor.fetchone()
-            return result
-        finally:
-            conn.close()
-    
-    def create_customer(self, first_name, last_name, email, phone, address=None, date_of_birth=None):
-        """Create new customer"""
-        conn = self.db_config.create_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT INTO customer (first_name, last_name, email, phone, address, date_of_birth)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (first_name, last_name, email, phone, address, date_of_birth))
-            
-            conn.commit()
-            return cursor.lastrowid
-        except sqlite3.IntegrityError:
-            return None  # Customer already exists
-        finally:
-            conn.close()
-    
-    def get_customer_by_id(self, customer_id):
-        """Get customer by ID"""
-        conn = self.db_config.create_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                SELECT customer_id, first_name, last_name, email, phone, address, date_of_birth
-                FROM customer 
-                WHERE customer_id = ?
-            """, (customer_id,))
-            
-            return cursor.fetchone()
-        finally:
-            conn.close()
-    
-    def update_customer(self, customer_id, **kwargs):
-        """Update customer information"""
-        conn = self.db_config.create_connection()
-        cursor = conn.cursor()
-        
-        # Build dynamic update query
-        fields = []
-        values = []
-        for key, value in kwargs.items():
-            if key in ['first_name', 'last_name', 'email', 'phone', 'address', 'date_of_birth']:
-                fields.append(f"{key} = ?")
-                values.append(value)
-        
-        if not fields:
-            return False
-        
-        values.append(customer_id)
-        update_sql = f"UPDATE customer SET {', '.join(fields)} WHERE customer_id = ?"
-        
-        try:
-            cursor.execute(update_sql, values)
-            conn.commit()
-            return cursor.rowcount > 0
-        finally:
-            conn.close()
-    
-    def get_customer_orders(self, customer_id, limit=None):
-        """Get customer's order history"""
-        conn = self.db_config.create_connection()
-        cursor = conn.cursor()
-        
-        try:
-            sql = """
-                SELECT o.order_id, o.order_date, o.order_status, o.total_amount,
-                       b.branch_name, p.payment_status
-                FROM orders o
-                LEFT JOIN branch b ON o.branch_id = b.branch_id
-                LEFT JOIN payment p ON o.order_id = p.order_id
-                WHERE o.customer_id = ?
-                ORDER BY o.order_date DESC
-            """
-            
-            if limit:
-                sql += f" LIMIT {limit}"
-            
-            cursor.execute(sql, (customer_id,))
-            return cursor.fetchall()
-        finally:
-            conn.close()
-    
-    def get_customer_notifications(self, customer_id, unread_only=False):
-        """Get customer notifications"""
-        conn = self.db_config.create_connection()
-        cursor = conn.cursor()
-        
-        try:
-            sql = """
-                SELECT notification_id, order_id, notification_type, message, 
-                       sent_date, is_read
-                FROM notification
-                WHERE customer_id = ?
-            """
-            
-            if unread_only:
-                sql += " AND is_read = 0"
-            
-            sql += " ORDER BY sent_date DESC"
-            
-            cursor.execute(sql, (customer_id,))
-            return cursor.fetchall()
-        finally:
-            conn.close()
-    
-    def mark_notification_read(self, notification_id):
-        """Mark notification as read"""
-        conn = self.db_config.create_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                UPDATE notification SET is_read = 1 WHERE notification_id = ?
-            """, (notification_id,))
-            conn.commit()
-            return cursor.rowcount > 0
-        finally:
+# Models/customer.py
+import sqlite3
+from Config.database_config import DatabaseConfig
+
+class Customer:
+    """Customer model and database operations"""
+    
+    def __init__(self, db_path='Data/pharmacy.db'):
+        self.db_config = DatabaseConfig(db_path)
+    
+    def authenticate(self, email, phone):
+        """Authenticate customer with email and phone"""
+        conn = self.db_config.get_connection(readonly=True)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT customer_id, first_name, last_name
+                FROM customer 
+                WHERE email = ? AND phone = ?
+            """, (email, phone))
+            
+            result = cursor.fetchone()
+            return result
+        finally:
+            conn.close()
+    
+    def create_customer(self, first_name, last_name, email, phone, address=None, date_of_birth=None):
+        """Create new customer"""
+        conn = self.db_config.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                INSERT INTO customer (first_name, last_name, email, phone, address, date_of_birth)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (first_name, last_name, email, phone, address, date_of_birth))
+            
+            conn.commit()
+            return cursor.lastrowid
+        except sqlite3.IntegrityError:
+            return None  # Customer already exists
+        finally:
+            conn.close()
+    
+    def get_customer_by_id(self, customer_id):
+        """Get customer by ID"""
+        conn = self.db_config.get_connection(readonly=True)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT customer_id, first_name, last_name, email, phone, address, date_of_birth
+                FROM customer 
+                WHERE customer_id = ?
+            """, (customer_id,))
+            
+            return cursor.fetchone()
+        finally:
+            conn.close()
+    
+    def update_customer(self, customer_id, **kwargs):
+        """Update customer information"""
+        # Build dynamic update query
+        fields = []
+        values = []
+        for key, value in kwargs.items():
+            if key in ['first_name', 'last_name', 'email', 'phone', 'address', 'date_of_birth']:
+                fields.append(f"{key} = ?")
+                values.append(value)
+        
+        if not fields:
+            return False
+        
+        values.append(customer_id)
+        update_sql = f"UPDATE customer SET {', '.join(fields)} WHERE customer_id = ?"
+        
+        conn = self.db_config.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(update_sql, values)
+            conn.commit()
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+    
+    # Columns of an order history row: order_id, order_date, order_status,
+    # total_amount, branch_name, payment_status
+    _ORDER_HISTORY_SQL = """
+        SELECT o.order_id, o.order_date, o.order_status, o.total_amount,
+               b.branch_name, p.payment_status
+        FROM orders o
+        LEFT JOIN branch b ON o.branch_id = b.branch_id
+        LEFT JOIN payment p ON o.order_id = p.order_id
+        WHERE o.customer_id = ? {conditions}
+        ORDER BY o.order_date {direction}, o.order_id {direction}
+        LIMIT ?
+    """
+
+    def get_customer_orders(self, customer_id, limit=None):
+        """Get customer's order history, newest first"""
+        conn = self.db_config.get_connection(readonly=True)
+        cursor = conn.cursor()
+        
+        try:
+            # LIMIT -1 means no limit
+            cursor.execute(self._ORDER_HISTORY_SQL.format(conditions="", direction="DESC"),
+                           (customer_id, limit or -1))
+            return cursor.fetchall()
+        finally:
+            conn.close()
+
+    def get_order_history(self, customer_id, page_size=20, after=None, before=None,
+                          status=None, branch_id=None):
+        """Get one page of a customer's orders, newest first, using keyset pagination.
+
+        after/before are (order_date, order_id) keys from the last or first
+        row of the current page (see order_history_key). Returns the rows
+        (as get_customer_orders) and whether more exist in the direction paged.
+        """
+        backwards = before is not None
+        conditions, params = [], [customer_id]
+        if status is not None:
+            conditions.append("o.order_status = ?")
+            params.append(status)
+        if branch_id is not None:
+            conditions.append("o.branch_id = ?")
+            params.append(branch_id)
+        cursor_key = before if backwards else after
+        if cursor_key is not None:
+            conditions.append(f"(o.order_date, o.order_id) {'>' if backwards else '<'} (?, ?)")
+            params.extend(cursor_key)
+
+        conn = self.db_config.get_connection(readonly=True)
+        cursor = conn.cursor()
+        
+        try:
+            # Paging backwards walks the index the other way and flips the page
+            cursor.execute(self._ORDER_HISTORY_SQL.format(
+                conditions="".join(f" AND {c}" for c in conditions),
+                direction="ASC" if backwards else "DESC"), (*params, page_size + 1))
+            orders = cursor.fetchall()
+        finally:
+            conn.close()
+
+        # One extra row tells whether another page exists
+        has_more = len(orders) > page_size
+        orders = orders[:page_size]
+        if backwards:
+            orders.reverse()
+        return orders, has_more
+
+    def order_history_key(self, row):
+        """Get the keyset cursor for a row returned by get_order_history"""
+        return row[1], row[0]
+    
+    def get_customer_notifications(self, customer_id, unread_only=False):
+        """Get customer notifications"""
+        conn = self.db_config.get_connection(readonly=True)
+        cursor = conn.cursor()
+        
+        try:
+            sql = """
+                SELECT notification_id, order_id, notification_type, message, 
+                       sent_date, is_read
+                FROM notification
+                WHERE customer_id = ?
+            """
+            
+            if unread_only:
+                sql += " AND is_read = 0"
+            
+            sql += " ORDER BY sent_date DESC"
+            
+            cursor.execute(sql, (customer_id,))
+            return cursor.fetchall()
+        finally:
+            conn.close()
+    
+    def mark_notification_read(self, notification_id):
+        """Mark notification as read"""
+        conn = self.db_config.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                UPDATE notification SET is_read = 1 WHERE notification_id = ?
+            """, (notification_id,))
+            conn.commit()
+            return cursor.rowcount > 0
+        finally:
             conn.close()
\ No newline at end of file
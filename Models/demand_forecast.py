@@ -0,0 +1,154 @@
+# Models/demand_forecast.py
+"""Demand forecasting and reorder points from order history.
+
+Daily units sold per (branch, product) over the last history_days are read
+from the trigger-maintained daily_product_sales rollup (so a refresh costs
+one row per SKU-day, not per order line) and reduced with NumPy across
+every SKU at once:
+
+    daily_demand    mean units per day (days without sales count as zero)
+    demand_std      sample standard deviation of the daily units
+    reorder_point   demand over the lead time plus z * std * sqrt(lead time)
+    order_up_to     the same over the lead time plus the review period
+
+A refresh replaces demand_forecast and writes each reorder point as a
+forecast-sourced (branch, product) stock_threshold row, so low-stock alerts
+fire at the reorder point. SKUs covered by a manually set threshold --
+for the SKU itself, its product everywhere or its whole branch -- keep it;
+the forecast only replaces the global default.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from Config.database_config import DatabaseConfig
+
+DAILY_SALES_DTYPE = np.dtype([('branch_id', np.int64), ('product_id', np.int64), ('units', np.float64)])
+
+
+def compute_reorder_points(daily_sales: np.ndarray, history_days: int, lead_time_days: float,
+                           review_days: float, service_level_z: float) -> Dict[str, np.ndarray]:
+    """Reduce (branch_id, product_id, units) rows, one per SKU per day with sales.
+
+    Returns parallel arrays, one element per SKU: branch_id, product_id,
+    daily_demand, demand_std, reorder_point and order_up_to.
+    """
+    sku_keys = (daily_sales['branch_id'] << 32) | daily_sales['product_id']
+    skus, sku_index = np.unique(sku_keys, return_inverse=True)
+    units = daily_sales['units']
+
+    # Sums and sums of squares are enough for mean and variance; the
+    # zero-sale days add nothing to either
+    total = np.bincount(sku_index, weights=units, minlength=len(skus))
+    total_sq = np.bincount(sku_index, weights=units * units, minlength=len(skus))
+    mean = total / history_days
+    variance = (total_sq - history_days * mean * mean) / max(history_days - 1, 1)
+    std = np.sqrt(np.clip(variance, 0.0, None))
+
+    def cover(days):
+        return np.ceil(mean * days + service_level_z * std * np.sqrt(days)).astype(np.int64)
+
+    reorder_point = cover(lead_time_days)
+    return {
+        'branch_id': skus >> 32,
+        'product_id': skus & 0xFFFFFFFF,
+        'daily_demand': mean,
+        'demand_std': std,
+        'reorder_point': reorder_point,
+        'order_up_to': np.maximum(cover(lead_time_days + review_days), reorder_point),
+    }
+
+
+class DemandForecast:
+    def __init__(self, db_path='Data/pharmacy.db', history_days: Optional[int] = None,
+                 lead_time_days: Optional[float] = None, review_days: Optional[float] = None,
+                 service_level_z: Optional[float] = None):
+        from Config import app_config
+        self.db_config = DatabaseConfig(db_path)
+        self.history_days = history_days or app_config.FORECAST_HISTORY_DAYS
+        self.lead_time_days = lead_time_days or app_config.FORECAST_LEAD_TIME_DAYS
+        self.review_days = review_days or app_config.FORECAST_REVIEW_PERIOD_DAYS
+        self.service_level_z = (app_config.FORECAST_SERVICE_LEVEL_Z if service_level_z is None
+                                else service_level_z)
+
+    def load_daily_sales(self, branch_id: Optional[int] = None) -> np.ndarray:
+        """Get units sold per (branch, product, day) over the history window.
+
+        The window is the last history_days whole days plus today.
+        """
+        branch_filter = "AND branch_id = ?" if branch_id else ""
+        params = [f"-{int(self.history_days)} days"] + ([branch_id] if branch_id else [])
+        with self.db_config.reader() as conn:
+            cursor = conn.execute(f"""
+                SELECT branch_id, product_id, units
+                FROM daily_product_sales
+                WHERE sale_date >= date('now', ?) AND units > 0
+                  {branch_filter}
+            """, params)
+            return np.fromiter(cursor, dtype=DAILY_SALES_DTYPE)
+
+    def compute(self, branch_id: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Forecast every SKU with sales in the window (see compute_reorder_points)"""
+        return compute_reorder_points(self.load_daily_sales(branch_id), self.history_days + 1,
+                                      self.lead_time_days, self.review_days, self.service_level_z)
+
+    def refresh(self, branch_id: Optional[int] = None) -> int:
+        """Recompute forecasts and reorder-point thresholds; return the SKU count.
+
+        SKUs without sales in the window lose their forecast threshold and
+        fall back to the branch/product/default thresholds. No threshold is
+        written for a SKU a manual branch, product or SKU threshold covers.
+        """
+        forecast = self.compute(branch_id)
+        skus = list(zip(forecast['branch_id'].tolist(), forecast['product_id'].tolist()))
+        scope = "branch_id = ?" if branch_id else "1"
+        params = [branch_id] if branch_id else []
+
+        with self.db_config.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(f"DELETE FROM demand_forecast WHERE {scope}", params)
+                cursor.executemany("""
+                    INSERT INTO demand_forecast (branch_id, product_id, daily_demand, demand_std,
+                                                 reorder_point, order_up_to)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [sku + row for sku, row in zip(skus, zip(forecast['daily_demand'].tolist(),
+                                                               forecast['demand_std'].tolist(),
+                                                               forecast['reorder_point'].tolist(),
+                                                               forecast['order_up_to'].tolist()))])
+
+                cursor.execute(f"DELETE FROM stock_threshold WHERE source = 'forecast' AND {scope}", params)
+                cursor.executemany("""
+                    INSERT INTO stock_threshold (branch_id, product_id, threshold, source)
+                    SELECT ?1, ?2, ?3, 'forecast'
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM stock_threshold
+                        WHERE source = 'manual'
+                          AND branch_id IN (?1, 0) AND product_id IN (?2, 0)
+                          AND (branch_id, product_id) != (0, 0)
+                    )
+                """, [sku + (threshold,) for sku, threshold in zip(skus, forecast['reorder_point'].tolist())])
+
+                # Re-run the low-stock triggers against the new thresholds
+                cursor.execute(f"UPDATE inventory SET quantity_in_stock = quantity_in_stock WHERE {scope}",
+                               params)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return len(skus)
+
+    def get_forecast(self, branch_id: int) -> List[Tuple]:
+        """Get (product_id, product_name, daily_demand, demand_std, reorder_point,
+        order_up_to, quantity_in_stock) for a branch, most urgent first"""
+        with self.db_config.reader() as conn:
+            return conn.execute("""
+                SELECT f.product_id, p.product_name, f.daily_demand, f.demand_std,
+                       f.reorder_point, f.order_up_to, COALESCE(i.quantity_in_stock, 0)
+                FROM demand_forecast f
+                JOIN product p ON p.product_id = f.product_id
+                LEFT JOIN inventory i ON i.branch_id = f.branch_id AND i.product_id = f.product_id
+                WHERE f.branch_id = ?
+                ORDER BY COALESCE(i.quantity_in_stock, 0) - f.reorder_point, p.product_name
+            """, (branch_id,)).fetchall()
@@ -1,369 +1,806 @@
-import sqlite3
-from datetime import date
-from typing import Optional, List, Tuple, Dict
-
-
-class Inventory:
-    def __init__(self, db_path: str = 'Data/pharmacy.db'):
-        self.db_path = db_path
-
-    def connect_db(self):
-        return sqlite3.connect(self.db_path)
-
-    def get_branch_inventory(self, branch_id: int) -> List[Tuple]:
-        """Get all inventory items for a specific branch"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT i.inventory_id, p.product_name, p.product_category,
-                   i.quantity_in_stock, p.unit_price, i.last_restocked,
-                   p.requires_prescription, p.product_id
-            FROM inventory i
-            JOIN product p ON i.product_id = p.product_id
-            WHERE i.branch_id = ?
-            ORDER BY p.product_name
-        """, (branch_id,))
-        
-        inventory = cursor.fetchall()
-        conn.close()
-        
-        return inventory
-
-    def get_low_stock_items(self, branch_id: int, threshold: int = 10) -> List[Tuple]:
-        """Get items with stock below threshold"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT i.inventory_id, p.product_name, i.quantity_in_stock, 
-                   p.unit_price, i.last_restocked
-            FROM inventory i
-            JOIN product p ON i.product_id = p.product_id
-            WHERE i.branch_id = ? AND i.quantity_in_stock < ?
-            ORDER BY i.quantity_in_stock ASC
-        """, (branch_id, threshold))
-        
-        low_stock = cursor.fetchall()
-        conn.close()
-        
-        return low_stock
-
-    def search_inventory(self, branch_id: int, search_term: str) -> List[Tuple]:
-        """Search inventory by product name"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT i.inventory_id, p.product_name, i.quantity_in_stock, 
-                   p.unit_price, i.last_restocked
-            FROM inventory i
-            JOIN product p ON i.product_id = p.product_id
-            WHERE i.branch_id = ? AND p.product_name LIKE ?
-            ORDER BY p.product_name
-        """, (branch_id, f'%{search_term}%'))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        return results
-
-    def update_stock_quantity(self, inventory_id: int, new_quantity: int, 
-                            branch_id: Optional[int] = None) -> Tuple[bool, str]:
-        """Update stock quantity for an inventory item"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        try:
-            if branch_id:
-                cursor.execute("""
-                    UPDATE inventory 
-                    SET quantity_in_stock = ?, last_restocked = ?
-                    WHERE inventory_id = ? AND branch_id = ?
-                """, (new_quantity, date.today(), inventory_id, branch_id))
-            else:
-                cursor.execute("""
-                    UPDATE inventory 
-                    SET quantity_in_stock = ?, last_restocked = ?
-                    WHERE inventory_id = ?
-                """, (new_quantity, date.today(), inventory_id))
-            
-            if cursor.rowcount > 0:
-                conn.commit()
-                return True, "Stock updated successfully"
-            else:
-                return False, "Inventory item not found or access denied"
-                
-        except Exception as e:
-            conn.rollback()
-            return False, f"Error updating stock: {str(e)}"
-        finally:
-            conn.close()
-
-    def add_stock(self, inventory_id: int, additional_quantity: int, 
-                  branch_id: Optional[int] = None) -> Tuple[bool, str]:
-        """Add stock to an existing inventory item"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        try:
-            if branch_id:
-                cursor.execute("""
-                    UPDATE inventory 
-                    SET quantity_in_stock = quantity_in_stock + ?, last_restocked = ?
-                    WHERE inventory_id = ? AND branch_id = ?
-                """, (additional_quantity, date.today(), inventory_id, branch_id))
-            else:
-                cursor.execute("""
-                    UPDATE inventory 
-                    SET quantity_in_stock = quantity_in_stock + ?, last_restocked = ?
-                    WHERE inventory_id = ?
-                """, (additional_quantity, date.today(), inventory_id))
-            
-            if cursor.rowcount > 0:
-                conn.commit()
-                return True, f"{additional_quantity} units added successfully"
-            else:
-                return False, "Inventory item not found or access denied"
-                
-        except Exception as e:
-            conn.rollback()
-            return False, f"Error adding stock: {str(e)}"
-        finally:
-            conn.close()
-
-    def reserve_stock(self, product_id: int, branch_id: int, quantity: int) -> Tuple[bool, str]:
-        """Reserve stock for an order (reduce available quantity)"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("BEGIN")
-            
-            # Check current available stock
-            cursor.execute("""
-                SELECT quantity_in_stock, inventory_id
-                FROM inventory
-                WHERE product_id = ? AND branch_id = ?
-            """, (product_id, branch_id))
-            
-            result = cursor.fetchone()
-            if not result:
-                conn.rollback()
-                return False, "Product not available at this branch"
-            
-            available_stock, inventory_id = result
-            
-            if available_stock < quantity:
-                conn.rollback()
-                return False, f"Insufficient stock. Available: {available_stock}, Requested: {quantity}"
-            
-            # Reserve stock by reducing inventory
-            cursor.execute("""
-                UPDATE inventory 
-                SET quantity_in_stock = quantity_in_stock - ?
-                WHERE inventory_id = ?
-            """, (quantity, inventory_id))
-            
-            conn.commit()
-            return True, "Stock reserved successfully"
-            
-        except Exception as e:
-            conn.rollback()
-            return False, f"Error reserving stock: {str(e)}"
-        finally:
-            conn.close()
-
-    def release_stock(self, product_id: int, branch_id: int, quantity: int) -> Tuple[bool, str]:
-        """Release reserved stock back to inventory"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                SELECT inventory_id
-                FROM inventory
-                WHERE product_id = ? AND branch_id = ?
-            """, (product_id, branch_id))
-            
-            result = cursor.fetchone()
-            if not result:
-                return False, "Inventory item not found"
-            
-            inventory_id = result[0]
-            
-            cursor.execute("""
-                UPDATE inventory 
-                SET quantity_in_stock = quantity_in_stock + ?
-                WHERE inventory_id = ?
-            """, (quantity, inventory_id))
-            
-            conn.commit()
-            return True, "Stock released successfully"
-            
-        except Exception as e:
-            conn.rollback()
-            return False, f"Error releasing stock: {str(e)}"
-        finally:
-            conn.close()
-
-    def add_product_to_inventory(self, branch_id: int, product_id: int, 
-                               initial_stock: int) -> Tuple[bool, str]:
-        """Add a new product to branch inventory"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT INTO inventory (branch_id, product_id, quantity_in_stock, last_restocked)
-                VALUES (?, ?, ?, ?)
-            """, (branch_id, product_id, initial_stock, date.today()))
-            
-            conn.commit()
-            inventory_id = cursor.lastrowid
-            return True, f"Product added to inventory with ID: {inventory_id}"
-            
-        except sqlite3.IntegrityError:
-            conn.rollback()
-            return False, "Product already exists in this branch's inventory"
-        except Exception as e:
-            conn.rollback()
-            return False, f"Error adding product to inventory: {str(e)}"
-        finally:
-            conn.close()
-
-    def remove_product_from_inventory(self, inventory_id: int, 
-                                    branch_id: Optional[int] = None) -> Tuple[bool, str]:
-        """Remove a product from branch inventory"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        try:
-            # Check if there's any stock remaining
-            if branch_id:
-                cursor.execute("""
-                    SELECT quantity_in_stock FROM inventory 
-                    WHERE inventory_id = ? AND branch_id = ?
-                """, (inventory_id, branch_id))
-            else:
-                cursor.execute("""
-                    SELECT quantity_in_stock FROM inventory 
-                    WHERE inventory_id = ?
-                """, (inventory_id,))
-            
-            result = cursor.fetchone()
-            if not result:
-                return False, "Inventory item not found"
-            
-            if result[0] > 0:
-                return False, "Cannot remove product with remaining stock"
-            
-            # Delete inventory item
-            if branch_id:
-                cursor.execute("""
-                    DELETE FROM inventory 
-                    WHERE inventory_id = ? AND branch_id = ?
-                """, (inventory_id, branch_id))
-            else:
-                cursor.execute("""
-                    DELETE FROM inventory 
-                    WHERE inventory_id = ?
-                """, (inventory_id,))
-            
-            if cursor.rowcount > 0:
-                conn.commit()
-                return True, "Product removed from inventory"
-            else:
-                return False, "Inventory item not found or access denied"
-                
-        except Exception as e:
-            conn.rollback()
-            return False, f"Error removing product from inventory: {str(e)}"
-        finally:
-            conn.close()
-
-    def get_inventory_value(self, branch_id: int) -> Dict:
-        """Calculate total inventory value for a branch"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT COUNT(*) as total_products, 
-                   SUM(quantity_in_stock) as total_stock,
-                   SUM(quantity_in_stock * p.unit_price) as inventory_value
-            FROM inventory i
-            JOIN product p ON i.product_id = p.product_id
-            WHERE i.branch_id = ?
-        """, (branch_id,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        return {
-            'total_products': result[0] if result[0] else 0,
-            'total_stock': result[1] if result[1] else 0,
-            'inventory_value': result[2] if result[2] else 0.0
-        }
-
-    def get_products_not_in_inventory(self, branch_id: int) -> List[Tuple]:
-        """Get products that are not in this branch's inventory"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT p.product_id, p.product_name, p.unit_price, p.product_category
-            FROM product p
-            WHERE p.product_id NOT IN (
-                SELECT product_id FROM inventory WHERE branch_id = ?
-            )
-            ORDER BY p.product_name
-        """, (branch_id,))
-        
-        available_products = cursor.fetchall()
-        conn.close()
-        
-        return available_products
-
-    def get_inventory_movement_history(self, branch_id: int, days: int = 30) -> List[Dict]:
-        """Get inventory movement history for reporting"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        # This would require additional tables to track inventory movements
-        # For now, we'll return restock history
-        cursor.execute("""
-            SELECT p.product_name, i.quantity_in_stock, i.last_restocked
-            FROM inventory i
-            JOIN product p ON i.product_id = p.product_id
-            WHERE i.branch_id = ? AND i.last_restocked >= DATE('now', '-{} days')
-            ORDER BY i.last_restocked DESC
-        """.format(days), (branch_id,))
-        
-        history = cursor.fetchall()
-        conn.close()
-        
-        return [{
-            'product_name': item[0],
-            'current_stock': item[1],
-            'last_restocked': item[2]
-        } for item in history]
-
-    def check_stock_availability(self, product_id: int, branch_id: int, 
-                               required_quantity: int) -> Tuple[bool, int]:
-        """Check if sufficient stock is available"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT quantity_in_stock
-            FROM inventory
-            WHERE product_id = ? AND branch_id = ?
-        """, (product_id, branch_id))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            available_stock = result[0]
-            return available_stock >= required_quantity, available_stock
+import sqlite3
+from datetime import date
+from typing import Optional, List, Tuple, Dict
+
+from Config.database_config import DatabaseConfig
+from Models.catalog_cache import CatalogCache
+from Models.product import build_fts_query
+from Models.stock_index import BranchStockIndex
+
+# Kinds of rows in the inventory_movement ledger
+MOVEMENT_TYPES = ('restock', 'reservation', 'release', 'sale', 'adjustment')
+
+
+def record_movement(cursor, branch_id: int, product_id: int, movement_type: str,
+                    quantity_change: int, reason: Optional[str] = None,
+                    reference: Optional[str] = None):
+    """Append a stock change to the ledger; call inside the transaction making it"""
+    if movement_type not in MOVEMENT_TYPES:
+        raise ValueError(f"Unknown movement type: {movement_type}")
+    if quantity_change == 0:
+        return
+    cursor.execute("""
+        INSERT INTO inventory_movement (branch_id, product_id, movement_type,
+                                        quantity_change, reason, reference)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (branch_id, product_id, movement_type, quantity_change, reason, reference))
+
+
+def reserve_lines(cursor, branch_id: int, items, reference: Optional[str] = None,
+                  movement_type: str = 'reservation', reason: Optional[str] = None) -> List[Dict]:
+    """Decrement stock for every line, each only if enough is on hand.
+
+    Run inside a write transaction (BEGIN IMMEDIATE). Returns the lines that
+    could not be covered as dicts with product_id, requested and available
+    (None when the branch does not stock the product); if any are returned
+    the caller must roll back, since the covered lines were already taken.
+    """
+    required = {}
+    for product_id, quantity in (items.items() if isinstance(items, dict) else items):
+        required[product_id] = required.get(product_id, 0) + quantity
+
+    shortfalls = []
+    for product_id, quantity in required.items():
+        cursor.execute("""
+            UPDATE inventory
+            SET quantity_in_stock = quantity_in_stock - ?
+            WHERE branch_id = ? AND product_id = ? AND quantity_in_stock >= ?
+        """, (quantity, branch_id, product_id, quantity))
+        if cursor.rowcount:
+            record_movement(cursor, branch_id, product_id, movement_type, -quantity,
+                            reason, reference)
+            continue
+
+        cursor.execute("""
+            SELECT quantity_in_stock FROM inventory
+            WHERE branch_id = ? AND product_id = ?
+        """, (branch_id, product_id))
+        row = cursor.fetchone()
+        shortfalls.append({
+            'product_id': product_id,
+            'requested': quantity,
+            'available': row[0] if row else None
+        })
+    return shortfalls
+
+
+class Inventory:
+    def __init__(self, db_path: str = 'Data/pharmacy.db'):
+        self.db_path = db_path
+        self.db_config = DatabaseConfig(db_path)
+        self.stock_index = BranchStockIndex.for_database(self.db_config)
+
+    def connect_db(self, readonly=False):
+        return self.db_config.get_connection(readonly)
+
+    def get_branch_inventory(self, branch_id: int) -> List[Tuple]:
+        """Get all inventory items for a specific branch"""
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT i.inventory_id, p.product_name, p.product_category,
+                   i.quantity_in_stock, p.unit_price, i.last_restocked,
+                   p.requires_prescription, p.product_id
+            FROM inventory i
+            JOIN product p ON i.product_id = p.product_id
+            WHERE i.branch_id = ?
+            ORDER BY p.product_name
+        """, (branch_id,))
+        
+        inventory = cursor.fetchall()
+        conn.close()
+        
+        return inventory
+
+    def get_low_stock_items(self, branch_id: int, threshold: Optional[int] = None) -> List[Tuple]:
+        """Get items at or below their low-stock threshold.
+
+        Reads the trigger-maintained low_stock_alert table; pass threshold to
+        scan the branch against a one-off cutoff instead.
+        """
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        if threshold is None:
+            cursor.execute("""
+                SELECT i.inventory_id, p.product_name, i.quantity_in_stock, 
+                       p.unit_price, i.last_restocked
+                FROM low_stock_alert a
+                JOIN inventory i ON i.branch_id = a.branch_id AND i.product_id = a.product_id
+                JOIN product p ON i.product_id = p.product_id
+                WHERE a.branch_id = ?
+                ORDER BY i.quantity_in_stock ASC
+            """, (branch_id,))
+        else:
+            cursor.execute("""
+                SELECT i.inventory_id, p.product_name, i.quantity_in_stock, 
+                       p.unit_price, i.last_restocked
+                FROM inventory i
+                JOIN product p ON i.product_id = p.product_id
+                WHERE i.branch_id = ? AND i.quantity_in_stock <= ?
+                ORDER BY i.quantity_in_stock ASC
+            """, (branch_id, threshold))
+        
+        low_stock = cursor.fetchall()
+        conn.close()
+        
+        return low_stock
+
+    def set_stock_threshold(self, threshold: int, branch_id: Optional[int] = None,
+                            product_id: Optional[int] = None) -> Tuple[bool, str]:
+        """Set the low-stock threshold for a branch, a product, both, or (neither) the default.
+
+        A branch or product threshold replaces the forecast thresholds of the
+        SKUs it covers, so manual settings always win.
+        """
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                INSERT INTO stock_threshold (branch_id, product_id, threshold, source)
+                VALUES (?, ?, ?, 'manual')
+                ON CONFLICT (branch_id, product_id) DO UPDATE SET
+                    threshold = excluded.threshold,
+                    source = 'manual'
+            """, (branch_id or 0, product_id or 0, threshold))
+            
+            conditions, params = [], []
+            if branch_id:
+                conditions.append("branch_id = ?")
+                params.append(branch_id)
+            if product_id:
+                conditions.append("product_id = ?")
+                params.append(product_id)
+            if conditions:
+                cursor.execute(f"""
+                    DELETE FROM stock_threshold
+                    WHERE source = 'forecast' AND {' AND '.join(conditions)}
+                """, params)
+            
+            # Re-run the low-stock triggers over the rows this threshold covers
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            cursor.execute(f"UPDATE inventory SET quantity_in_stock = quantity_in_stock {where}", params)
+            
+            conn.commit()
+            return True, "Threshold updated successfully"
+            
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error updating threshold: {str(e)}"
+        finally:
+            conn.close()
+
+    def search_inventory(self, branch_id: int, search_term: str) -> List[Tuple]:
+        """Search inventory by product name"""
+        fts_query = build_fts_query(search_term, column='product_name')
+        if fts_query is None:
+            return []
+
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT i.inventory_id, p.product_name, i.quantity_in_stock, 
+                   p.unit_price, i.last_restocked
+            FROM product_fts f
+            JOIN inventory i ON i.product_id = f.rowid AND i.branch_id = ?
+            JOIN product p ON i.product_id = p.product_id
+            WHERE product_fts MATCH ?
+            ORDER BY p.product_name
+        """, (branch_id, fts_query))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return results
+
+    def update_stock_quantity(self, inventory_id: int, new_quantity: int, 
+                            branch_id: Optional[int] = None, reason: Optional[str] = None,
+                            reference: Optional[str] = None) -> Tuple[bool, str]:
+        """Set the stock quantity for an inventory item (logged as an adjustment)"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                SELECT branch_id, product_id, quantity_in_stock
+                FROM inventory
+                WHERE inventory_id = ?
+            """, (inventory_id,))
+            
+            item = cursor.fetchone()
+            if not item or (branch_id and item[0] != branch_id):
+                conn.rollback()
+                return False, "Inventory item not found or access denied"
+            
+            cursor.execute("""
+                UPDATE inventory 
+                SET quantity_in_stock = ?, last_restocked = ?
+                WHERE inventory_id = ?
+            """, (new_quantity, date.today(), inventory_id))
+            record_movement(cursor, item[0], item[1], 'adjustment', new_quantity - item[2],
+                            reason or "Stock count", reference)
+            
+            conn.commit()
+            return True, "Stock updated successfully"
+                
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error updating stock: {str(e)}"
+        finally:
+            conn.close()
+
+    def add_stock(self, inventory_id: int, additional_quantity: int, 
+                  branch_id: Optional[int] = None, reason: Optional[str] = None,
+                  reference: Optional[str] = None) -> Tuple[bool, str]:
+        """Add stock to an existing inventory item"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            if branch_id:
+                cursor.execute("""
+                    UPDATE inventory 
+                    SET quantity_in_stock = quantity_in_stock + ?, last_restocked = ?
+                    WHERE inventory_id = ? AND branch_id = ?
+                    RETURNING branch_id, product_id
+                """, (additional_quantity, date.today(), inventory_id, branch_id))
+            else:
+                cursor.execute("""
+                    UPDATE inventory 
+                    SET quantity_in_stock = quantity_in_stock + ?, last_restocked = ?
+                    WHERE inventory_id = ?
+                    RETURNING branch_id, product_id
+                """, (additional_quantity, date.today(), inventory_id))
+            
+            item = cursor.fetchone()
+            if item:
+                record_movement(cursor, item[0], item[1], 'restock', additional_quantity,
+                                reason, reference)
+                conn.commit()
+                return True, f"{additional_quantity} units added successfully"
+            else:
+                return False, "Inventory item not found or access denied"
+                
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error adding stock: {str(e)}"
+        finally:
+            conn.close()
+
+    def reserve_stock(self, product_id: int, branch_id: int, quantity: int,
+                      reference: Optional[str] = None) -> Tuple[bool, str]:
+        """Reserve stock for an order (reduce available quantity)"""
+        success, message, shortfalls = self.reserve_stock_many({product_id: quantity}, branch_id, reference)
+        if shortfalls:
+            shortfall = shortfalls[0]
+            if shortfall['available'] is None:
+                return False, "Product not available at this branch"
+            return False, f"Insufficient stock. Available: {shortfall['available']}, Requested: {quantity}"
+        return success, "Stock reserved successfully" if success else message
+
+    def reserve_stock_many(self, items, branch_id: int,
+                           reference: Optional[str] = None) -> Tuple[bool, str, List[Dict]]:
+        """Reserve several products at a branch all-or-nothing.
+
+        items maps product_id -> quantity (or is an iterable of pairs).
+        Returns (success, message, shortfalls); on any shortfall nothing is
+        reserved and every short line is reported.
+        """
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            shortfalls = reserve_lines(cursor, branch_id, items, reference)
+            if shortfalls:
+                conn.rollback()
+                return False, f"Insufficient stock for {len(shortfalls)} item(s)", shortfalls
+            conn.commit()
+            return True, "Stock reserved successfully", []
+            
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error reserving stock: {str(e)}", []
+        finally:
+            conn.close()
+
+    def release_stock(self, product_id: int, branch_id: int, quantity: int,
+                      reference: Optional[str] = None) -> Tuple[bool, str]:
+        """Release reserved stock back to inventory"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT inventory_id
+                FROM inventory
+                WHERE product_id = ? AND branch_id = ?
+            """, (product_id, branch_id))
+            
+            result = cursor.fetchone()
+            if not result:
+                return False, "Inventory item not found"
+            
+            inventory_id = result[0]
+            
+            cursor.execute("""
+                UPDATE inventory 
+                SET quantity_in_stock = quantity_in_stock + ?
+                WHERE inventory_id = ?
+            """, (quantity, inventory_id))
+            record_movement(cursor, branch_id, product_id, 'release', quantity,
+                            reference=reference)
+            
+            conn.commit()
+            return True, "Stock released successfully"
+            
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error releasing stock: {str(e)}"
+        finally:
+            conn.close()
+
+    def apply_shipment(self, branch_id: int, lines: List[Tuple],
+                       reference: Optional[str] = None) -> Dict:
+        """Apply a delivery or stock adjustment to a branch in one transaction.
+
+        lines are (line_number, product, quantity, lot) where product is a
+        product id or an exact product name. Positive quantities are
+        upserted with one executemany (missing inventory rows are created);
+        negative ones are removals and only apply if that much is on hand.
+        Bad lines are rejected without affecting the rest. Returns a summary
+        with a result dict per line.
+        """
+        reason = f"Shipment {reference}" if reference else "Shipment"
+        products = CatalogCache.for_database(self.db_config).snapshot().products
+        ids_by_name = {}
+        for product_id, row in products.items():
+            ids_by_name.setdefault(row[1].casefold(), []).append(product_id)
+
+        results, restocks, removals = [], [], []
+        for line_number, product, quantity, lot in lines:
+            result = {'line': line_number, 'product_id': None, 'quantity': quantity,
+                      'lot': lot, 'status': 'rejected', 'message': ''}
+            results.append(result)
+
+            product = str(product).strip()
+            matches = [int(product)] if product.isdigit() else ids_by_name.get(product.casefold(), [])
+            if len(matches) != 1 or matches[0] not in products:
+                result['message'] = ("Product name is ambiguous" if len(matches) > 1
+                                     else f"Unknown product: {product}")
+                continue
+            if not isinstance(quantity, int) or quantity == 0:
+                result['message'] = "Quantity must be a non-zero whole number"
+                continue
+
+            result['product_id'] = matches[0]
+            (restocks if quantity > 0 else removals).append(result)
+
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            if restocks:
+                today = date.today()
+                cursor.executemany("""
+                    INSERT INTO inventory (branch_id, product_id, quantity_in_stock, last_restocked)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (branch_id, product_id) DO UPDATE SET
+                        quantity_in_stock = quantity_in_stock + excluded.quantity_in_stock,
+                        last_restocked = excluded.last_restocked
+                """, [(branch_id, r['product_id'], r['quantity'], today) for r in restocks])
+                cursor.executemany("""
+                    INSERT INTO inventory_movement (branch_id, product_id, movement_type,
+                                                    quantity_change, reason, reference)
+                    VALUES (?, ?, 'restock', ?, ?, ?)
+                """, [(branch_id, r['product_id'], r['quantity'], reason, r['lot'] or reference)
+                      for r in restocks])
+                for r in restocks:
+                    r['status'], r['message'] = 'applied', "Restocked"
+            
+            for r in removals:
+                shortfalls = reserve_lines(cursor, branch_id, [(r['product_id'], -r['quantity'])],
+                                           r['lot'] or reference, 'adjustment', reason)
+                if shortfalls:
+                    r['message'] = f"Only {shortfalls[0]['available'] or 0} in stock"
+                else:
+                    r['status'], r['message'] = 'applied', "Removed"
+            
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            for r in restocks + removals:
+                r['status'], r['message'] = 'rejected', f"Error applying shipment: {str(e)}"
+        finally:
+            conn.close()
+        
+        applied = [r for r in results if r['status'] == 'applied']
+        return {
+            'applied': len(applied),
+            'rejected': len(results) - len(applied),
+            'units': sum(r['quantity'] for r in applied),
+            'lines': results
+        }
+
+    def add_product_to_inventory(self, branch_id: int, product_id: int, 
+                               initial_stock: int) -> Tuple[bool, str]:
+        """Add a new product to branch inventory"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                INSERT INTO inventory (branch_id, product_id, quantity_in_stock, last_restocked)
+                VALUES (?, ?, ?, ?)
+            """, (branch_id, product_id, initial_stock, date.today()))
+            inventory_id = cursor.lastrowid
+            record_movement(cursor, branch_id, product_id, 'restock', initial_stock, "Initial stock")
+            
+            conn.commit()
+            return True, f"Product added to inventory with ID: {inventory_id}"
+            
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            return False, "Product already exists in this branch's inventory"
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error adding product to inventory: {str(e)}"
+        finally:
+            conn.close()
+
+    def remove_product_from_inventory(self, inventory_id: int, 
+                                    branch_id: Optional[int] = None) -> Tuple[bool, str]:
+        """Remove a product from branch inventory"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            # Check if there's any stock remaining
+            if branch_id:
+                cursor.execute("""
+                    SELECT quantity_in_stock FROM inventory 
+                    WHERE inventory_id = ? AND branch_id = ?
+                """, (inventory_id, branch_id))
+            else:
+                cursor.execute("""
+                    SELECT quantity_in_stock FROM inventory 
+                    WHERE inventory_id = ?
+                """, (inventory_id,))
+            
+            result = cursor.fetchone()
+            if not result:
+                return False, "Inventory item not found"
+            
+            if result[0] > 0:
+                return False, "Cannot remove product with remaining stock"
+            
+            # Delete inventory item
+            if branch_id:
+                cursor.execute("""
+                    DELETE FROM inventory 
+                    WHERE inventory_id = ? AND branch_id = ?
+                """, (inventory_id, branch_id))
+            else:
+                cursor.execute("""
+                    DELETE FROM inventory 
+                    WHERE inventory_id = ?
+                """, (inventory_id,))
+            
+            if cursor.rowcount > 0:
+                conn.commit()
+                return True, "Product removed from inventory"
+            else:
+                return False, "Inventory item not found or access denied"
+                
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error removing product from inventory: {str(e)}"
+        finally:
+            conn.close()
+
+    def get_inventory_value(self, branch_id: int) -> Dict:
+        """Get total inventory value for a branch (from the trigger-kept summary)"""
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT total_products, total_stock, inventory_value
+            FROM branch_inventory_summary
+            WHERE branch_id = ?
+        """, (branch_id,))
+        
+        result = cursor.fetchone() or (0, 0, 0.0)
+        conn.close()
+        
+        return {
+            'total_products': result[0],
+            'total_stock': result[1],
+            'inventory_value': result[2]
+        }
+
+    def _summary_query(self, one_branch: bool = False) -> str:
+        # Full recomputation that branch_inventory_summary must match; with
+        # one_branch, takes the branch_id as a parameter
+        return f"""
+            SELECT i.branch_id, COUNT(*), SUM(i.quantity_in_stock),
+                   SUM(i.quantity_in_stock * p.unit_price)
+            FROM inventory i
+            JOIN product p ON i.product_id = p.product_id
+            {'WHERE i.branch_id = ?' if one_branch else ''}
+            GROUP BY i.branch_id
+        """
+
+    def verify_inventory_summary(self, tolerance: float = 0.01) -> List[Dict]:
+        """Compare branch_inventory_summary with a full recomputation; return mismatches"""
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        cursor.execute(self._summary_query())
+        expected = {row[0]: row[1:] for row in cursor.fetchall()}
+        cursor.execute("""
+            SELECT branch_id, total_products, total_stock, inventory_value
+            FROM branch_inventory_summary
+        """)
+        stored = {row[0]: row[1:] for row in cursor.fetchall()}
+        conn.close()
+        
+        mismatches = []
+        for branch_id in sorted(set(expected) | set(stored)):
+            want = expected.get(branch_id, (0, 0, 0.0))
+            have = stored.get(branch_id, (0, 0, 0.0))
+            if want[:2] != have[:2] or abs(want[2] - have[2]) > tolerance:
+                mismatches.append({'branch_id': branch_id, 'expected': want, 'stored': have})
+        return mismatches
+
+    def rebuild_inventory_summary(self) -> int:
+        """Recompute branch_inventory_summary from inventory; return branches written.
+
+        Each branch is rebuilt in its own transaction, so checkouts at other
+        branches only ever wait for one branch's recompute.
+        """
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT branch_id FROM inventory
+                UNION
+                SELECT branch_id FROM branch_inventory_summary
+            """)
+            branch_ids = [row[0] for row in cursor.fetchall()]
+            count = 0
+            for branch_id in branch_ids:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("DELETE FROM branch_inventory_summary WHERE branch_id = ?", (branch_id,))
+                cursor.execute(f"""
+                    INSERT INTO branch_inventory_summary
+                        (branch_id, total_products, total_stock, inventory_value)
+                    {self._summary_query(one_branch=True)}
+                """, (branch_id,))
+                count += cursor.rowcount
+                conn.commit()
+            return count
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def get_products_not_in_inventory(self, branch_id: int) -> List[Tuple]:
+        """Get products that are not in this branch's inventory"""
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT p.product_id, p.product_name, p.unit_price, p.product_category
+            FROM product p
+            WHERE p.product_id NOT IN (
+                SELECT product_id FROM inventory WHERE branch_id = ?
+            )
+            ORDER BY p.product_name
+        """, (branch_id,))
+        
+        available_products = cursor.fetchall()
+        conn.close()
+        
+        return available_products
+
+    def get_inventory_movement_history(self, branch_id: int, days: int = 30,
+                                       product_id: Optional[int] = None) -> List[Dict]:
+        """Get ledger entries for a branch from the last `days` days, newest first"""
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        product_filter = "AND m.product_id = ?" if product_id else ""
+        cursor.execute(f"""
+            SELECT m.movement_id, m.created_at, p.product_name, m.movement_type,
+                   m.quantity_change, m.reason, m.reference
+            FROM inventory_movement m
+            JOIN product p ON m.product_id = p.product_id
+            WHERE m.branch_id = ? {product_filter}
+              AND m.created_at >= DATETIME('now', ?)
+            ORDER BY m.created_at DESC, m.movement_id DESC
+        """, (branch_id, *([product_id] if product_id else []), f"-{int(days)} days"))
+        
+        history = cursor.fetchall()
+        conn.close()
+        
+        return [{
+            'movement_id': item[0],
+            'created_at': item[1],
+            'product_name': item[2],
+            'movement_type': item[3],
+            'quantity_change': item[4],
+            'reason': item[5],
+            'reference': item[6]
+        } for item in history]
+
+    def get_stock_at(self, branch_id: int, at: str,
+                     product_id: Optional[int] = None) -> Dict[int, int]:
+        """Reconstruct a branch's stock levels (product_id -> quantity) at a past time.
+
+        at is a 'YYYY-MM-DD HH:MM:SS' UTC timestamp like the ledger's
+        created_at (a bare date means the start of that day). Starts from the
+        latest snapshot taken at or before `at` and replays the ledger after it.
+        """
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT snapshot_id, last_movement_id, taken_at
+                FROM inventory_snapshot
+                WHERE branch_id = ? AND taken_at <= ?
+                ORDER BY taken_at DESC, snapshot_id DESC
+                LIMIT 1
+            """, (branch_id, at))
+            snapshot = cursor.fetchone()
+            
+            stock = {}
+            snapshot_id, last_movement_id, taken_at = snapshot or (None, 0, '')
+            if snapshot_id is not None:
+                if product_id:
+                    cursor.execute("""
+                        SELECT product_id, quantity FROM inventory_snapshot_item
+                        WHERE snapshot_id = ? AND product_id = ?
+                    """, (snapshot_id, product_id))
+                else:
+                    cursor.execute("""
+                        SELECT product_id, quantity FROM inventory_snapshot_item
+                        WHERE snapshot_id = ?
+                    """, (snapshot_id,))
+                stock.update(cursor.fetchall())
+            
+            # Movements after the snapshot: created_at bounds the index range,
+            # movement_id drops the ones the snapshot already counts
+            if product_id:
+                cursor.execute("""
+                    SELECT product_id, SUM(quantity_change)
+                    FROM inventory_movement
+                    WHERE branch_id = ? AND product_id = ?
+                      AND created_at >= ? AND created_at <= ? AND movement_id > ?
+                    GROUP BY product_id
+                """, (branch_id, product_id, taken_at, at, last_movement_id))
+            else:
+                cursor.execute("""
+                    SELECT product_id, SUM(quantity_change)
+                    FROM inventory_movement
+                    WHERE branch_id = ?
+                      AND created_at >= ? AND created_at <= ? AND movement_id > ?
+                    GROUP BY product_id
+                """, (branch_id, taken_at, at, last_movement_id))
+            for pid, change in cursor.fetchall():
+                stock[pid] = stock.get(pid, 0) + change
+        finally:
+            conn.close()
+        
+        if product_id:
+            stock.setdefault(product_id, 0)
+        return stock
+
+    def take_inventory_snapshot(self, branch_id: int) -> int:
+        """Record the branch's current stock levels; return the snapshot id"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT COALESCE(MAX(movement_id), 0) FROM inventory_movement")
+            last_movement_id = cursor.fetchone()[0]
+            cursor.execute("""
+                INSERT INTO inventory_snapshot (branch_id, last_movement_id)
+                VALUES (?, ?)
+            """, (branch_id, last_movement_id))
+            snapshot_id = cursor.lastrowid
+            cursor.execute("""
+                INSERT INTO inventory_snapshot_item (snapshot_id, product_id, quantity)
+                SELECT ?, product_id, quantity_in_stock
+                FROM inventory
+                WHERE branch_id = ?
+            """, (snapshot_id, branch_id))
+            conn.commit()
+            return snapshot_id
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def snapshot_due_branches(self, every: Optional[int] = None) -> List[int]:
+        """Snapshot each branch with at least `every` ledger rows since its last snapshot.
+
+        Meant to run periodically (main.py runs it at startup). Returns the
+        branches snapshotted.
+        """
+        if every is None:
+            from Config.app_config import INVENTORY_SNAPSHOT_EVERY
+            every = INVENTORY_SNAPSHOT_EVERY
+        
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT b.branch_id, COALESCE(s.last_movement_id, 0), COALESCE(s.taken_at, '')
+            FROM branch b
+            LEFT JOIN inventory_snapshot s ON s.snapshot_id = (
+                SELECT snapshot_id FROM inventory_snapshot
+                WHERE branch_id = b.branch_id
+                ORDER BY taken_at DESC, snapshot_id DESC
+                LIMIT 1
+            )
+        """)
+        due = []
+        for branch_id, last_movement_id, taken_at in cursor.fetchall():
+            cursor.execute("""
+                SELECT COUNT(*) FROM (
+                    SELECT 1 FROM inventory_movement
+                    WHERE branch_id = ? AND created_at >= ? AND movement_id > ?
+                    LIMIT ?
+                )
+            """, (branch_id, taken_at, last_movement_id, every))
+            if cursor.fetchone()[0] >= every:
+                due.append(branch_id)
+        conn.close()
+        
+        for branch_id in due:
+            self.take_inventory_snapshot(branch_id)
+        return due
+
+    def find_branches_with_stock(self, product_id: int, min_quantity: int = 1,
+                                 exclude_branch_id: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Get (branch_id, quantity) for branches with at least min_quantity, most stock first"""
+        return [b for b in self.stock_index.branches_with(product_id, min_quantity)
+                if b[0] != exclude_branch_id]
+
+    def find_branches_for_items(self, items, exclude_branch_id: Optional[int] = None) -> List[int]:
+        """Get branches that can fill every (product_id, quantity) line, best stocked first"""
+        required = {}
+        for product_id, quantity in (items.items() if isinstance(items, dict) else items):
+            required[product_id] = required.get(product_id, 0) + quantity
+        return [branch_id for branch_id, _ in self.stock_index.branches_covering(required)
+                if branch_id != exclude_branch_id]
+
+    def check_stock_availability(self, product_id: int, branch_id: int, 
+                               required_quantity: int) -> Tuple[bool, int]:
+        """Check if sufficient stock is available"""
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT quantity_in_stock
+            FROM inventory
+            WHERE product_id = ? AND branch_id = ?
+        """, (product_id, branch_id))
+        
+        result = cursor.fetchone()
+        conn.close()
+        
+        if result:
+            available_stock = result[0]
+            return available_stock >= required_quantity, available_stock
         return False, 0
\ No newline at end of file
@@ -1,48 +1,120 @@
-from Config.database_config import DatabaseConfig
-import sqlite3
-from datetime import datetime
-
-class Order:
-    def __init__(self):
-        self.db = DatabaseConfig().create_connection()
-
-    def create_order(self, customer_id, branch_id, total_amount):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            INSERT INTO orders (customer_id, branch_id, order_date, total_amount)
-            VALUES (?, ?, ?, ?)
-        """, (customer_id, branch_id, datetime.now(), total_amount))
-        self.db.commit()
-        return cursor.lastrowid
-
-    def add_order_items(self, order_id, items):
-        cursor = self.db.cursor()
-        for item in items:
-            cursor.execute("""
-                INSERT INTO order_item (order_id, product_id, quantity, unit_price, subtotal)
-                VALUES (?, ?, ?, ?, ?)
-            """, (order_id, item['product_id'], item['quantity'], item['unit_price'], item['subtotal']))
-        self.db.commit()
-
-    def get_order_details(self, order_id):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            SELECT * FROM orders WHERE order_id = ?
-        """, (order_id,))
-        return cursor.fetchone()
-
-    def get_order_items(self, order_id):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            SELECT product_id, quantity, unit_price, subtotal
-            FROM order_item WHERE order_id = ?
-        """, (order_id,))
-        return cursor.fetchall()
-
-    def update_order_status(self, order_id, new_status):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            UPDATE orders SET order_status = ? WHERE order_id = ?
-        """, (new_status, order_id))
-        self.db.commit()
-        return cursor.rowcount > 0
+from Config.database_config import DatabaseConfig
+import sqlite3
+from datetime import datetime
+
+class Order:
+    # Max order ids bound into one IN (...) list
+    IN_CHUNK_SIZE = 500
+    ORDER_FIELDS = ('order_id', 'customer_id', 'branch_id', 'branch_name', 'order_date',
+                    'order_status', 'total_amount', 'payment_status', 'prescription_status')
+
+    def __init__(self, db_path='Data/pharmacy.db'):
+        self.db_config = DatabaseConfig(db_path)
+
+    def create_order(self, customer_id, branch_id, total_amount):
+        with self.db_config.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO orders (customer_id, branch_id, order_date, total_amount)
+                VALUES (?, ?, ?, ?)
+            """, (customer_id, branch_id, datetime.now(), total_amount))
+            conn.commit()
+            return cursor.lastrowid
+
+    def add_order_items(self, order_id, items):
+        with self.db_config.writer() as conn:
+            cursor = conn.cursor()
+            for item in items:
+                cursor.execute("""
+                    INSERT INTO order_item (order_id, product_id, quantity, unit_price, subtotal)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (order_id, item['product_id'], item['quantity'], item['unit_price'], item['subtotal']))
+            conn.commit()
+
+    def get_order_details(self, order_id):
+        with self.db_config.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT order_id, customer_id, branch_id, order_date, order_status, total_amount
+                FROM orders WHERE order_id = ?
+            """, (order_id,))
+            return cursor.fetchone()
+
+    def get_order_items(self, order_id):
+        with self.db_config.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT product_id, quantity, unit_price, subtotal
+                FROM order_item WHERE order_id = ?
+            """, (order_id,))
+            return cursor.fetchall()
+
+    def load_orders(self, order_ids):
+        """Load whole orders at once, keyed by order_id; unknown ids are left out.
+
+        Each order is a dict with the header (branch_name, payment_status
+        and prescription_status included, None when there is no payment or
+        prescription) and 'items', a list of (product_id, product_name,
+        quantity, unit_price, subtotal). Costs two queries per
+        IN_CHUNK_SIZE ids on one reader: headers, then every line.
+        """
+        order_ids = list(dict.fromkeys(order_ids))
+        orders = {}
+        if not order_ids:
+            return orders
+
+        with self.db_config.reader() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(order_ids), self.IN_CHUNK_SIZE):
+                chunk = order_ids[start:start + self.IN_CHUNK_SIZE]
+                placeholders = ', '.join('?' * len(chunk))
+                # An order with several prescriptions is Rejected if any is,
+                # else Pending if any is, else Validated
+                cursor.execute(f"""
+                    SELECT o.order_id, o.customer_id, o.branch_id, b.branch_name,
+                           o.order_date, o.order_status, o.total_amount,
+                           p.payment_status, rx.prescription_status
+                    FROM orders o
+                    LEFT JOIN branch b ON b.branch_id = o.branch_id
+                    LEFT JOIN payment p ON p.order_id = o.order_id
+                    LEFT JOIN (
+                        SELECT order_id,
+                               CASE MAX(CASE validation_status WHEN 'Rejected' THEN 2
+                                                               WHEN 'Pending' THEN 1 ELSE 0 END)
+                                   WHEN 2 THEN 'Rejected' WHEN 1 THEN 'Pending' ELSE 'Validated'
+                               END AS prescription_status
+                        FROM prescription
+                        WHERE order_id IN ({placeholders})
+                        GROUP BY order_id
+                    ) rx ON rx.order_id = o.order_id
+                    WHERE o.order_id IN ({placeholders})
+                """, (*chunk, *chunk))
+                for row in cursor.fetchall():
+                    orders[row[0]] = dict(zip(self.ORDER_FIELDS, row), items=[])
+
+                cursor.execute(f"""
+                    SELECT oi.order_id, oi.product_id, pr.product_name,
+                           oi.quantity, oi.unit_price, oi.subtotal
+                    FROM order_item oi
+                    LEFT JOIN product pr ON pr.product_id = oi.product_id
+                    WHERE oi.order_id IN ({placeholders})
+                    ORDER BY oi.order_id, oi.product_id
+                """, chunk)
+                for row in cursor.fetchall():
+                    if row[0] in orders:
+                        orders[row[0]]['items'].append(row[1:])
+
+        return {order_id: orders[order_id] for order_id in order_ids if order_id in orders}
+
+    def load_order(self, order_id):
+        """Load one whole order (see load_orders), or None if it does not exist"""
+        return self.load_orders([order_id]).get(order_id)
+
+    def update_order_status(self, order_id, new_status):
+        with self.db_config.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE orders SET order_status = ? WHERE order_id = ?
+            """, (new_status, order_id))
+            conn.commit()
+            return cursor.rowcount > 0
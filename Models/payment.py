@@ -1,32 +1,35 @@
-from Config.database_config import DatabaseConfig
-
-class Payment:
-    def __init__(self):
-        self.db = DatabaseConfig().create_connection()
-
-    def create_payment(self, order_id, payment_method_id, amount, reference=None):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            INSERT INTO payment (order_id, payment_method_id, payment_amount, transaction_reference, payment_status)
-            VALUES (?, ?, ?, ?, 'Completed')
-        """, (order_id, payment_method_id, amount, reference))
-        self.db.commit()
-        return cursor.lastrowid
-
-    def get_payment_by_order(self, order_id):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            SELECT * FROM payment
-            WHERE order_id = ?
-        """, (order_id,))
-        return cursor.fetchone()
-
-    def refund_payment(self, payment_id):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            UPDATE payment
-            SET payment_status = 'Refunded'
-            WHERE payment_id = ?
-        """, (payment_id,))
-        self.db.commit()
-        return cursor.rowcount > 0
+from Config.database_config import DatabaseConfig
+
+class Payment:
+    def __init__(self, db_path='Data/pharmacy.db'):
+        self.db_config = DatabaseConfig(db_path)
+
+    def create_payment(self, order_id, payment_method_id, amount, reference=None):
+        with self.db_config.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO payment (order_id, payment_method_id, payment_amount, transaction_reference, payment_status)
+                VALUES (?, ?, ?, ?, 'Completed')
+            """, (order_id, payment_method_id, amount, reference))
+            conn.commit()
+            return cursor.lastrowid
+
+    def get_payment_by_order(self, order_id):
+        with self.db_config.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM payment
+                WHERE order_id = ?
+            """, (order_id,))
+            return cursor.fetchone()
+
+    def refund_payment(self, payment_id):
+        with self.db_config.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE payment
+                SET payment_status = 'Refunded'
+                WHERE payment_id = ?
+            """, (payment_id,))
+            conn.commit()
+            return cursor.rowcount > 0
@@ -1,301 +1,427 @@
-import sqlite3
-from typing import Optional, List, Tuple, Dict
-
-
-class Product:
-    def __init__(self, db_path: str = 'Data/pharmacy.db'):
-        self.db_path = db_path
-
-    def connect_db(self):
-        return sqlite3.connect(self.db_path)
-
-    def get_products_by_branch(self, branch_id: int) -> List[Tuple]:
-        """Get all products available at a specific branch with inventory info"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT p.product_id, p.product_name, p.product_description, 
-                   p.unit_price, p.requires_prescription, p.product_category,
-                   COALESCE(i.quantity_in_stock, 0) as branch_stock
-            FROM product p
-            LEFT JOIN inventory i ON p.product_id = i.product_id AND i.branch_id = ?
-            ORDER BY p.product_name
-        """, (branch_id,))
-        
-        products = cursor.fetchall()
-        conn.close()
-        
-        return products
-
-    def search_products_by_branch(self, branch_id: int, search_term: str) -> List[Tuple]:
-        """Search products by name or description at a specific branch"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT p.product_id, p.product_name, p.product_description, 
-                   p.unit_price, p.requires_prescription, p.product_category,
-                   COALESCE(i.quantity_in_stock, 0) as branch_stock
-            FROM product p
-            LEFT JOIN inventory i ON p.product_id = i.product_id AND i.branch_id = ?
-            WHERE p.product_name LIKE ? OR p.product_description LIKE ?
-            ORDER BY p.product_name
-        """, (branch_id, f'%{search_term}%', f'%{search_term}%'))
-        
-        products = cursor.fetchall()
-        conn.close()
-        
-        return products
-
-    def get_product_details(self, product_id: int, branch_id: Optional[int] = None) -> Optional[Tuple]:
-        """Get detailed information about a product"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        if branch_id:
-            cursor.execute("""
-                SELECT p.product_id, p.product_name, p.product_description, 
-                       p.unit_price, p.requires_prescription, p.product_category,
-                       COALESCE(i.quantity_in_stock, 0) as branch_stock
-                FROM product p
-                LEFT JOIN inventory i ON p.product_id = i.product_id AND i.branch_id = ?
-                WHERE p.product_id = ?
-            """, (branch_id, product_id))
-        else:
-            cursor.execute("""
-                SELECT p.product_id, p.product_name, p.product_description, 
-                       p.unit_price, p.requires_prescription, p.product_category
-                FROM product p
-                WHERE p.product_id = ?
-            """, (product_id,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        return result
-
-    def add_product(self, product_name: str, product_description: str, 
-                   product_category: str, unit_price: float, 
-                   requires_prescription: bool = False) -> Tuple[bool, str]:
-        """Add a new product to the system"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT INTO product (product_name, product_description, product_category,
-                                   unit_price, requires_prescription)
-                VALUES (?, ?, ?, ?, ?)
-            """, (product_name, product_description, product_category, 
-                  unit_price, requires_prescription))
-            
-            conn.commit()
-            product_id = cursor.lastrowid
-            return True, f"Product added successfully with ID: {product_id}"
-            
-        except sqlite3.IntegrityError as e:
-            conn.rollback()
-            return False, f"Error: {str(e)}"
-        except Exception as e:
-            conn.rollback()
-            return False, f"Unexpected error: {str(e)}"
-        finally:
-            conn.close()
-
-    def update_product(self, product_id: int, **kwargs) -> Tuple[bool, str]:
-        """Update product information"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        try:
-            # Build dynamic update query
-            set_clauses = []
-            values = []
-            
-            valid_fields = ['product_name', 'product_description', 'product_category', 
-                          'unit_price', 'requires_prescription']
-            
-            for field, value in kwargs.items():
-                if field in valid_fields:
-                    set_clauses.append(f"{field} = ?")
-                    values.append(value)
-            
-            if not set_clauses:
-                return False, "No valid fields to update"
-            
-            values.append(product_id)
-            query = f"UPDATE product SET {', '.join(set_clauses)} WHERE product_id = ?"
-            
-            cursor.execute(query, values)
-            
-            if cursor.rowcount > 0:
-                conn.commit()
-                return True, "Product updated successfully"
-            else:
-                return False, "Product not found"
-                
-        except Exception as e:
-            conn.rollback()
-            return False, f"Error updating product: {str(e)}"
-        finally:
-            conn.close()
-
-    def get_products_requiring_prescription(self, branch_id: Optional[int] = None) -> List[Tuple]:
-        """Get all products that require prescription"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        if branch_id:
-            cursor.execute("""
-                SELECT p.product_id, p.product_name, p.product_description, 
-                       p.unit_price, COALESCE(i.quantity_in_stock, 0) as branch_stock
-                FROM product p
-                LEFT JOIN inventory i ON p.product_id = i.product_id AND i.branch_id = ?
-                WHERE p.requires_prescription = 1
-                ORDER BY p.product_name
-            """, (branch_id,))
-        else:
-            cursor.execute("""
-                SELECT p.product_id, p.product_name, p.product_description, p.unit_price
-                FROM product p
-                WHERE p.requires_prescription = 1
-                ORDER BY p.product_name
-            """)
-        
-        products = cursor.fetchall()
-        conn.close()
-        
-        return products
-
-    def get_product_categories(self) -> List[str]:
-        """Get all unique product categories"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT DISTINCT product_category 
-            FROM product 
-            WHERE product_category IS NOT NULL 
-            ORDER BY product_category
-        """)
-        
-        categories = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        
-        return categories
-
-    def get_products_by_category(self, category: str, branch_id: Optional[int] = None) -> List[Tuple]:
-        """Get all products in a specific category"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        if branch_id:
-            cursor.execute("""
-                SELECT p.product_id, p.product_name, p.product_description, 
-                       p.unit_price, p.requires_prescription,
-                       COALESCE(i.quantity_in_stock, 0) as branch_stock
-                FROM product p
-                LEFT JOIN inventory i ON p.product_id = i.product_id AND i.branch_id = ?
-                WHERE p.product_category = ?
-                ORDER BY p.product_name
-            """, (branch_id, category))
-        else:
-            cursor.execute("""
-                SELECT p.product_id, p.product_name, p.product_description, 
-                       p.unit_price, p.requires_prescription
-                FROM product p
-                WHERE p.product_category = ?
-                ORDER BY p.product_name
-            """, (category,))
-        
-        products = cursor.fetchall()
-        conn.close()
-        
-        return products
-
-    def check_stock_availability(self, product_id: int, branch_id: int, 
-                               required_quantity: int) -> bool:
-        """Check if sufficient stock is available at a branch"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT quantity_in_stock
-            FROM inventory
-            WHERE product_id = ? AND branch_id = ?
-        """, (product_id, branch_id))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            return result[0] >= required_quantity
-        return False
-
-    def get_top_selling_products(self, branch_id: int, start_date: str, 
-                               end_date: str, limit: int = 10) -> List[Dict]:
-        """Get top selling products for a branch in a date range"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT p.product_id, p.product_name, p.product_category,
-                   SUM(oi.quantity) as total_sold, 
-                   SUM(oi.subtotal) as total_revenue
-            FROM order_item oi
-            JOIN orders o ON oi.order_id = o.order_id
-            JOIN product p ON oi.product_id = p.product_id
-            WHERE o.branch_id = ? AND DATE(o.order_date) BETWEEN ? AND ?
-            GROUP BY p.product_id
-            ORDER BY total_sold DESC
-            LIMIT ?
-        """, (branch_id, start_date, end_date, limit))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [{
-            'product_id': result[0],
-            'product_name': result[1],
-            'category': result[2],
-            'total_sold': result[3],
-            'total_revenue': result[4]
-        } for result in results]
-
-    def delete_product(self, product_id: int) -> Tuple[bool, str]:
-        """Delete a product (only if not in any orders)"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        
-        try:
-            # Check if product is in any orders
-            cursor.execute("""
-                SELECT COUNT(*) FROM order_item WHERE product_id = ?
-            """, (product_id,))
-            
-            if cursor.fetchone()[0] > 0:
-                return False, "Cannot delete product that has been ordered"
-            
-            # Check if product is in any inventory
-            cursor.execute("""
-                SELECT COUNT(*) FROM inventory WHERE product_id = ?
-            """, (product_id,))
-            
-            if cursor.fetchone()[0] > 0:
-                return False, "Cannot delete product that exists in inventory"
-            
-            # Delete the product
-            cursor.execute("DELETE FROM product WHERE product_id = ?", (product_id,))
-            
-            if cursor.rowcount > 0:
-                conn.commit()
-                return True, "Product deleted successfully"
-            else:
-                return False, "Product not found"
-                
-        except Exception as e:
-            conn.rollback()
-            return False, f"Error deleting product: {str(e)}"
-        finally:
+import re
+import sqlite3
+from typing import Optional, List, Tuple, Dict
+
+from Config.database_config import DatabaseConfig
+from Models.catalog_cache import CatalogCache, bump_catalog_version, normalize_search_text
+from Models.stock_index import BranchStockIndex
+
+_SEARCH_TOKEN = re.compile(r'\w+')
+
+
+def build_fts_query(search_term: str, column: Optional[str] = None) -> Optional[str]:
+    """Turn free text into an FTS5 query matching every word as a prefix"""
+    tokens = _SEARCH_TOKEN.findall(normalize_search_text(search_term))
+    if not tokens:
+        return None
+    query = ' '.join(f'"{token}"*' for token in tokens)
+    return f"{column} : ({query})" if column else query
+
+
+class Product:
+    # Max product ids bound into one IN (...) list
+    IN_CHUNK_SIZE = 500
+
+    def __init__(self, db_path: str = 'Data/pharmacy.db'):
+        self.db_path = db_path
+        self.db_config = DatabaseConfig(db_path)
+        self.catalog = CatalogCache.for_database(self.db_config)
+        self.stock_index = BranchStockIndex.for_database(self.db_config)
+
+    def connect_db(self, readonly=False):
+        return self.db_config.get_connection(readonly)
+
+    def _branch_stock(self, branch_id: int, product_ids: List[int]) -> Dict[int, int]:
+        """Get quantity_in_stock at a branch for the given products (missing = no row)"""
+        stock = {}
+        if not product_ids:
+            return stock
+
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        try:
+            for start in range(0, len(product_ids), self.IN_CHUNK_SIZE):
+                chunk = product_ids[start:start + self.IN_CHUNK_SIZE]
+                placeholders = ', '.join('?' * len(chunk))
+                cursor.execute(f"""
+                    SELECT product_id, quantity_in_stock
+                    FROM inventory
+                    WHERE branch_id = ? AND product_id IN ({placeholders})
+                """, (branch_id, *chunk))
+                stock.update(cursor.fetchall())
+        finally:
+            conn.close()
+        
+        return stock
+
+    def _catalog_row(self, cursor, product_id: int) -> Optional[Tuple]:
+        """Read a product's row in the shape CatalogSnapshot stores"""
+        cursor.execute("""
+            SELECT product_id, product_name, product_description,
+                   unit_price, requires_prescription, product_category
+            FROM product
+            WHERE product_id = ?
+        """, (product_id,))
+        return cursor.fetchone()
+
+    def get_products_by_branch(self, branch_id: int) -> List[Tuple]:
+        """Get all products available at a specific branch with inventory info"""
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT p.product_id, p.product_name, p.product_description, 
+                   p.unit_price, p.requires_prescription, p.product_category,
+                   COALESCE(i.quantity_in_stock, 0) as branch_stock
+            FROM product p
+            LEFT JOIN inventory i ON p.product_id = i.product_id AND i.branch_id = ?
+            ORDER BY p.product_name
+        """, (branch_id,))
+        
+        products = cursor.fetchall()
+        conn.close()
+        
+        return products
+
+    # Sort keys accepted by browse_products_by_branch -> indexed column
+    BROWSE_SORT_COLUMNS = {'name': 'product_name', 'price': 'unit_price'}
+
+    def browse_products_by_branch(self, branch_id: int, page_size: int = 20,
+                                  after: Optional[Tuple] = None, before: Optional[Tuple] = None,
+                                  category: Optional[str] = None, in_stock_only: bool = False,
+                                  sort_by: str = 'name', descending: bool = False) -> Tuple[List[Tuple], bool]:
+        """Get one page of a branch's products using keyset pagination.
+
+        after/before are (sort value, product_id) keys taken from the last or
+        first row of the current page (see browse_key). Returns the rows in
+        display order and whether more rows exist in the direction paged.
+        """
+        if sort_by not in self.BROWSE_SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {sort_by}")
+        column = self.BROWSE_SORT_COLUMNS[sort_by]
+
+        # Paging backwards walks the index the other way and flips the page
+        backwards = before is not None
+        scan_descending = descending != backwards
+        direction = "DESC" if scan_descending else "ASC"
+
+        conditions = []
+        params = [branch_id]
+        if category is not None:
+            conditions.append("p.product_category = ?")
+            params.append(category)
+        if in_stock_only:
+            conditions.append("i.quantity_in_stock > 0")
+        cursor_key = before if backwards else after
+        if cursor_key is not None:
+            conditions.append(f"(p.{column}, p.product_id) {'<' if scan_descending else '>'} (?, ?)")
+            params.extend(cursor_key)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+
+        cursor.execute(f"""
+            SELECT p.product_id, p.product_name, p.product_description,
+                   p.unit_price, p.requires_prescription, p.product_category,
+                   COALESCE(i.quantity_in_stock, 0) as branch_stock
+            FROM product p
+            LEFT JOIN inventory i ON p.product_id = i.product_id AND i.branch_id = ?
+            {where}
+            ORDER BY p.{column} {direction}, p.product_id {direction}
+            LIMIT ?
+        """, (*params, page_size + 1))
+
+        # One extra row tells whether another page exists
+        products = cursor.fetchall()
+        conn.close()
+
+        has_more = len(products) > page_size
+        products = products[:page_size]
+        if backwards:
+            products.reverse()
+        return products, has_more
+
+    def browse_key(self, row: Tuple, sort_by: str = 'name') -> Tuple:
+        """Get the keyset cursor for a row returned by browse_products_by_branch"""
+        return (row[3] if sort_by == 'price' else row[1]), row[0]
+
+    def search_products_by_branch(self, branch_id: int, search_term: str) -> List[Tuple]:
+        """Search products by name or description at a specific branch, best matches first"""
+        fts_query = build_fts_query(search_term)
+        if fts_query is None:
+            return []
+
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        # bm25 weights: a hit in the name counts ten times one in the description
+        cursor.execute("""
+            SELECT p.product_id, p.product_name, p.product_description, 
+                   p.unit_price, p.requires_prescription, p.product_category,
+                   COALESCE(i.quantity_in_stock, 0) as branch_stock
+            FROM product_fts f
+            JOIN product p ON p.product_id = f.rowid
+            LEFT JOIN inventory i ON p.product_id = i.product_id AND i.branch_id = ?
+            WHERE product_fts MATCH ?
+            ORDER BY bm25(product_fts, 10.0, 1.0), p.product_name
+        """, (branch_id, fts_query))
+        
+        products = cursor.fetchall()
+        conn.close()
+        
+        return products
+
+    def autocomplete_products(self, prefix: str, branch_id: Optional[int] = None,
+                              limit: int = 10) -> List[Tuple]:
+        """Suggest products whose name (or a word in it) starts with prefix.
+
+        Matching runs on the in-memory catalog and branch stock comes from
+        the in-memory stock index (at most AUTOCOMPLETE_STOCK_MAX_AGE old),
+        so a keystroke normally costs no database round trip.
+        """
+        from Config.app_config import AUTOCOMPLETE_STOCK_MAX_AGE
+
+        snapshot = self.catalog.snapshot()
+        product_ids = snapshot.complete(prefix, limit)
+        suggestions = [snapshot.products[pid] for pid in product_ids]
+        
+        if branch_id:
+            stock = self.stock_index.branch_stock(branch_id, product_ids, max_age=AUTOCOMPLETE_STOCK_MAX_AGE)
+            return [(p[0], p[1], p[3], stock.get(p[0], 0)) for p in suggestions]
+        return [(p[0], p[1], p[3]) for p in suggestions]
+
+    def get_product_details(self, product_id: int, branch_id: Optional[int] = None) -> Optional[Tuple]:
+        """Get detailed information about a product (catalog data served from memory)"""
+        product = self.catalog.snapshot().products.get(product_id)
+        if product is None:
+            return None
+        
+        if branch_id:
+            stock = self._branch_stock(branch_id, [product_id])
+            return product + (stock.get(product_id, 0),)
+        return product
+
+    def get_product_details_many(self, product_ids: List[int],
+                                 branch_id: Optional[int] = None) -> Dict[int, Tuple]:
+        """Get details for many products at once, keyed by product_id.
+
+        Same row shape as get_product_details; unknown ids are left out.
+        Branch stock for the whole list costs one query per IN_CHUNK_SIZE ids.
+        """
+        products = self.catalog.snapshot().products
+        details = {pid: products[pid] for pid in dict.fromkeys(product_ids) if pid in products}
+        
+        if branch_id:
+            stock = self._branch_stock(branch_id, list(details))
+            return {pid: row + (stock.get(pid, 0),) for pid, row in details.items()}
+        return details
+
+    def add_product(self, product_name: str, product_description: str, 
+                   product_category: str, unit_price: float, 
+                   requires_prescription: bool = False) -> Tuple[bool, str]:
+        """Add a new product to the system"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                INSERT INTO product (product_name, product_description, product_category,
+                                   unit_price, requires_prescription)
+                VALUES (?, ?, ?, ?, ?)
+            """, (product_name, product_description, product_category, 
+                  unit_price, requires_prescription))
+            product_id = cursor.lastrowid
+            version = bump_catalog_version(cursor)
+            row = self._catalog_row(cursor, product_id)
+            
+            conn.commit()
+            self.catalog.apply(version, product_id, row)
+            return True, f"Product added successfully with ID: {product_id}"
+            
+        except sqlite3.IntegrityError as e:
+            conn.rollback()
+            return False, f"Error: {str(e)}"
+        except Exception as e:
+            conn.rollback()
+            return False, f"Unexpected error: {str(e)}"
+        finally:
+            conn.close()
+
+    def update_product(self, product_id: int, **kwargs) -> Tuple[bool, str]:
+        """Update product information"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            # Build dynamic update query
+            set_clauses = []
+            values = []
+            
+            valid_fields = ['product_name', 'product_description', 'product_category', 
+                          'unit_price', 'requires_prescription']
+            
+            for field, value in kwargs.items():
+                if field in valid_fields:
+                    set_clauses.append(f"{field} = ?")
+                    values.append(value)
+            
+            if not set_clauses:
+                return False, "No valid fields to update"
+            
+            values.append(product_id)
+            query = f"UPDATE product SET {', '.join(set_clauses)} WHERE product_id = ?"
+            
+            cursor.execute(query, values)
+            
+            if cursor.rowcount > 0:
+                version = bump_catalog_version(cursor)
+                row = self._catalog_row(cursor, product_id)
+                conn.commit()
+                self.catalog.apply(version, product_id, row)
+                return True, "Product updated successfully"
+            else:
+                return False, "Product not found"
+                
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error updating product: {str(e)}"
+        finally:
+            conn.close()
+
+    def get_products_requiring_prescription(self, branch_id: Optional[int] = None) -> List[Tuple]:
+        """Get all products that require prescription"""
+        snapshot = self.catalog.snapshot()
+        products = [snapshot.products[pid] for pid in snapshot.prescription_ids]
+        
+        if branch_id:
+            stock = self._branch_stock(branch_id, snapshot.prescription_ids)
+            return [p[:4] + (stock.get(p[0], 0),) for p in products]
+        return [p[:4] for p in products]
+
+    def get_product_categories(self) -> List[str]:
+        """Get all unique product categories"""
+        return list(self.catalog.snapshot().categories)
+
+    def get_products_by_category(self, category: str, branch_id: Optional[int] = None) -> List[Tuple]:
+        """Get all products in a specific category"""
+        snapshot = self.catalog.snapshot()
+        product_ids = snapshot.by_category.get(category, [])
+        products = [snapshot.products[pid] for pid in product_ids]
+        
+        if branch_id:
+            stock = self._branch_stock(branch_id, product_ids)
+            return [p[:5] + (stock.get(p[0], 0),) for p in products]
+        return [p[:5] for p in products]
+
+    def check_stock_availability(self, product_id: int, branch_id: int, 
+                               required_quantity: int) -> bool:
+        """Check if sufficient stock is available at a branch"""
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT quantity_in_stock
+            FROM inventory
+            WHERE product_id = ? AND branch_id = ?
+        """, (product_id, branch_id))
+        
+        result = cursor.fetchone()
+        conn.close()
+        
+        if result:
+            return result[0] >= required_quantity
+        return False
+
+    def check_stock_availability_many(self, items, branch_id: int) -> Dict[int, bool]:
+        """Check stock for many products at a branch in one round trip.
+
+        items maps product_id -> required quantity (or is an iterable of
+        (product_id, quantity) pairs; repeated ids are summed). Returns
+        product_id -> whether the branch has enough.
+        """
+        required = {}
+        for product_id, quantity in (items.items() if isinstance(items, dict) else items):
+            required[product_id] = required.get(product_id, 0) + quantity
+        
+        stock = self._branch_stock(branch_id, list(required))
+        return {pid: pid in stock and stock[pid] >= quantity
+                for pid, quantity in required.items()}
+
+    def get_top_selling_products(self, branch_id: int, start_date: str, 
+                               end_date: str, limit: int = 10) -> List[Dict]:
+        """Get top selling products for a branch in a date range"""
+        conn = self.connect_db(readonly=True)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT p.product_id, p.product_name, p.product_category,
+                   SUM(oi.quantity) as total_sold, 
+                   SUM(oi.subtotal) as total_revenue
+            FROM order_item oi
+            JOIN orders o ON oi.order_id = o.order_id
+            JOIN product p ON oi.product_id = p.product_id
+            WHERE o.branch_id = ? AND DATE(o.order_date) BETWEEN ? AND ?
+            GROUP BY p.product_id
+            ORDER BY total_sold DESC
+            LIMIT ?
+        """, (branch_id, start_date, end_date, limit))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return [{
+            'product_id': result[0],
+            'product_name': result[1],
+            'category': result[2],
+            'total_sold': result[3],
+            'total_revenue': result[4]
+        } for result in results]
+
+    def delete_product(self, product_id: int) -> Tuple[bool, str]:
+        """Delete a product (only if not in any orders)"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        
+        try:
+            # Check if product is in any orders
+            cursor.execute("""
+                SELECT COUNT(*) FROM order_item WHERE product_id = ?
+            """, (product_id,))
+            
+            if cursor.fetchone()[0] > 0:
+                return False, "Cannot delete product that has been ordered"
+            
+            # Check if product is in any inventory
+            cursor.execute("""
+                SELECT COUNT(*) FROM inventory WHERE product_id = ?
+            """, (product_id,))
+            
+            if cursor.fetchone()[0] > 0:
+                return False, "Cannot delete product that exists in inventory"
+            
+            # Ledger rows keep the product's stock history
+            cursor.execute("""
+                SELECT 1 FROM inventory_movement WHERE product_id = ? LIMIT 1
+            """, (product_id,))
+            
+            if cursor.fetchone():
+                return False, "Cannot delete product with inventory history"
+            
+            # Delete the product
+            cursor.execute("DELETE FROM product WHERE product_id = ?", (product_id,))
+            
+            if cursor.rowcount > 0:
+                version = bump_catalog_version(cursor)
+                conn.commit()
+                self.catalog.apply(version, product_id, None)
+                return True, "Product deleted successfully"
+            else:
+                return False, "Product not found"
+                
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error deleting product: {str(e)}"
+        finally:
             conn.close()
\ No newline at end of file
@@ -0,0 +1,132 @@
+# Models/stock_index.py
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from Config.database_config import DatabaseConfig
+
+
+class BranchStockIndex:
+    """In-memory product_id -> {branch_id: quantity} map shared per database file.
+
+    Loaded once from inventory, then kept current by replaying
+    inventory_movement rows past the last movement_id applied. Every stock
+    change is logged there (see Models.inventory.record_movement), including
+    other processes' changes, so a lookup costs one rowid range read that is
+    usually empty.
+    """
+
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, db_config: DatabaseConfig):
+        self.db_config = db_config
+        self._stock: Dict[int, Dict[int, int]] = {}
+        self._last_movement_id = None
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_database(cls, db_config: DatabaseConfig) -> 'BranchStockIndex':
+        """Get the index shared by every model using this database file"""
+        key = os.path.abspath(db_config.get_db_path())
+        with cls._indexes_lock:
+            index = cls._indexes.get(key)
+            if index is None:
+                index = cls._indexes[key] = cls(db_config)
+            return index
+
+    def _refresh(self):
+        # Always a real reader, even on a thread holding the writer: reader()
+        # would hand back the writer, whose uncommitted ledger rows the index
+        # would keep if that transaction rolled back
+        self._refreshed_at = time.monotonic()
+        conn = self.db_config.read_pool.acquire()
+        try:
+            if self._last_movement_id is None:
+                self._load(conn)
+                return
+            rows = conn.execute("""
+                SELECT movement_id, product_id, branch_id, quantity_change
+                FROM inventory_movement
+                WHERE movement_id > ?
+                ORDER BY movement_id
+            """, (self._last_movement_id,)).fetchall()
+        finally:
+            conn.close()
+        for movement_id, product_id, branch_id, change in rows:
+            branches = self._stock.setdefault(product_id, {})
+            branches[branch_id] = branches.get(branch_id, 0) + change
+            self._last_movement_id = movement_id
+
+    def _load(self, conn):
+        # Read both in one transaction so the stock matches the ledger position
+        conn.execute("BEGIN")
+        try:
+            last_movement_id = conn.execute(
+                "SELECT COALESCE(MAX(movement_id), 0) FROM inventory_movement").fetchone()[0]
+            stock = {}
+            for product_id, branch_id, quantity in conn.execute(
+                    "SELECT product_id, branch_id, quantity_in_stock FROM inventory"):
+                stock.setdefault(product_id, {})[branch_id] = quantity
+        finally:
+            conn.rollback()
+        self._stock = stock
+        self._last_movement_id = last_movement_id
+
+    def reload(self):
+        """Drop the index; the next lookup rebuilds it from inventory"""
+        with self._lock:
+            self._last_movement_id = None
+
+    def stock_by_branch(self, product_id: int) -> Dict[int, int]:
+        """Get {branch_id: quantity} for a product"""
+        with self._lock:
+            self._refresh()
+            return dict(self._stock.get(product_id, {}))
+
+    def branch_stock(self, branch_id: int, product_ids: List[int], max_age: float = 0.0) -> Dict[int, int]:
+        """Get {product_id: quantity} at one branch (missing = not stocked there).
+
+        The ledger is re-read only if the last read is older than max_age
+        seconds, so callers that tolerate slightly stale stock (autocomplete,
+        once per keystroke) are answered from memory.
+        """
+        with self._lock:
+            if self._last_movement_id is None or time.monotonic() - self._refreshed_at >= max_age:
+                self._refresh()
+            stock = {}
+            for product_id in product_ids:
+                quantity = self._stock.get(product_id, {}).get(branch_id)
+                if quantity is not None:
+                    stock[product_id] = quantity
+            return stock
+
+    def branches_with(self, product_id: int, min_quantity: int = 1) -> List[Tuple[int, int]]:
+        """Get (branch_id, quantity) for branches holding at least min_quantity, most stock first"""
+        branches = [(branch_id, quantity) for branch_id, quantity in self.stock_by_branch(product_id).items()
+                    if quantity >= min_quantity]
+        return sorted(branches, key=lambda b: (-b[1], b[0]))
+
+    def branches_covering(self, items: Dict[int, int]) -> List[Tuple[int, float]]:
+        """Get branches that can fill every line, as (branch_id, coverage).
+
+        coverage is the smallest stock/needed ratio over the lines, so the
+        branch least likely to run short comes first.
+        """
+        with self._lock:
+            self._refresh()
+            candidates = None
+            for product_id, needed in items.items():
+                if needed <= 0:
+                    continue
+                branches = self._stock.get(product_id, {})
+                ratios = {b: q / needed for b, q in branches.items() if q >= needed}
+                if candidates is None:
+                    candidates = ratios
+                else:
+                    candidates = {b: min(r, ratios[b]) for b, r in candidates.items() if b in ratios}
+                if not candidates:
+                    return []
+        return sorted((candidates or {}).items(), key=lambda b: (-b[1], b[0]))
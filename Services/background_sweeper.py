@@ -0,0 +1,115 @@
+# Services/background_sweeper.py
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from Config.database_config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedSweeper(ABC):
+    """Works through a backlog of rows a bounded batch at a time, periodically on a daemon thread.
+
+    Subclasses implement _delete_batch, which takes rows out of the backlog
+    (expired carts, old idempotency keys, pending low-stock alerts). Every
+    batch is its own short write transaction and the writer is handed back
+    between batches, so other writers wait for at most one batch.
+    """
+
+    thread_name = "sweeper"
+    # Name of the metric counting deleted rows
+    rows_metric = 'rows_deleted'
+
+    def __init__(self, db_path, batch_size, interval):
+        self.db_config = DatabaseConfig(db_path)
+        self.batch_size = batch_size
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'sweeps': 0,
+            'batches': 0,
+            self.rows_metric: 0,
+            'last_sweep_at': None,
+            'last_sweep_rows': 0,
+            'max_batch_ms': 0.0,
+            'errors': 0,
+        }
+
+    @abstractmethod
+    def _delete_batch(self, cursor, limit):
+        """Delete up to limit expired rows; return them (from RETURNING)"""
+
+    def _record_sweep(self, rows, metrics):
+        """Update subclass metrics with every row deleted by one sweep (metrics lock held)"""
+
+    def sweep_batch(self):
+        """Delete one batch of expired rows and return them"""
+        start = time.perf_counter()
+        with self.db_config.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                rows = self._delete_batch(cursor, self.batch_size)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._metrics_lock:
+            self._metrics['batches'] += 1
+            self._metrics['max_batch_ms'] = max(self._metrics['max_batch_ms'], elapsed_ms)
+        return rows
+
+    def sweep(self):
+        """Delete every expired row, one batch at a time; return the number removed"""
+        deleted = []
+        while not self._stop.is_set():
+            rows = self.sweep_batch()
+            deleted.extend(rows)
+            if len(rows) < self.batch_size:
+                break
+
+        with self._metrics_lock:
+            self._metrics['sweeps'] += 1
+            self._metrics[self.rows_metric] += len(deleted)
+            self._metrics['last_sweep_at'] = time.time()
+            self._metrics['last_sweep_rows'] = len(deleted)
+            self._record_sweep(deleted, self._metrics)
+        if deleted:
+            logger.info("%s: %d %s", self.thread_name, len(deleted), self.rows_metric)
+        return len(deleted)
+
+    def metrics(self):
+        """Get a copy of the sweep counters"""
+        with self._metrics_lock:
+            return dict(self._metrics)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception:
+                with self._metrics_lock:
+                    self._metrics['errors'] += 1
+                logger.exception("%s failed", self.thread_name)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Sweep now and then every interval seconds on a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop the background thread after its current batch"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
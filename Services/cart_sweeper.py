@@ -0,0 +1,40 @@
+# Services/cart_sweeper.py
+from Services.background_sweeper import BatchedSweeper
+
+
+class CartExpirySweeper(BatchedSweeper):
+    """Deletes carts nobody has touched for ttl_seconds, in the background.
+
+    Carts do not hold stock (it is taken from inventory at checkout), so
+    expiring one only removes its lines; nothing goes back to inventory.
+    Batches take the oldest reserved_at values first (idx_cart_reserved_at).
+    """
+
+    thread_name = "cart-expiry-sweeper"
+    rows_metric = 'lines_expired'
+
+    def __init__(self, db_path='Data/pharmacy.db', ttl_seconds=None, batch_size=None, interval=None):
+        from Config import app_config
+        super().__init__(db_path,
+                         batch_size or app_config.CART_SWEEP_BATCH_SIZE,
+                         app_config.CART_SWEEP_INTERVAL if interval is None else interval)
+        self.ttl_seconds = app_config.CART_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._metrics['carts_expired'] = 0
+        self._metrics['last_sweep_lines'] = 0
+
+    def _delete_batch(self, cursor, limit):
+        cursor.execute("""
+            DELETE FROM cart
+            WHERE cart_id IN (
+                SELECT cart_id FROM cart
+                WHERE reserved_at < datetime('now', ?)
+                ORDER BY reserved_at
+                LIMIT ?
+            )
+            RETURNING customer_id
+        """, (f"-{int(self.ttl_seconds)} seconds", limit))
+        return cursor.fetchall()
+
+    def _record_sweep(self, rows, metrics):
+        metrics['carts_expired'] += len({row[0] for row in rows})
+        metrics['last_sweep_lines'] = len(rows)
@@ -0,0 +1,71 @@
+# Services/idempotency.py
+"""Idempotency keys for checkout and payment.
+
+A caller that may retry passes the same key on every attempt. The first
+attempt to succeed stores its result under (scope, key) in the same
+transaction as its writes; later attempts find it and get that result
+back, marked "replayed", without doing anything. Failed attempts store
+nothing, so they can be retried for real.
+"""
+import hashlib
+import json
+
+from Services.background_sweeper import BatchedSweeper
+
+
+def _fingerprint(request):
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def replay(cursor, scope, key, request):
+    """Get the stored result for key, or None if it has not been used.
+
+    A key reused for a different request gets a failure result.
+    """
+    cursor.execute("""
+        SELECT request_fingerprint, response FROM idempotency_key
+        WHERE scope = ? AND idempotency_key = ?
+    """, (scope, key))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    if row[0] != _fingerprint(request):
+        return {
+            "success": False,
+            "message": "Idempotency key was already used for a different request"
+        }
+    return dict(json.loads(row[1]), replayed=True)
+
+
+def remember(cursor, scope, key, request, result):
+    """Store a result under key; call in the transaction that produced it"""
+    cursor.execute("""
+        INSERT INTO idempotency_key (scope, idempotency_key, request_fingerprint, response)
+        VALUES (?, ?, ?, ?)
+    """, (scope, key, _fingerprint(request), json.dumps(result)))
+
+
+class IdempotencyKeyPurger(BatchedSweeper):
+    """Deletes idempotency keys older than ttl_seconds, in the background"""
+
+    thread_name = "idempotency-key-purger"
+
+    def __init__(self, db_path='Data/pharmacy.db', ttl_seconds=None, batch_size=None, interval=None):
+        from Config import app_config
+        super().__init__(db_path,
+                         batch_size or app_config.IDEMPOTENCY_PURGE_BATCH_SIZE,
+                         app_config.IDEMPOTENCY_PURGE_INTERVAL if interval is None else interval)
+        self.ttl_seconds = app_config.IDEMPOTENCY_KEY_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+
+    def _delete_batch(self, cursor, limit):
+        cursor.execute("""
+            DELETE FROM idempotency_key
+            WHERE (scope, idempotency_key) IN (
+                SELECT scope, idempotency_key FROM idempotency_key
+                WHERE created_at < datetime('now', ?)
+                ORDER BY created_at
+                LIMIT ?
+            )
+            RETURNING scope
+        """, (f"-{int(self.ttl_seconds)} seconds", limit))
+        return cursor.fetchall()
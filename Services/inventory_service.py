@@ -1,51 +1,116 @@
-from Config.database_config import DatabaseConfig
-from Config.app_config import LOW_STOCK_THRESHOLD
-import sqlite3
-from datetime import datetime
-
-class InventoryService:
-    def __init__(self):
-        self.db = DatabaseConfig().create_connection()
-
-    def get_inventory_by_branch(self, branch_id):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            SELECT i.inventory_id, p.product_name, i.quantity_in_stock, i.last_restocked
-            FROM inventory i
-            JOIN product p ON i.product_id = p.product_id
-            WHERE i.branch_id = ?
-            ORDER BY p.product_name
-        """, (branch_id,))
-        return cursor.fetchall()
-
-    def update_stock(self, inventory_id, new_quantity):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            UPDATE inventory
-            SET quantity_in_stock = ?, last_restocked = ?
-            WHERE inventory_id = ?
-        """, (new_quantity, datetime.now().date(), inventory_id))
-        self.db.commit()
-        return cursor.rowcount > 0
-
-    def add_new_inventory_item(self, branch_id, product_id, quantity):
-        cursor = self.db.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO inventory (branch_id, product_id, quantity_in_stock, last_restocked)
-                VALUES (?, ?, ?, ?)
-            """, (branch_id, product_id, quantity, datetime.now().date()))
-            self.db.commit()
-            return True, "Inventory item added successfully"
-        except sqlite3.IntegrityError:
-            return False, "This product already exists in the branch inventory"
-
-    def get_low_stock_items(self, branch_id, threshold=LOW_STOCK_THRESHOLD):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            SELECT i.inventory_id, p.product_name, i.quantity_in_stock
-            FROM inventory i
-            JOIN product p ON i.product_id = p.product_id
-            WHERE i.branch_id = ? AND i.quantity_in_stock <= ?
-        """, (branch_id, threshold))
-        return cursor.fetchall()
+from Config.database_config import DatabaseConfig
+from Models.inventory import Inventory, record_movement
+from Services.notification_service import NotificationService
+import csv
+import sqlite3
+from datetime import datetime
+
+class InventoryService:
+    def __init__(self, db_path='Data/pharmacy.db'):
+        self.db_config = DatabaseConfig(db_path)
+        self.notifications = NotificationService(db_path)
+        self.inventory_model = Inventory(db_path)
+
+    def get_inventory_by_branch(self, branch_id):
+        with self.db_config.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT i.inventory_id, p.product_name, i.quantity_in_stock, i.last_restocked
+                FROM inventory i
+                JOIN product p ON i.product_id = p.product_id
+                WHERE i.branch_id = ?
+                ORDER BY p.product_name
+            """, (branch_id,))
+            return cursor.fetchall()
+
+    def update_stock(self, inventory_id, new_quantity, reason=None, reference=None):
+        with self.db_config.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                SELECT branch_id, product_id, quantity_in_stock
+                FROM inventory
+                WHERE inventory_id = ?
+            """, (inventory_id,))
+            item = cursor.fetchone()
+            if not item:
+                conn.rollback()
+                return False
+
+            cursor.execute("""
+                UPDATE inventory
+                SET quantity_in_stock = ?, last_restocked = ?
+                WHERE inventory_id = ?
+            """, (new_quantity, datetime.now().date(), inventory_id))
+            record_movement(cursor, item[0], item[1], 'adjustment', new_quantity - item[2],
+                            reason or "Stock count", reference)
+            conn.commit()
+
+        self.notifications.publish_low_stock_alerts()
+        return True
+
+    def add_new_inventory_item(self, branch_id, product_id, quantity):
+        with self.db_config.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    INSERT INTO inventory (branch_id, product_id, quantity_in_stock, last_restocked)
+                    VALUES (?, ?, ?, ?)
+                """, (branch_id, product_id, quantity, datetime.now().date()))
+                record_movement(cursor, branch_id, product_id, 'restock', quantity, "Initial stock")
+                conn.commit()
+                return True, "Inventory item added successfully"
+            except sqlite3.IntegrityError:
+                return False, "This product already exists in the branch inventory"
+
+    def apply_shipment_file(self, branch_id, path, reference=None):
+        """Apply a shipment CSV (product, quantity, lot columns) to a branch in one commit.
+
+        product may be a product id or name. Returns the summary from
+        Inventory.apply_shipment; unreadable quantities are rejected per line.
+        """
+        lines = []
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                row = {(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+                product = row.get('product') or row.get('product_id') or row.get('product_name') or ''
+                try:
+                    quantity = int(row.get('quantity', ''))
+                except ValueError:
+                    quantity = None
+                lines.append((reader.line_num, product, quantity, row.get('lot') or None))
+
+        summary = self.inventory_model.apply_shipment(branch_id, lines, reference)
+        self.notifications.publish_low_stock_alerts()
+        return summary
+
+    def refresh_reorder_points(self, branch_id=None):
+        """Recompute demand forecasts and reorder-point thresholds, then send any new low-stock alerts"""
+        # NumPy is only needed here, so the terminals still start without it
+        from Models.demand_forecast import DemandForecast
+
+        count = DemandForecast(self.db_config.get_db_path()).refresh(branch_id)
+        self.notifications.publish_low_stock_alerts()
+        return count
+
+    def get_low_stock_items(self, branch_id, threshold=None):
+        """Items at or below their threshold (from low_stock_alert unless a cutoff is given)"""
+        with self.db_config.reader() as conn:
+            cursor = conn.cursor()
+            if threshold is None:
+                cursor.execute("""
+                    SELECT i.inventory_id, p.product_name, i.quantity_in_stock
+                    FROM low_stock_alert a
+                    JOIN inventory i ON i.branch_id = a.branch_id AND i.product_id = a.product_id
+                    JOIN product p ON i.product_id = p.product_id
+                    WHERE a.branch_id = ?
+                """, (branch_id,))
+            else:
+                cursor.execute("""
+                    SELECT i.inventory_id, p.product_name, i.quantity_in_stock
+                    FROM inventory i
+                    JOIN product p ON i.product_id = p.product_id
+                    WHERE i.branch_id = ? AND i.quantity_in_stock <= ?
+                """, (branch_id, threshold))
+            return cursor.fetchall()
@@ -1,42 +1,173 @@
-from Config.database_config import DatabaseConfig
-from datetime import datetime
-
-class NotificationService:
-    def __init__(self):
-        self.db = DatabaseConfig().create_connection()
-
-    def send_notification(self, customer_id, message, notification_type='General', order_id=None, delivery_method='In_App'):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            INSERT INTO notification (
-                customer_id, order_id, notification_type,
-                message, sent_date, is_read, delivery_method
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            customer_id, order_id, notification_type,
-            message, datetime.now(), 0, delivery_method
-        ))
-        self.db.commit()
-        return cursor.lastrowid
-
-    def mark_as_read(self, notification_id):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            UPDATE notification SET is_read = 1 WHERE notification_id = ?
-        """, (notification_id,))
-        self.db.commit()
-        return cursor.rowcount > 0
-
-    def get_customer_notifications(self, customer_id, unread_only=False):
-        cursor = self.db.cursor()
-        query = """
-            SELECT notification_id, message, sent_date, is_read
-            FROM notification
-            WHERE customer_id = ?
-        """
-        if unread_only:
-            query += " AND is_read = 0"
-        query += " ORDER BY sent_date DESC"
-        cursor.execute(query, (customer_id,))
-        return cursor.fetchall()
+import logging
+import os
+from datetime import datetime
+
+from Config.database_config import DatabaseConfig
+from Services.background_sweeper import BatchedSweeper
+
+logger = logging.getLogger(__name__)
+
+
+def subscribe_low_stock_log(path):
+    """Subscribe a handler appending every low-stock alert to the log file at path; return it"""
+    alert_logger = logging.getLogger('pharmacy.low_stock')
+    if not alert_logger.handlers:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        handler = logging.FileHandler(path, encoding='utf-8', delay=True)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        alert_logger.addHandler(handler)
+        alert_logger.propagate = False
+
+    def log_alert(alert):
+        alert_logger.warning("branch %s product %s: %s in stock (threshold %s, since %s)",
+                             alert['branch_id'], alert['product_id'], alert['quantity_in_stock'],
+                             alert['threshold'], alert['raised_at'])
+
+    NotificationService.subscribe('low_stock', log_alert)
+    return log_alert
+
+
+class NotificationService:
+    # event type -> handlers, shared by every instance in the process
+    _subscribers = {}
+
+    def __init__(self, db_path='Data/pharmacy.db'):
+        self.db_config = DatabaseConfig(db_path)
+
+    @classmethod
+    def subscribe(cls, event_type, handler):
+        """Call handler(event) for every event_type event published"""
+        cls._subscribers.setdefault(event_type, []).append(handler)
+
+    @classmethod
+    def unsubscribe(cls, event_type, handler):
+        cls._subscribers.get(event_type, []).remove(handler)
+
+    def publish(self, event_type, event):
+        for handler in list(self._subscribers.get(event_type, [])):
+            handler(event)
+
+    def publish_low_stock_alerts(self, limit=-1):
+        """Publish a 'low_stock' event for each pending alert; return the alerts handled.
+
+        Alerts are raised by triggers when stock crosses its threshold, so an
+        item staying low is reported once. Up to limit alerts (all if -1) are
+        claimed in one short write transaction and published after it
+        commits, so concurrent publishers never send the same alert twice.
+        Alerts raised while nobody is subscribed stay pending, and alerts
+        whose handler raised go back to pending for a later call.
+        """
+        if not self._subscribers.get('low_stock'):
+            return []
+        alerts = self.db_config.transact(lambda cursor: self.claim_low_stock_alerts(cursor, limit))
+        return self.deliver_low_stock_alerts(alerts)
+
+    def claim_low_stock_alerts(self, cursor, limit=-1):
+        """Mark up to limit pending alerts notified and return them, oldest first.
+
+        Call inside a write transaction, then pass the alerts to
+        deliver_low_stock_alerts once it has committed.
+        """
+        cursor.execute("""
+            UPDATE low_stock_alert SET notified = 1
+            WHERE (branch_id, product_id) IN (
+                SELECT branch_id, product_id FROM low_stock_alert
+                WHERE notified = 0
+                ORDER BY raised_at, branch_id, product_id
+                LIMIT ?
+            )
+            RETURNING branch_id, product_id, quantity_in_stock, threshold, raised_at
+        """, (limit,))
+        alerts = [{
+            'branch_id': row[0],
+            'product_id': row[1],
+            'quantity_in_stock': row[2],
+            'threshold': row[3],
+            'raised_at': row[4]
+        } for row in cursor.fetchall()]
+        return sorted(alerts, key=lambda a: (a['raised_at'], a['branch_id'], a['product_id']))
+
+    def deliver_low_stock_alerts(self, alerts):
+        """Publish claimed alerts; put back the ones a handler failed on and return the rest"""
+        handled, failed = [], []
+        for alert in alerts:
+            try:
+                self.publish('low_stock', alert)
+            except Exception:
+                logger.exception("low_stock handler failed; alert goes back to pending")
+                failed.append(alert)
+                continue
+            handled.append(alert)
+
+        if failed:
+            # raised_at tells this crossing apart from a later one of the same item
+            self.db_config.transact(lambda cursor: cursor.executemany("""
+                UPDATE low_stock_alert SET notified = 0
+                WHERE branch_id = ? AND product_id = ? AND raised_at = ?
+            """, [(a['branch_id'], a['product_id'], a['raised_at']) for a in failed]))
+        return handled
+
+    def send_notification(self, customer_id, message, notification_type='General', order_id=None, delivery_method='In_App'):
+        return self.db_config.transact(lambda cursor: cursor.execute("""
+            INSERT INTO notification (
+                customer_id, order_id, notification_type,
+                message, sent_date, is_read, delivery_method
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            customer_id, order_id, notification_type,
+            message, datetime.now(), 0, delivery_method
+        )).lastrowid)
+
+    def mark_as_read(self, notification_id):
+        return self.db_config.transact(lambda cursor: cursor.execute("""
+            UPDATE notification SET is_read = 1 WHERE notification_id = ?
+        """, (notification_id,)).rowcount > 0)
+
+    def get_customer_notifications(self, customer_id, unread_only=False):
+        with self.db_config.reader() as conn:
+            cursor = conn.cursor()
+            query = """
+                SELECT notification_id, message, sent_date, is_read
+                FROM notification
+                WHERE customer_id = ?
+            """
+            if unread_only:
+                query += " AND is_read = 0"
+            query += " ORDER BY sent_date DESC"
+            cursor.execute(query, (customer_id,))
+            return cursor.fetchall()
+
+
+class LowStockAlertPublisher(BatchedSweeper):
+    """Publishes pending low-stock alerts every interval seconds on a daemon thread.
+
+    Checkout and other hot write paths only raise alerts (by trigger, in
+    their own transaction); sending them is left to this thread, so those
+    paths commit once and never wait on alert handlers. Each batch claims
+    alerts in a short write transaction and publishes them after it commits.
+    """
+
+    thread_name = "low-stock-publisher"
+    rows_metric = 'alerts_published'
+
+    def __init__(self, db_path='Data/pharmacy.db', batch_size=None, interval=None):
+        from Config import app_config
+        super().__init__(db_path,
+                         batch_size or app_config.LOW_STOCK_PUBLISH_BATCH_SIZE,
+                         app_config.LOW_STOCK_PUBLISH_INTERVAL if interval is None else interval)
+        self.notifications = NotificationService(db_path)
+
+    def _delete_batch(self, cursor, limit):
+        # Alerts raised while nobody is subscribed stay pending
+        if not NotificationService._subscribers.get('low_stock'):
+            return []
+        return self.notifications.claim_low_stock_alerts(cursor, limit)
+
+    def sweep_batch(self):
+        """Claim one batch of pending alerts and return the ones published.
+
+        A handler failure shortens the batch, so the sweep stops and the
+        failed alerts wait for the next interval.
+        """
+        return self.notifications.deliver_low_stock_alerts(super().sweep_batch())
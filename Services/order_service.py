@@ -1,92 +1,190 @@
-from Config.database_config import DatabaseConfig
-import sqlite3
-
-class OrderService:
-    def __init__(self):
-        self.db = DatabaseConfig().create_connection()
-
-
-    def add_to_cart(self, customer_id, product_id, quantity):
-        cursor = self.db.cursor()
-
-        # Check if product exists and stock is enough
-        cursor.execute("SELECT quantity_in_stock FROM inventory WHERE product_id = ?", (product_id,))
-        row = cursor.fetchone()
-        if not row:
-            return {"success": False, "message": "Product does not exist."}
-        
-        stock = row[0]
-        if quantity > stock:
-            return {"success": False, "message": f"Only {stock} items in stock."}
-
-        # Check if already in cart
-        cursor.execute("""
-            SELECT quantity FROM cart WHERE customer_id = ? AND product_id = ?
-        """, (customer_id, product_id))
-        existing = cursor.fetchone()
-
-        if existing:
-            # Update quantity
-            new_quantity = existing[0] + quantity
-            cursor.execute("""
-                UPDATE cart SET quantity = ? WHERE customer_id = ? AND product_id = ?
-            """, (new_quantity, customer_id, product_id))
-        else:
-            # Insert new item
-            cursor.execute("""
-                INSERT INTO cart (customer_id, product_id, quantity)
-                VALUES (?, ?, ?)
-            """, (customer_id, product_id, quantity))
-
-        self.db.commit()
-        return {"success": True, "message": "Item added to cart successfully."}
-
-    
-    def get_cart_items(self, customer_id):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            SELECT c.product_id, p.product_name, c.quantity, p.unit_price,
-                   c.quantity * p.unit_price as subtotal
-            FROM cart c
-            JOIN product p ON c.product_id = p.product_id
-            WHERE c.customer_id = ?
-        """, (customer_id,))
-        return cursor.fetchall()
-
-    def clear_cart(self, customer_id):
-        cursor = self.db.cursor()
-        cursor.execute("DELETE FROM cart WHERE customer_id = ?", (customer_id,))
-        self.db.commit()
-
-    def checkout(self, customer_id, branch_id):
-        items = self.get_cart_items(customer_id)
-        if not items:
-            return {
-                "success": False,
-                "message": "Cart is empty"
-            }
-
-        total = sum([item[4] for item in items])
-        order_cursor = self.db.cursor()
-        order_cursor.execute("""
-            INSERT INTO orders (customer_id, branch_id, total_amount)
-            VALUES (?, ?, ?)
-        """, (customer_id, branch_id, total))
-        order_id = order_cursor.lastrowid
-
-        for item in items:
-            product_id, _, quantity, unit_price, subtotal = item
-            order_cursor.execute("""
-                INSERT INTO order_item (order_id, product_id, quantity, unit_price, subtotal)
-                VALUES (?, ?, ?, ?, ?)
-            """, (order_id, product_id, quantity, unit_price, subtotal))
-
-        self.clear_cart(customer_id)
-        self.db.commit()
-
-        return {
-            "success": True,
-            "order_id": order_id,
-            "total_amount": total
-        }
-
+from Config.database_config import DatabaseConfig
+from Models.inventory import Inventory, reserve_lines
+from Models.product import Product
+from Services import idempotency
+import sqlite3
+
+class _CheckoutRejected(Exception):
+    """Raised inside a checkout transaction to roll it back with a failure result"""
+
+    def __init__(self, result):
+        super().__init__(result["message"])
+        self.result = result
+
+
+class OrderService:
+    def __init__(self, db_path='Data/pharmacy.db'):
+        self.db_config = DatabaseConfig(db_path)
+        self.product_model = Product(db_path)
+        self.inventory_model = Inventory(db_path)
+
+
+    def add_to_cart(self, customer_id, product_id, quantity, branch_id=None):
+        def add(cursor):
+            # Check if product exists and stock is enough (at the branch, if given)
+            if branch_id is not None:
+                cursor.execute("""
+                    SELECT quantity_in_stock FROM inventory WHERE product_id = ? AND branch_id = ?
+                """, (product_id, branch_id))
+            else:
+                cursor.execute("""
+                    SELECT MAX(quantity_in_stock) FROM inventory WHERE product_id = ?
+                """, (product_id,))
+            row = cursor.fetchone()
+            if not row or row[0] is None:
+                if branch_id is not None:
+                    return {"success": False, "message": "Product is not stocked at this branch."}
+                return {"success": False, "message": "Product does not exist."}
+
+            stock = row[0]
+            cursor.execute("""
+                SELECT quantity FROM cart WHERE customer_id = ? AND product_id = ?
+            """, (customer_id, product_id))
+            existing = cursor.fetchone()
+            in_cart = existing[0] if existing else 0
+            if quantity + in_cart > stock:
+                return {"success": False, "message": f"Only {stock} items in stock."}
+
+            if existing:
+                # Update quantity
+                new_quantity = existing[0] + quantity
+                cursor.execute("""
+                    UPDATE cart SET quantity = ? WHERE customer_id = ? AND product_id = ?
+                """, (new_quantity, customer_id, product_id))
+            else:
+                # Insert new item
+                cursor.execute("""
+                    INSERT INTO cart (customer_id, product_id, quantity)
+                    VALUES (?, ?, ?)
+                """, (customer_id, product_id, quantity))
+            # Any activity keeps the whole cart from expiring (see CartExpirySweeper)
+            cursor.execute("UPDATE cart SET reserved_at = CURRENT_TIMESTAMP WHERE customer_id = ?",
+                           (customer_id,))
+            return {"success": True, "message": "Item added to cart successfully."}
+
+        return self.db_config.transact(add)
+
+    
+    def get_cart_items(self, customer_id, branch_id=None):
+        with self.db_config.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT c.product_id, p.product_name, c.quantity, p.unit_price,
+                       c.quantity * p.unit_price as subtotal
+                FROM cart c
+                JOIN product p ON c.product_id = p.product_id
+                WHERE c.customer_id = ?
+            """, (customer_id,))
+            items = cursor.fetchall()
+
+        if branch_id is None:
+            return items
+
+        # Add an "available at this branch" flag for every line in one lookup
+        available = self.product_model.check_stock_availability_many(
+            [(item[0], item[2]) for item in items], branch_id)
+        return [item + (available[item[0]],) for item in items]
+
+    def suggest_branches_for_cart(self, customer_id, exclude_branch_id=None):
+        """Get ids of branches that could fill the whole cart, best stocked first"""
+        items = self.get_cart_items(customer_id)
+        if not items:
+            return []
+        return self.inventory_model.find_branches_for_items(
+            [(item[0], item[2]) for item in items], exclude_branch_id)
+
+    def clear_cart(self, customer_id):
+        self.db_config.transact(
+            lambda cursor: cursor.execute("DELETE FROM cart WHERE customer_id = ?", (customer_id,)))
+
+    def checkout(self, customer_id, branch_id, payment_method_id=None, payment_reference=None,
+                 idempotency_key=None):
+        """Turn the customer's cart into an order at branch_id, optionally paying for it.
+
+        The order, its items, the stock taken, the emptied cart and the
+        payment are written in one transaction with a single commit; any
+        failure (including a stock shortfall) rolls all of it back. Retries
+        passing the idempotency_key of a checkout that succeeded get its
+        result back instead of placing another order.
+        """
+        request = {"customer_id": customer_id, "branch_id": branch_id,
+                   "payment_method_id": payment_method_id, "payment_reference": payment_reference}
+
+        def place_order(cursor):
+            if idempotency_key is not None:
+                previous = idempotency.replay(cursor, 'checkout', idempotency_key, request)
+                if previous is not None:
+                    return previous
+
+            cursor.execute("""
+                SELECT c.product_id, p.product_name, c.quantity, p.unit_price,
+                       c.quantity * p.unit_price as subtotal
+                FROM cart c
+                JOIN product p ON c.product_id = p.product_id
+                WHERE c.customer_id = ?
+            """, (customer_id,))
+            items = cursor.fetchall()
+            if not items:
+                return {
+                    "success": False,
+                    "message": "Cart is empty"
+                }
+
+            total = sum([item[4] for item in items])
+            cursor.execute("""
+                INSERT INTO orders (customer_id, branch_id, total_amount)
+                VALUES (?, ?, ?)
+            """, (customer_id, branch_id, total))
+            order_id = cursor.lastrowid
+
+            # Take stock for every line at once; any shortfall undoes the order.
+            # The stock leaves with the order, so the ledger records a sale
+            shortfalls = reserve_lines(cursor, branch_id,
+                                       [(item[0], item[2]) for item in items],
+                                       reference=f"order:{order_id}", movement_type='sale')
+            if shortfalls:
+                names = {item[0]: item[1] for item in items}
+                raise _CheckoutRejected({
+                    "success": False,
+                    "message": "Not enough stock at this branch for: " + ", ".join(
+                        f"{names[s['product_id']]} (need {s['requested']}, have {s['available'] or 0})"
+                        for s in shortfalls),
+                    "shortfalls": shortfalls
+                })
+
+            cursor.executemany("""
+                INSERT INTO order_item (order_id, product_id, quantity, unit_price, subtotal)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(order_id, product_id, quantity, unit_price, subtotal)
+                  for product_id, _, quantity, unit_price, subtotal in items])
+            cursor.execute("DELETE FROM cart WHERE customer_id = ?", (customer_id,))
+
+            result = {
+                "success": True,
+                "order_id": order_id,
+                "total_amount": total
+            }
+            if payment_method_id is not None:
+                cursor.execute("""
+                    INSERT INTO payment (
+                        order_id, payment_method_id, payment_amount, transaction_reference, payment_status
+                    )
+                    VALUES (?, ?, ?, ?, 'Completed')
+                """, (order_id, payment_method_id, total, payment_reference))
+                result["payment_id"] = cursor.lastrowid
+            if idempotency_key is not None:
+                idempotency.remember(cursor, 'checkout', idempotency_key, request, result)
+            return result
+
+        try:
+            result = self.db_config.transact(place_order)
+        except _CheckoutRejected as e:
+            return e.result
+        except sqlite3.Error as e:
+            return {
+                "success": False,
+                "message": f"Checkout failed: {e}"
+            }
+        # Low-stock alerts raised by the stock taken are sent by the
+        # background LowStockAlertPublisher, not on the checkout path
+        return result
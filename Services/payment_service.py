@@ -1,36 +1,54 @@
-from Config.database_config import DatabaseConfig
-from datetime import datetime
-
-class PaymentService:
-    def __init__(self):
-        self.db = DatabaseConfig().create_connection()
-
-    def process_payment(self, order_id, method_id, amount, reference=None):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            INSERT INTO payment (
-                order_id, payment_method_id, payment_amount, transaction_reference, payment_status
-            )
-            VALUES (?, ?, ?, ?, 'Completed')
-        """, (order_id, method_id, amount, reference))
-        self.db.commit()
-        payment_id = cursor.lastrowid
-        return {
-            "success": True,
-            "payment_id": payment_id
-        }
-
-
-    def get_payment(self, order_id):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            SELECT payment_id, payment_amount, payment_status, payment_date
-            FROM payment
-            WHERE order_id = ?
-        """, (order_id,))
-        return cursor.fetchone()
-
-    def get_methods(self):
-        cursor = self.db.cursor()
-        cursor.execute("SELECT payment_method_id, method_type FROM payment_method")
-        return cursor.fetchall()
+from Config.database_config import DatabaseConfig
+from Services import idempotency
+from datetime import datetime
+
+class PaymentService:
+    def __init__(self, db_path='Data/pharmacy.db'):
+        self.db_config = DatabaseConfig(db_path)
+
+    def process_payment(self, order_id, method_id, amount, reference=None, idempotency_key=None):
+        """Record a completed payment for an order.
+
+        Retries passing the idempotency_key of a payment that was recorded
+        get its result back instead of recording it again.
+        """
+        request = {"order_id": order_id, "method_id": method_id, "amount": amount, "reference": reference}
+
+        def pay(cursor):
+            if idempotency_key is not None:
+                previous = idempotency.replay(cursor, 'payment', idempotency_key, request)
+                if previous is not None:
+                    return previous
+
+            cursor.execute("""
+                INSERT INTO payment (
+                    order_id, payment_method_id, payment_amount, transaction_reference, payment_status
+                )
+                VALUES (?, ?, ?, ?, 'Completed')
+            """, (order_id, method_id, amount, reference))
+            result = {
+                "success": True,
+                "payment_id": cursor.lastrowid
+            }
+            if idempotency_key is not None:
+                idempotency.remember(cursor, 'payment', idempotency_key, request, result)
+            return result
+
+        return self.db_config.transact(pay)
+
+
+    def get_payment(self, order_id):
+        with self.db_config.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT payment_id, payment_amount, payment_status, payment_date
+                FROM payment
+                WHERE order_id = ?
+            """, (order_id,))
+            return cursor.fetchone()
+
+    def get_methods(self):
+        with self.db_config.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT payment_method_id, method_type FROM payment_method")
+            return cursor.fetchall()
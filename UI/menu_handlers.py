@@ -1,178 +1,324 @@
-# UI/menu_handlers.py
-
-from Services.order_service import OrderService
-from Services.prescription_service import PrescriptionService
-from Services.inventory_service import InventoryService
-from Services.report_service import ReportService
-from Services.staff_service import StaffService
-from Models.customer import Customer
-from Models.product import Product
-from Services.payment_service import PaymentService
-# ----- CUSTOMER MENU -----
-def customer_menu(term):
-    order_service = OrderService()
-    product_model = Product()
-    customer_model = Customer()
-    payment_service = PaymentService()
-
-    while True:
-        term.display_section("Customer Menu")
-        print("1. Browse Products")
-        print("2. Search Products")
-        print("3. View Shopping Cart")
-        print("4. Place Order")
-        print("5. View My Orders")
-        print("6. Upload Prescription")
-        print("7. Change Branch")
-        print("8. Logout")
-        choice = input("Choose an option: ")
-
-        if choice == '1':
-            products = product_model.get_products_by_branch(term.branch_id)
-            term.display_table(products, headers=["ID", "Name","Description", "Price","Prescription Required","Category", "Stock"])
-            add_choice = input("Would you like to add a product to your cart? (y/n): ").lower()
-            if add_choice == "y":
-                try:
-                    product_id = int(input("Enter Product ID: "))
-                    quantity = int(input("Enter Quantity: "))
-                    result = order_service.add_to_cart(term.customer_id, product_id, quantity)
-
-                    if result["success"]:
-                        term.notify_success(result["message"])
-                    else:
-                        term.notify_error(result["message"])
-                except ValueError:
-                    term.notify_error("Invalid input. Please enter numeric values.")
-
-        elif choice == '2':
-            keyword = input("Search keyword: ")
-            results = product_model.search_products_by_branch(term.branch_id, keyword)
-            term.display_table(results, headers=["ID", "Name","Description", "Price","Prescription Required","Category", "Stock"])
-        elif choice == '3':
-            items = order_service.get_cart_items(term.customer_id)
-            term.display_table(items, headers=["Product ID", "Name", "Qty", "Unit Price", "Subtotal"])
-        elif choice == "4":
-            # Checkout order
-            order_result = order_service.checkout(term.customer_id, term.branch_id)
-            if not order_result["success"]:
-                term.notify_error(order_result["message"])
-                return
-            
-            order_id = order_result["order_id"]
-            amount = order_result["total_amount"]
-            term.notify_success(f"Order #{order_id} created. Total: ${amount:.2f}")
-            
-            # Display payment methods
-            methods = payment_service.get_methods()
-            if not methods:
-                term.notify_error("No payment methods available.")
-                return
-
-            term.display_table(methods, ["ID", "Method"])
-            
-            try:
-                method_id = int(input("Select Payment Method ID: "))
-                valid_ids = [m[0] for m in methods]
-                if method_id not in valid_ids:
-                    term.notify_error("Invalid payment method selected.")
-                    return
-
-                reference = input("Enter Transaction Reference (optional): ").strip()
-                payment_service.process_payment(order_id, method_id, amount, reference)
-                term.notify_success("Payment completed successfully.")
-
-            except ValueError:
-                term.notify_error("Invalid input for payment method.")
-
-        elif choice == '5':
-            orders = customer_model.get_customer_orders(term.customer_id)
-            term.display_table(orders, headers=["Order ID", "Date", "Amount", "Status"])
-        elif choice == '6':
-            input("Simulating prescription upload (Press Enter)...")
-            term.notify_success("Prescription uploaded.")
-        elif choice == '7':
-            term.select_branch()
-        elif choice == '8':
-            break
-        else:
-            term.notify_error("Invalid option")
-
-# ----- PHARMACIST MENU -----
-def pharmacist_menu(term):
-    prescriptions = PrescriptionService()
-
-    while True:
-        term.display_section("PHARMACIST DASHBOARD")
-        print("1. View Prescriptions for Validation")
-        print("2. Validate Prescription")
-        print("3. Search Prescriptions")
-        print("4. View My Validation History")
-        print("5. Logout")
-
-        choice = input("Choose an option: ")
-
-        if choice == '1':
-            pending = prescriptions.get_pending_prescriptions(term.branch_id)
-            term.display_table(pending, headers=["ID", "Number", "Order", "Customer", "Issue Date"])
-        elif choice == '2':
-            pid = input("Enter Prescription ID to validate: ")
-            prescriptions.validate_prescription(pid, term.staff_id)
-            term.notify_success("Prescription validated.")
-        elif choice == '3':
-            keyword = input("Enter prescription number or customer: ")
-            input("Search feature stubbed.")  # Replace with real search
-        elif choice == '4':
-            input("Validation history feature stubbed.")
-        elif choice == '5':
-            break
-        else:
-            term.notify_error("Invalid option")
-
-
-# ----- BRANCH MANAGER MENU -----
-def manager_menu(term):
-    inventory = InventoryService()
-    reports = ReportService()
-    staff = StaffService()
-
-    while True:
-        term.display_section("BRANCH MANAGER DASHBOARD")
-        print("1. View Staff")
-        print("2. Manage Staff")
-        print("3. View Inventory")
-        print("4. Manage Inventory")
-        print("5. Create Reports")
-        print("6. View Reports")
-        print("7. Branch Statistics")
-        print("8. Logout")
-
-        choice = input("Choose an option: ")
-
-        if choice == '1':
-            staff_list = staff.get_staff_by_branch(term.branch_id)
-            term.display_table(staff_list, headers=["ID", "Name", "Role", "Email"])
-        elif choice == '2':
-            input("Staff management feature stubbed.")
-        elif choice == '3':
-            items = inventory.get_inventory_by_branch(term.branch_id)
-            term.display_table(items, headers=["ID", "Product", "Qty", "Restocked"])
-        elif choice == '4':
-            input("Inventory management stub.")
-        elif choice == '5':
-            start = input("Start date: ")
-            end = input("End date: ")
-            title = input("Title: ")
-            stats = reports.generate_sales_summary(term.branch_id, start, end)
-            summary = f"Orders: {stats[0]}, Revenue: ${stats[1]}, Avg: ${stats[2]}"
-            reports.create_report(term.staff_id, term.branch_id, "Sales", title, start, end, summary)
-            term.notify_success("Report created.")
-        elif choice == '6':
-            data = reports.get_reports_by_branch(term.branch_id)
-            term.display_table(data, headers=["ID", "Title", "Type", "Start", "End", "Date"])
-        elif choice == '7':
-            stat = reports.generate_sales_summary(term.branch_id, "2000-01-01", "2100-01-01")
-            print(f"\nTotal Orders: {stat[0]}\nRevenue: ${stat[1]}\nAvg Order: ${stat[2]}")
-        elif choice == '8':
-            break
-        else:
-            term.notify_error("Invalid option")
+# UI/menu_handlers.py
+import csv
+
+from Services.order_service import OrderService
+from Services.prescription_service import PrescriptionService
+from Services.inventory_service import InventoryService
+from Services.report_service import ReportService
+from Services.staff_service import StaffService
+from Models.customer import Customer
+from Models.order import Order
+from Models.product import Product
+from Services.payment_service import PaymentService
+from Config.app_config import ORDER_PAGE_SIZE, PRODUCT_PAGE_SIZE
+
+PRODUCT_HEADERS = ["ID", "Name","Description", "Price","Prescription Required","Category", "Stock"]
+
+
+def add_product_to_cart(term, order_service):
+    try:
+        product_id = int(input("Enter Product ID: "))
+        quantity = int(input("Enter Quantity: "))
+        result = order_service.add_to_cart(term.customer_id, product_id, quantity, term.branch_id)
+
+        if result["success"]:
+            term.notify_success(result["message"])
+        else:
+            term.notify_error(result["message"])
+            branches = order_service.inventory_model.find_branches_with_stock(
+                product_id, quantity, term.branch_id)
+            show_branch_suggestions(term, "Other branches with this product", branches)
+    except ValueError:
+        term.notify_error("Invalid input. Please enter numeric values.")
+
+
+def show_branch_suggestions(term, title, branches):
+    """Print suggested branches given as ids or (id, quantity) pairs"""
+    if not branches:
+        return
+    names = {b[0]: b[1] for b in term.branch_model.get_all_branches()}
+    rows = [(b[0], names.get(b[0], "?"), b[1]) if isinstance(b, tuple) else (b, names.get(b, "?"))
+            for b in branches]
+    term.display_section(title)
+    term.display_table(rows, headers=["Branch ID", "Name", "Stock"] if isinstance(branches[0], tuple)
+                       else ["Branch ID", "Name"])
+
+
+def browse_products(term, product_model, order_service):
+    category = input("Filter by category (Enter for all): ").strip() or None
+    sort_by = 'price' if input("Sort by name or price? (n/p): ").strip().lower() == 'p' else 'name'
+    in_stock_only = input("Only show products in stock? (y/n): ").strip().lower() == 'y'
+
+    products, has_next = product_model.browse_products_by_branch(
+        term.branch_id, PRODUCT_PAGE_SIZE, category=category,
+        in_stock_only=in_stock_only, sort_by=sort_by)
+    has_prev = False
+    page = 1
+
+    while True:
+        term.display_section(f"Products - page {page}")
+        term.display_table(products, headers=PRODUCT_HEADERS)
+
+        options = []
+        if has_next:
+            options.append("n=next")
+        if has_prev:
+            options.append("p=previous")
+        options += ["a=add to cart", "q=back"]
+        choice = input(f"{', '.join(options)}: ").strip().lower()
+
+        if choice == 'n' and has_next:
+            after = product_model.browse_key(products[-1], sort_by)
+            products, has_next = product_model.browse_products_by_branch(
+                term.branch_id, PRODUCT_PAGE_SIZE, after=after, category=category,
+                in_stock_only=in_stock_only, sort_by=sort_by)
+            has_prev = True
+            page += 1
+        elif choice == 'p' and has_prev:
+            before = product_model.browse_key(products[0], sort_by)
+            products, has_prev = product_model.browse_products_by_branch(
+                term.branch_id, PRODUCT_PAGE_SIZE, before=before, category=category,
+                in_stock_only=in_stock_only, sort_by=sort_by)
+            has_next = True
+            page -= 1
+        elif choice == 'a':
+            add_product_to_cart(term, order_service)
+        elif choice == 'q':
+            break
+        else:
+            term.notify_error("Invalid option")
+
+def show_order(term, order):
+    """Print an order loaded by Order.load_order(s)"""
+    term.display_section(f"Order #{order['order_id']}")
+    print(f"Date: {order['order_date']}  Status: {order['order_status']}  Branch: {order['branch_name']}")
+    print(f"Payment: {order['payment_status'] or 'Unpaid'}  "
+          f"Prescription: {order['prescription_status'] or 'None'}")
+    term.display_table(order['items'], headers=["Product ID", "Product", "Qty", "Unit Price", "Subtotal"])
+    print(f"Total: ${order['total_amount']:.2f}")
+
+def order_history(term, customer_model, order_model):
+    status = input("Filter by status (Pending/Processing/Ready/Completed/Cancelled, Enter for all): ").strip()
+    status = status.capitalize() or None
+    branch_id = term.branch_id if input("Only orders from this branch? (y/n): ").strip().lower() == 'y' else None
+
+    orders, has_next = customer_model.get_order_history(
+        term.customer_id, ORDER_PAGE_SIZE, status=status, branch_id=branch_id)
+    has_prev = False
+    page = 1
+
+    while True:
+        term.display_section(f"Order History - page {page}")
+        term.display_table(orders, headers=["Order ID", "Date", "Status", "Amount", "Branch", "Payment"])
+
+        options = []
+        if has_next:
+            options.append("n=next")
+        if has_prev:
+            options.append("p=previous")
+        if orders:
+            options.append("v=view order")
+        options.append("q=back")
+        choice = input(f"{', '.join(options)}: ").strip().lower()
+
+        if choice == 'n' and has_next:
+            after = customer_model.order_history_key(orders[-1])
+            orders, has_next = customer_model.get_order_history(
+                term.customer_id, ORDER_PAGE_SIZE, after=after, status=status, branch_id=branch_id)
+            has_prev = True
+            page += 1
+        elif choice == 'p' and has_prev:
+            before = customer_model.order_history_key(orders[0])
+            orders, has_prev = customer_model.get_order_history(
+                term.customer_id, ORDER_PAGE_SIZE, before=before, status=status, branch_id=branch_id)
+            has_next = True
+            page -= 1
+        elif choice == 'v' and orders:
+            order_id = input("Order ID: ").strip()
+            order = order_model.load_order(int(order_id)) if order_id.isdigit() else None
+            if order is None or order['customer_id'] != term.customer_id:
+                term.notify_error("Order not found")
+            else:
+                show_order(term, order)
+        elif choice == 'q':
+            break
+        else:
+            term.notify_error("Invalid option")
+
+# ----- CUSTOMER MENU -----
+def customer_menu(term):
+    order_service = OrderService()
+    product_model = Product()
+    customer_model = Customer()
+    order_model = Order()
+    payment_service = PaymentService()
+
+    while True:
+        term.display_section("Customer Menu")
+        print("1. Browse Products")
+        print("2. Search Products")
+        print("3. View Shopping Cart")
+        print("4. Place Order")
+        print("5. View My Orders")
+        print("6. Upload Prescription")
+        print("7. Change Branch")
+        print("8. Logout")
+        choice = input("Choose an option: ")
+
+        if choice == '1':
+            browse_products(term, product_model, order_service)
+
+        elif choice == '2':
+            keyword = input("Search keyword: ")
+            suggestions = product_model.autocomplete_products(keyword, term.branch_id)
+            if suggestions:
+                term.display_section("Suggestions")
+                term.display_table(suggestions, headers=["ID", "Name", "Price", "Stock"])
+            results = product_model.search_products_by_branch(term.branch_id, keyword)
+            term.display_section("Search Results")
+            term.display_table(results, headers=PRODUCT_HEADERS)
+        elif choice == '3':
+            items = order_service.get_cart_items(term.customer_id, term.branch_id)
+            term.display_table(items, headers=["Product ID", "Name", "Qty", "Unit Price", "Subtotal", "In Stock"])
+        elif choice == "4":
+            # Checkout order, paying in the same step if a method is chosen
+            methods = payment_service.get_methods()
+            if methods:
+                term.display_table(methods, ["ID", "Method"])
+
+            method_id, reference = None, None
+            choice_id = input("Select Payment Method ID (blank to pay later): ").strip()
+            if choice_id:
+                try:
+                    method_id = int(choice_id)
+                except ValueError:
+                    term.notify_error("Invalid input for payment method.")
+                    return
+                if method_id not in [m[0] for m in methods]:
+                    term.notify_error("Invalid payment method selected.")
+                    return
+                reference = input("Enter Transaction Reference (optional): ").strip()
+
+            order_result = order_service.checkout(term.customer_id, term.branch_id, method_id, reference)
+            if not order_result["success"]:
+                term.notify_error(order_result["message"])
+                return
+
+            order_id = order_result["order_id"]
+            amount = order_result["total_amount"]
+            term.notify_success(f"Order #{order_id} created. Total: ${amount:.2f}")
+            if "payment_id" in order_result:
+                term.notify_success("Payment completed successfully.")
+
+        elif choice == '5':
+            order_history(term, customer_model, order_model)
+        elif choice == '6':
+            input("Simulating prescription upload (Press Enter)...")
+            term.notify_success("Prescription uploaded.")
+        elif choice == '7':
+            suggested = order_service.suggest_branches_for_cart(term.customer_id, term.branch_id)
+            show_branch_suggestions(term, "Branches that can fill your whole cart", suggested)
+            term.select_branch()
+        elif choice == '8':
+            break
+        else:
+            term.notify_error("Invalid option")
+
+# ----- PHARMACIST MENU -----
+def pharmacist_menu(term):
+    prescriptions = PrescriptionService()
+    orders = Order()
+
+    while True:
+        term.display_section("PHARMACIST DASHBOARD")
+        print("1. View Prescriptions for Validation")
+        print("2. Validate Prescription")
+        print("3. Search Prescriptions")
+        print("4. View My Validation History")
+        print("5. Logout")
+
+        choice = input("Choose an option: ")
+
+        if choice == '1':
+            pending = prescriptions.get_pending_prescriptions(term.branch_id)
+            term.display_table(pending, headers=["ID", "Number", "Order", "Customer", "Issue Date"])
+            if pending and input("Show the items of these orders? (y/n): ").strip().lower() == 'y':
+                for order in orders.load_orders([row[2] for row in pending]).values():
+                    show_order(term, order)
+        elif choice == '2':
+            pid = input("Enter Prescription ID to validate: ")
+            prescriptions.validate_prescription(pid, term.staff_id)
+            term.notify_success("Prescription validated.")
+        elif choice == '3':
+            keyword = input("Enter prescription number or customer: ")
+            input("Search feature stubbed.")  # Replace with real search
+        elif choice == '4':
+            input("Validation history feature stubbed.")
+        elif choice == '5':
+            break
+        else:
+            term.notify_error("Invalid option")
+
+
+# ----- BRANCH MANAGER MENU -----
+def manager_menu(term):
+    inventory = InventoryService()
+    reports = ReportService()
+    staff = StaffService()
+
+    while True:
+        term.display_section("BRANCH MANAGER DASHBOARD")
+        print("1. View Staff")
+        print("2. Manage Staff")
+        print("3. View Inventory")
+        print("4. Manage Inventory")
+        print("5. Create Reports")
+        print("6. View Reports")
+        print("7. Branch Statistics")
+        print("8. Logout")
+
+        choice = input("Choose an option: ")
+
+        if choice == '1':
+            staff_list = staff.get_staff_by_branch(term.branch_id)
+            term.display_table(staff_list, headers=["ID", "Name", "Role", "Email"])
+        elif choice == '2':
+            input("Staff management feature stubbed.")
+        elif choice == '3':
+            items = inventory.get_inventory_by_branch(term.branch_id)
+            term.display_table(items, headers=["ID", "Product", "Qty", "Restocked"])
+            low_stock = inventory.get_low_stock_items(term.branch_id)
+            if low_stock:
+                term.display_section("Low Stock")
+                term.display_table(low_stock, headers=["ID", "Product", "Qty"])
+        elif choice == '4':
+            path = input("Shipment CSV file (columns: product, quantity, lot): ").strip()
+            reference = input("Shipment reference (optional): ").strip() or None
+            try:
+                summary = inventory.apply_shipment_file(term.branch_id, path, reference)
+            except (OSError, csv.Error) as e:
+                term.notify_error(f"Could not read shipment file: {e}")
+                continue
+            term.display_table([(r['line'], r['product_id'], r['quantity'], r['lot'], r['status'], r['message'])
+                                for r in summary['lines']],
+                               headers=["Line", "Product", "Qty", "Lot", "Status", "Message"])
+            term.notify_success(f"{summary['applied']} lines applied ({summary['units']} units), "
+                                f"{summary['rejected']} rejected.")
+        elif choice == '5':
+            start = input("Start date: ")
+            end = input("End date: ")
+            title = input("Title: ")
+            stats = reports.generate_sales_summary(term.branch_id, start, end)
+            summary = f"Orders: {stats[0]}, Revenue: ${stats[1]}, Avg: ${stats[2]}"
+            reports.create_report(term.staff_id, term.branch_id, "Sales", title, start, end, summary)
+            term.notify_success("Report created.")
+        elif choice == '6':
+            data = reports.get_reports_by_branch(term.branch_id)
+            term.display_table(data, headers=["ID", "Title", "Type", "Start", "End", "Date"])
+        elif choice == '7':
+            stat = reports.generate_sales_summary(term.branch_id, "2000-01-01", "2100-01-01")
+            print(f"\nTotal Orders: {stat[0]}\nRevenue: ${stat[1]}\nAvg Order: ${stat[2]}")
+        elif choice == '8':
+            break
+        else:
+            term.notify_error("Invalid option")
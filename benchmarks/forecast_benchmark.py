@@ -0,0 +1,93 @@
+# benchmarks/forecast_benchmark.py
+"""Demand forecast refresh time over a large synthetic order history.
+
+Seeds a fresh database with order lines spread over the forecast window,
+then times the grouped load, the NumPy reduction and the threshold write
+separately.
+
+    python -m benchmarks.forecast_benchmark --lines 10000000 --branches 100
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from Config.migrations import MigrationRunner
+from Models.demand_forecast import DemandForecast, compute_reorder_points
+
+
+def seed_database(db_path, lines, branches, products, days, lines_per_order=5, seed=7):
+    """Create the schema plus random orders of lines_per_order lines each"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        MigrationRunner(db_path).migrate()
+
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO branch (branch_name, branch_address) VALUES (?, 'Bench')",
+                       [(f"Branch {b}",) for b in range(branches)])
+    cursor.execute("INSERT INTO customer (first_name, last_name, email, phone) "
+                   "VALUES ('Bench', 'Bench', 'bench@bench.local', '0900000000')")
+    cursor.executemany("""
+        INSERT INTO product (product_name, product_category, unit_price) VALUES (?, ?, 1000)
+    """, [(f"Product {p:06d}", f"Category {p % 20}") for p in range(products)])
+    cursor.executemany("INSERT INTO inventory (branch_id, product_id, quantity_in_stock) VALUES (?, ?, 100)",
+                       [(b + 1, p + 1) for b in range(branches) for p in range(min(products, 1000))])
+
+    orders = lines // lines_per_order
+    order_branch = rng.integers(1, branches + 1, orders)
+    order_age = rng.integers(0, days * 86400, orders)
+    cursor.executemany("""
+        INSERT INTO orders (order_id, customer_id, branch_id, order_date, order_status)
+        VALUES (?, 1, ?, datetime('now', '-' || ? || ' seconds'), 'Completed')
+    """, zip(range(1, orders + 1), order_branch.tolist(), order_age.tolist()))
+
+    # Skewed product popularity so some SKUs sell daily and most rarely
+    line_product = np.minimum(rng.zipf(1.3, orders * lines_per_order), products)
+    line_quantity = rng.integers(1, 4, orders * lines_per_order)
+    cursor.executemany("""
+        INSERT INTO order_item (order_id, product_id, quantity, unit_price, subtotal)
+        VALUES (?, ?, ?, 1000, 1000 * ?)
+    """, zip(np.repeat(np.arange(1, orders + 1), lines_per_order).tolist(), line_product.tolist(),
+             line_quantity.tolist(), line_quantity.tolist()))
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a demand forecast refresh over a large order history")
+    parser.add_argument('--lines', type=int, default=1_000_000, help="order lines to seed")
+    parser.add_argument('--branches', type=int, default=100)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=56, help="days of history to spread the orders over")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "forecast.db")
+        start = time.perf_counter()
+        seed_database(db_path, args.lines, args.branches, args.products, args.days)
+        print(f"Seeded {args.lines} order lines in {time.perf_counter() - start:.1f}s")
+
+        forecast = DemandForecast(db_path, history_days=args.days)
+        start = time.perf_counter()
+        daily_sales = forecast.load_daily_sales()
+        loaded = time.perf_counter()
+        result = compute_reorder_points(daily_sales, forecast.history_days + 1, forecast.lead_time_days,
+                                        forecast.review_days, forecast.service_level_z)
+        computed = time.perf_counter()
+        skus = forecast.refresh()
+        refreshed = time.perf_counter()
+
+        print(f"Load:    {loaded - start:.2f}s ({len(daily_sales)} SKU-days)")
+        print(f"Compute: {(computed - loaded) * 1000:.1f}ms ({len(result['reorder_point'])} SKUs)")
+        print(f"Refresh: {refreshed - computed:.2f}s end to end ({skus} thresholds written)")
+
+
+if __name__ == "__main__":
+    main()
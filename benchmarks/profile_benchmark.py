@@ -0,0 +1,136 @@
+# benchmarks/profile_benchmark.py
+"""Checkout throughput and catalog browse latency under each database profile.
+
+Each profile gets a fresh database seeded with a synthetic catalog. Writer
+threads loop add-to-cart + checkout while reader threads browse the branch
+catalog, for a fixed wall-clock duration.
+
+    python -m benchmarks.profile_benchmark --seconds 3 --products 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+import Config.app_config as app_config
+from Config.migrations import MigrationRunner
+from Models.product import Product
+from Services.order_service import OrderService
+
+
+def seed_database(db_path, product_count, customer_count):
+    """Create the schema and a synthetic catalog stocked at branch 1"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        MigrationRunner(db_path).migrate()
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO branch (branch_name, branch_address) VALUES ('Bench', 'Bench')")
+    cursor.executemany("""
+        INSERT INTO customer (first_name, last_name, email, phone)
+        VALUES (?, ?, ?, ?)
+    """, [(f"C{i}", "Bench", f"c{i}@bench.local", f"09{i:08d}") for i in range(customer_count)])
+    cursor.executemany("""
+        INSERT INTO product (product_name, product_description, product_category, unit_price)
+        VALUES (?, ?, ?, ?)
+    """, [(f"Product {i:06d}", f"Description {i}", f"Category {i % 20}", 1000 + i)
+          for i in range(product_count)])
+    cursor.executemany("""
+        INSERT INTO inventory (branch_id, product_id, quantity_in_stock)
+        VALUES (1, ?, ?)
+    """, [(i + 1, 1_000_000) for i in range(product_count)])
+    conn.commit()
+    conn.close()
+
+
+def percentile(samples, pct):
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100)[pct - 1]
+
+
+def run_profile(profile, seconds, product_count, writers, readers):
+    """Run the mixed workload against one profile and return its metrics"""
+    app_config.DB_PROFILE = profile
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, f"bench-{profile}.db")
+        seed_database(db_path, product_count, writers)
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        checkouts = [0]
+        errors = [0]
+        browse_latencies = []
+
+        def writer(customer_id):
+            orders = OrderService(db_path)
+            product_id = customer_id
+            while not stop.is_set():
+                try:
+                    orders.add_to_cart(customer_id, product_id, 1, 1)
+                    result = orders.checkout(customer_id, 1)
+                    with lock:
+                        checkouts[0] += result["success"]
+                except sqlite3.OperationalError:
+                    with lock:
+                        errors[0] += 1
+
+        def reader():
+            products = Product(db_path)
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    products.get_products_by_branch(1)
+                except sqlite3.OperationalError:
+                    with lock:
+                        errors[0] += 1
+                    continue
+                elapsed = time.perf_counter() - start
+                with lock:
+                    browse_latencies.append(elapsed * 1000)
+
+        threads = [threading.Thread(target=writer, args=(i + 1,)) for i in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        return {
+            'profile': profile,
+            'checkouts_per_sec': checkouts[0] / seconds,
+            'browse_p50_ms': percentile(browse_latencies, 50),
+            'browse_p95_ms': percentile(browse_latencies, 95),
+            'browses': len(browse_latencies),
+            'errors': errors[0],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0, help="duration per profile")
+    parser.add_argument('--products', type=int, default=2000, help="catalog size")
+    parser.add_argument('--writers', type=int, default=2, help="concurrent checkout threads")
+    parser.add_argument('--readers', type=int, default=4, help="concurrent browse threads")
+    parser.add_argument('--profiles', nargs='*', default=list(app_config.DB_PROFILES),
+                        help="profiles to run (default: all)")
+    args = parser.parse_args()
+
+    print(f"{'Profile':<12}{'Checkouts/s':>14}{'Browse p50 ms':>16}{'Browse p95 ms':>16}{'Browses':>10}{'Errors':>8}")
+    print("-" * 76)
+    for profile in args.profiles:
+        r = run_profile(profile, args.seconds, args.products, args.writers, args.readers)
+        print(f"{r['profile']:<12}{r['checkouts_per_sec']:>14.1f}{r['browse_p50_ms']:>16.2f}"
+              f"{r['browse_p95_ms']:>16.2f}{r['browses']:>10}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/write_queue_benchmark.py
+"""Notification insert throughput with and without the group-commit write queue.
+
+For each producer count, producer threads call
+NotificationService.send_notification in a loop for a fixed duration,
+first committing each insert on its own, then through the write queue.
+
+    python -m benchmarks.write_queue_benchmark --seconds 3 --producers 1 10 100
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import Config.app_config as app_config
+from Config.migrations import MigrationRunner
+from Config.write_queue import WriteQueue
+from Services.notification_service import NotificationService
+from benchmarks.profile_benchmark import percentile
+
+
+def seed_database(db_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        MigrationRunner(db_path).migrate()
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO customer (first_name, last_name, email, phone) "
+                 "VALUES ('Bench', 'Bench', 'bench@bench.local', '0900000000')")
+    conn.commit()
+    conn.close()
+
+
+def run(profile, producers, seconds, queued):
+    """Run one producer count in one mode and return its metrics"""
+    app_config.DB_PROFILE = profile
+    app_config.WRITE_QUEUE_ENABLED = queued
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "bench.db")
+        seed_database(db_path)
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        latencies = []
+        errors = [0]
+
+        def producer():
+            notifications = NotificationService(db_path)
+            samples = []
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    notifications.send_notification(1, "Your order is ready")
+                except sqlite3.Error:
+                    with lock:
+                        errors[0] += 1
+                    continue
+                samples.append((time.perf_counter() - start) * 1000)
+            with lock:
+                latencies.extend(samples)
+
+        threads = [threading.Thread(target=producer) for _ in range(producers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        batches = None
+        if queued:
+            write_queue = WriteQueue.for_database(NotificationService(db_path).db_config)
+            stats = write_queue.stats()
+            batches = stats['batches']
+        return {
+            'writes_per_sec': len(latencies) / seconds,
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'avg_batch': len(latencies) / batches if batches else 1.0,
+            'errors': errors[0],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0, help="duration per run")
+    parser.add_argument('--producers', type=int, nargs='*', default=[1, 10, 100])
+    parser.add_argument('--profiles', nargs='*', default=['oltp', 'legacy'],
+                        help="database profiles to run (legacy fsyncs every commit)")
+    args = parser.parse_args()
+
+    print(f"{'Profile':<10}{'Producers':>10}{'Mode':>8}{'Writes/s':>12}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'Avg batch':>11}{'Errors':>8}")
+    print("-" * 79)
+    for profile in args.profiles:
+        for producers in args.producers:
+            for queued in (False, True):
+                r = run(profile, producers, args.seconds, queued)
+                print(f"{profile:<10}{producers:>10}{'queue' if queued else 'direct':>8}"
+                      f"{r['writes_per_sec']:>12.0f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+                      f"{r['avg_batch']:>11.1f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,51 @@
-# main.py
-
-from UI.customer_terminal import CustomerTerminal
-from UI.staff_terminal import StaffTerminal
-from UI.base_terminal import BaseTerminal
-
-def main():
-    ui = BaseTerminal()
-
-    while True:
-        ui.display_title("Long Chau Pharmacy System")
-        print("1. Customer Portal")
-        print("2. Staff Portal")
-        print("3. Exit")
-
-        choice = input("Choose an option: ")
-
-        if choice == '1':
-            customer = CustomerTerminal()
-            customer.run()
-        elif choice == '2':
-            staff = StaffTerminal()
-            staff.run()
-        elif choice == '3':
-            ui.notify_info("Goodbye!")
-            break
-        else:
-            ui.notify_error("Invalid option")
-
-if __name__ == "__main__":
-    main()
+# main.py
+
+import atexit
+
+from Config.app_config import LOW_STOCK_LOG_FILE, QUERY_STATS_FILE
+from Config.migrations import MigrationRunner
+from Config.query_stats import get_query_stats
+from Models.inventory import Inventory
+from Services.cart_sweeper import CartExpirySweeper
+from Services.idempotency import IdempotencyKeyPurger
+from Services.notification_service import LowStockAlertPublisher, subscribe_low_stock_log
+from UI.customer_terminal import CustomerTerminal
+from UI.staff_terminal import StaffTerminal
+from UI.base_terminal import BaseTerminal
+
+def main():
+    # No-op (a single PRAGMA read) when the schema is already current
+    MigrationRunner().migrate()
+    # Keeps stock-at-time replays short as the inventory ledger grows
+    Inventory().snapshot_due_branches()
+    atexit.register(get_query_stats().save, QUERY_STATS_FILE)
+    # Alerts raised while nothing was listening are still pending and go
+    # out on the publisher's first pass
+    subscribe_low_stock_log(LOW_STOCK_LOG_FILE)
+    for worker in (CartExpirySweeper(), IdempotencyKeyPurger(), LowStockAlertPublisher()):
+        worker.start()
+        atexit.register(worker.stop)
+    ui = BaseTerminal()
+
+    while True:
+        ui.display_title("Long Chau Pharmacy System")
+        print("1. Customer Portal")
+        print("2. Staff Portal")
+        print("3. Exit")
+
+        choice = input("Choose an option: ")
+
+        if choice == '1':
+            customer = CustomerTerminal()
+            customer.run()
+        elif choice == '2':
+            staff = StaffTerminal()
+            staff.run()
+        elif choice == '3':
+            ui.notify_info("Goodbye!")
+            break
+        else:
+            ui.notify_error("Invalid option")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import sqlite3
+
+import pytest
+
+from Config.migrations import MigrationRunner
+from Models.product import Product
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path to a fresh, fully migrated database"""
+    path = str(tmp_path / "pharmacy.db")
+    MigrationRunner(path).migrate(verbose=False)
+    return path
+
+
+@pytest.fixture
+def seed(db_path):
+    """Fill db_path with the branches, customers, products and payment methods a test starts from.
+
+    Rows get ids 1, 2, ... in the order given; products are added through
+    Product.add_product (category General, price 1000).
+    """
+    def seed(branches=("Main",), customers=1, products=(), payment_methods=()):
+        conn = sqlite3.connect(db_path)
+        conn.executemany("INSERT INTO branch (branch_name, branch_address) VALUES (?, 'HCMC')",
+                         [(name,) for name in branches])
+        conn.executemany("INSERT INTO customer (first_name, last_name, email, phone) VALUES (?, 'B', ?, ?)",
+                         [(f"C{i}", f"c{i}@b.c", f"09000000{i:02d}") for i in range(1, customers + 1)])
+        conn.executemany("INSERT INTO payment_method (method_type) VALUES (?)",
+                         [(method,) for method in payment_methods])
+        conn.commit()
+        conn.close()
+        product_model = Product(db_path)
+        for name in products:
+            product_model.add_product(name, "", "General", 1000)
+    return seed
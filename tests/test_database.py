@@ -1,25 +1,406 @@
-# tests/test_database.py
-import pytest
-
-from Config.database_config import DatabaseConfig
-
-def test_connection():
-    db_config = DatabaseConfig()
-    conn = db_config.create_connection()
-    assert conn is not None
-    conn.close()
-
-def test_tables_exist():
-    db_config = DatabaseConfig()
-    conn = db_config.create_connection()
-    cursor = conn.cursor()
-    tables = ['customer', 'staff', 'product', 'inventory', 'orders', 'cart', 'payment']
-    for table in tables:
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'")
-        assert cursor.fetchone() is not None, f"Table {table} should exist"
-    conn.close()
-
-def test_database_connection():
-    db = DatabaseConfig()
-    conn = db.check_db_exists()
-    assert conn is not None
+# tests/test_database.py
+import pytest
+
+from Config.database_config import DatabaseConfig
+
+def test_connection():
+    db_config = DatabaseConfig()
+    conn = db_config.create_connection()
+    assert conn is not None
+    conn.close()
+
+def test_tables_exist():
+    db_config = DatabaseConfig()
+    conn = db_config.create_connection()
+    cursor = conn.cursor()
+    tables = ['customer', 'staff', 'product', 'inventory', 'orders', 'cart', 'payment']
+    for table in tables:
+        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'")
+        assert cursor.fetchone() is not None, f"Table {table} should exist"
+    conn.close()
+
+def test_database_connection():
+    db = DatabaseConfig()
+    conn = db.check_db_exists()
+    assert conn is not None
+
+def test_pool_reuses_connection_within_thread(tmp_path):
+    db = DatabaseConfig(str(tmp_path / "pool.db"))
+    with db.writer() as outer:
+        with db.writer() as inner:
+            assert inner._conn is outer._conn
+        assert db.pool_stats()['writer']['in_use'] == 1
+    stats = db.pool_stats()['writer']
+    assert stats['in_use'] == 0
+    assert stats['idle'] == 1
+    assert stats['created'] == 1
+
+def test_pool_is_bounded(tmp_path):
+    import threading
+    from Config.database_config import PoolTimeoutError
+
+    db = DatabaseConfig(str(tmp_path / "bounded.db"))
+    pool = db.read_pool
+    pool.max_size = 1
+    pool.timeout = 0.05
+    errors = []
+
+    def borrow():
+        try:
+            pool.acquire().close()
+        except PoolTimeoutError as e:
+            errors.append(e)
+
+    held = pool.acquire()
+    worker = threading.Thread(target=borrow)
+    worker.start()
+    worker.join()
+    held.close()
+
+    assert len(errors) == 1
+    assert db.pool_stats()['readers']['timeouts'] == 1
+
+def test_close_all_closes_borrowed_connections_on_return():
+    import sqlite3
+    from Config.database_config import ConnectionPool
+
+    pool = ConnectionPool(lambda: sqlite3.connect(":memory:", check_same_thread=False))
+    pool.acquire().close()
+    held = pool.acquire()
+    raw = held._conn
+    pool.close_all()
+    held.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        raw.execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.acquire()
+    assert pool.stats()['size'] == 0
+
+def test_returned_connection_is_rolled_back(tmp_path):
+    db = DatabaseConfig(str(tmp_path / "rollback.db"))
+    with db.writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+    with db.writer() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+def test_connections_use_performance_profile(tmp_path):
+    db = DatabaseConfig(str(tmp_path / "profile.db"), profile="reporting")
+    with db.writer() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 15000
+
+def test_unknown_profile_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        DatabaseConfig(str(tmp_path / "bad.db"), profile="turbo")
+
+def test_readers_are_read_only(tmp_path):
+    import sqlite3
+
+    db = DatabaseConfig(str(tmp_path / "split.db"))
+    with db.writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+    with db.reader() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO t VALUES (1)")
+
+def test_reader_inside_writer_sees_uncommitted_rows(tmp_path):
+    db = DatabaseConfig(str(tmp_path / "ryw.db"))
+    with db.writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+        with db.reader() as reader:
+            assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        conn.rollback()
+
+def test_query_stats_record_latency_and_slow_plan(tmp_path, monkeypatch):
+    import logging
+    from Config import query_stats
+
+    stats = query_stats.QueryStats(slow_threshold_ms=0.0, logger=logging.getLogger("test.slow_query"))
+    monkeypatch.setattr(query_stats, "_query_stats", stats)
+
+    db = DatabaseConfig(str(tmp_path / "stats.db"))
+    with db.writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        for _ in range(3):
+            conn.execute("SELECT x FROM t WHERE x IN (?, ?, ?)", (1, 2, 3)).fetchall()
+
+    entry = [s for s in stats.top(sort_by="calls") if s.sql.startswith("SELECT")][0]
+    assert entry.sql == "SELECT x FROM t WHERE x IN (?, ...)"
+    assert entry.calls == 3
+    assert entry.percentile(50) <= entry.percentile(99)
+    assert entry.plan and "SCAN" in entry.plan[0]
+
+    snapshot = tmp_path / "stats.json"
+    stats.save(str(snapshot))
+    stats.save(str(snapshot))
+    saved = {s.sql: s for s in query_stats.load_snapshot(str(snapshot))}
+    assert saved[entry.sql].calls == 6
+
+def test_query_stats_sampling_disabled():
+    from Config.query_stats import QueryStats
+
+    assert QueryStats(enabled=False).should_sample() is False
+    assert QueryStats(sample_rate=0.0).should_sample() is False
+
+def test_hot_lookups_use_indexes(tmp_path):
+    from Config.index_advisor import analyze
+    from Config.migrations import MigrationRunner
+
+    db_path = str(tmp_path / "indexes.db")
+    MigrationRunner(db_path).migrate(verbose=False)
+    findings = analyze([
+        ("login", "SELECT customer_id FROM customer WHERE email = ? AND phone = ?"),
+        ("items", "SELECT product_id, quantity FROM order_item WHERE order_id = ?"),
+        ("sales", "SELECT SUM(total_amount) FROM orders WHERE branch_id = ? AND order_date BETWEEN ? AND ?"),
+        ("inbox", "SELECT message FROM notification WHERE customer_id = ? AND is_read = 0 ORDER BY sent_date DESC"),
+        ("history", "SELECT order_id, total_amount FROM orders WHERE customer_id = ? AND order_status = ? "
+                    "AND (order_date, order_id) < (?, ?) ORDER BY order_date DESC, order_id DESC LIMIT 21"),
+    ], db_path)
+    assert [f.location for f in findings if f.has_issues] == []
+
+def test_index_advisor_collects_model_queries():
+    from Config.index_advisor import collect_queries
+
+    locations = [location for location, _ in collect_queries()]
+    assert any(location.startswith("Models/customer.py") for location in locations)
+
+def test_migrations_apply_once(tmp_path):
+    from Config.migrations import MigrationRunner
+
+    runner = MigrationRunner(str(tmp_path / "migrate.db"))
+    assert runner.migrate(verbose=False) == [m.version for m in runner.migrations]
+    assert runner.current_version() == runner.latest_version
+    assert runner.migrate(verbose=False) == []
+
+def test_ledger_migration_records_opening_balances(tmp_path):
+    from Config.migrations import MIGRATIONS, MigrationRunner
+
+    db_path = str(tmp_path / "ledger.db")
+    MigrationRunner(db_path, MIGRATIONS[:5]).migrate(verbose=False)
+    conn = DatabaseConfig(db_path).create_connection()
+    conn.execute("INSERT INTO branch (branch_id, branch_name, branch_address) VALUES (1, 'Main', 'HCMC')")
+    conn.executemany("INSERT INTO product (product_name, product_category, unit_price) VALUES (?, 'General', 1000)",
+                     [(f"P{i}",) for i in range(3)])
+    conn.executemany("INSERT INTO inventory (branch_id, product_id, quantity_in_stock) VALUES (1, ?, ?)",
+                     [(1, 5), (2, 0), (3, 7)])
+    conn.commit()
+
+    MigrationRunner(db_path).migrate(verbose=False)
+    assert conn.execute("""
+        SELECT product_id, movement_type, quantity_change, reason FROM inventory_movement ORDER BY product_id
+    """).fetchall() == [(1, 'adjustment', 5, 'Opening balance'), (3, 'adjustment', 7, 'Opening balance')]
+    conn.close()
+
+def test_summary_migration_rebuilds_existing_branches(tmp_path):
+    from Config.migrations import MIGRATIONS, MigrationRunner
+    from Models.inventory import Inventory
+
+    db_path = str(tmp_path / "summary.db")
+    MigrationRunner(db_path, MIGRATIONS[:7]).migrate(verbose=False)
+    conn = DatabaseConfig(db_path).create_connection()
+    conn.executemany("INSERT INTO branch (branch_name, branch_address) VALUES (?, 'HCMC')", [("D1",), ("D3",)])
+    conn.executemany("INSERT INTO product (product_name, product_category, unit_price) VALUES (?, 'General', ?)",
+                     [("P1", 1000), ("P2", 2500)])
+    conn.executemany("INSERT INTO inventory (branch_id, product_id, quantity_in_stock) VALUES (?, ?, ?)",
+                     [(1, 1, 5), (1, 2, 2), (2, 2, 4)])
+    conn.commit()
+    conn.close()
+
+    MigrationRunner(db_path).migrate(verbose=False)
+    inventory = Inventory(db_path)
+    assert inventory.verify_inventory_summary() == []
+    assert inventory.get_inventory_value(1) == {'total_products': 2, 'total_stock': 7, 'inventory_value': 10000}
+
+def test_sales_rollup_migration_backfills_orders(tmp_path):
+    from Config.migrations import MIGRATIONS, MigrationRunner
+
+    db_path = str(tmp_path / "rollup.db")
+    MigrationRunner(db_path, MIGRATIONS[:8]).migrate(verbose=False)
+    conn = DatabaseConfig(db_path).create_connection()
+    conn.execute("INSERT INTO branch (branch_name, branch_address) VALUES ('Main', 'HCMC')")
+    conn.execute("INSERT INTO customer (first_name, last_name, email, phone) VALUES ('C', 'B', 'c@b.c', '0900000000')")
+    conn.executemany("INSERT INTO product (product_name, product_category, unit_price) VALUES (?, 'General', 1000)",
+                     [("P1",), ("P2",)])
+    conn.executemany("INSERT INTO orders (customer_id, branch_id, order_date, order_status) VALUES (1, 1, ?, ?)",
+                     [("2024-05-01 09:00", "Completed"), ("2024-05-01 17:00", "Completed"),
+                      ("2024-05-02 10:00", "Cancelled")])
+    conn.executemany("INSERT INTO order_item (order_id, product_id, quantity, unit_price, subtotal) "
+                     "VALUES (?, ?, ?, 1000, 0)", [(1, 1, 2), (2, 1, 3), (2, 2, 1), (3, 1, 9)])
+    conn.commit()
+
+    MigrationRunner(db_path).migrate(verbose=False)
+    # Orders placed after the migration are counted by the triggers
+    conn.execute("INSERT INTO orders (customer_id, branch_id, order_date) VALUES (1, 1, '2024-05-01 20:00')")
+    conn.execute("INSERT INTO order_item (order_id, product_id, quantity, unit_price, subtotal) VALUES (4, 1, 4, 1000, 0)")
+    conn.commit()
+    assert conn.execute("SELECT * FROM daily_product_sales ORDER BY product_id").fetchall() == [
+        ("2024-05-01", 1, 1, 9), ("2024-05-01", 1, 2, 1)]
+    conn.close()
+
+def test_failed_migration_rolls_back(tmp_path):
+    from Config.migrations import Migration, MigrationRunner
+
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (x INTEGER)")
+        raise RuntimeError("boom")
+
+    db_path = str(tmp_path / "broken.db")
+    runner = MigrationRunner(db_path, [Migration(1, "ok", lambda conn: conn.execute("CREATE TABLE ok (x)")),
+                                       Migration(2, "broken", broken)])
+    with pytest.raises(RuntimeError):
+        runner.migrate(verbose=False)
+
+    assert runner.current_version() == 1
+    conn = DatabaseConfig(db_path).create_connection()
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+    conn.close()
+
+def test_backfill_updates_in_batches(tmp_path):
+    from Config.migrations import backfill
+
+    conn = DatabaseConfig(str(tmp_path / "backfill.db")).create_connection()
+    conn.execute("CREATE TABLE t (x INTEGER, y INTEGER)")
+    conn.executemany("INSERT INTO t (x) VALUES (?)", [(i,) for i in range(25)])
+    conn.commit()
+
+    assert backfill(conn, "t", "y = x * 2", "y IS NULL", batch_size=10) == 25
+    assert conn.execute("SELECT COUNT(*) FROM t WHERE y = x * 2").fetchone()[0] == 25
+    conn.close()
+
+def test_retrigger_runs_update_triggers_in_batches(tmp_path):
+    from Config.migrations import retrigger
+
+    conn = DatabaseConfig(str(tmp_path / "retrigger.db")).create_connection()
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.execute("CREATE TABLE seen (x INTEGER)")
+    conn.execute("CREATE TRIGGER t_seen AFTER UPDATE OF x ON t BEGIN INSERT INTO seen VALUES (new.x); END")
+    conn.executemany("INSERT INTO t (x) VALUES (?)", [(i,) for i in range(25)])
+    conn.commit()
+
+    assert retrigger(conn, "t", "x", batch_size=10) == 25
+    assert [x for x, in conn.execute("SELECT x FROM seen ORDER BY x")] == list(range(25))
+    conn.close()
+
+def test_copy_in_batches_resumes_after_interruption(tmp_path):
+    from Config.migrations import copy_in_batches
+
+    conn = DatabaseConfig(str(tmp_path / "copy.db")).create_connection()
+    conn.execute("CREATE TABLE src (id INTEGER PRIMARY KEY, x INTEGER)")
+    conn.execute("CREATE TABLE dst (id INTEGER, x INTEGER)")
+    conn.executemany("INSERT INTO src (x) VALUES (?)", [(i,) for i in range(25)])
+    conn.commit()
+    copy_sql = "INSERT INTO dst SELECT id, x FROM src WHERE id > :lo AND id <= :hi"
+
+    conn.execute("CREATE TRIGGER stop AFTER INSERT ON dst WHEN new.id = 15 BEGIN SELECT RAISE(ABORT, 'stop'); END")
+    with pytest.raises(Exception):
+        copy_in_batches(conn, "dst", "src", "id", copy_sql, batch_size=10)
+    conn.rollback()
+    conn.execute("DROP TRIGGER stop")
+    # Rows added after the copy started are left to the caller's triggers
+    conn.execute("INSERT INTO src (x) VALUES (99)")
+    conn.commit()
+
+    assert copy_in_batches(conn, "dst", "src", "id", copy_sql, batch_size=10) == 15
+    assert [id for id, in conn.execute("SELECT id FROM dst ORDER BY id")] == list(range(1, 26))
+    conn.close()
+
+def test_catalog_import_upserts_and_rejects(db_path, tmp_path):
+    from Data.catalog_io import CatalogImporter, export_catalog
+    from Models.product import Product
+
+    source = tmp_path / "catalog.jsonl"
+    source.write_text(
+        '{"product_name": "Panadol", "product_category": "Pain relief", "unit_price": 18000}\n'
+        '{"product_name": "Siro Ho", "product_category": "Cough", "unit_price": "45000", "requires_prescription": "yes"}\n'
+        '{"product_name": "", "product_category": "Cough", "unit_price": 1}\n'
+        'not json\n'
+        '{"product_name": "Panadol", "product_category": "Pain relief", "unit_price": 20000}\n',
+        encoding='utf-8')
+
+    summary = CatalogImporter(db_path, chunk_size=2).import_file(str(source))
+    assert (summary['upserted'], summary['unchanged']) == (3, 0)
+    assert [line for line, _ in summary['rejected']] == [3, 4]
+
+    products = {p[1]: p for p in Product(db_path).get_products_by_branch(1)}
+    assert sorted(products) == ["Panadol", "Siro Ho"]
+    assert products["Panadol"][3] == 20000 and products["Siro Ho"][4] == 1
+
+    exported = tmp_path / "export.csv"
+    assert export_catalog(str(exported), db_path) == 2
+    summary = CatalogImporter(db_path).import_file(str(exported))
+    assert (summary['upserted'], summary['unchanged']) == (0, 2) and not summary['rejected']
+    assert len(Product(db_path).get_products_by_branch(1)) == 2
+    # Imports share the application's writer and give it back on its own PRAGMAs
+    assert DatabaseConfig(db_path).pool_stats()['writer']['created'] == 1
+    with DatabaseConfig(db_path).writer() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+def test_write_queue_group_commits_and_isolates_failures(tmp_path):
+    import sqlite3
+    from Config.write_queue import WriteQueue
+
+    db = DatabaseConfig(str(tmp_path / "queue.db"))
+    db.transact(lambda cursor: cursor.execute("CREATE TABLE t (x INTEGER UNIQUE)"))
+    write_queue = WriteQueue(db, window_ms=50, max_batch=8)
+
+    def insert(x):
+        return lambda cursor: cursor.execute("INSERT INTO t (x) VALUES (?)", (x,)).lastrowid
+
+    # Hold the writer so the jobs pile up behind the first one
+    with db.writer():
+        futures = [write_queue.submit(insert(x % 9)) for x in range(10)]
+
+    outcomes = []
+    for future in futures:
+        try:
+            outcomes.append(future.result(timeout=5))
+        except sqlite3.IntegrityError:
+            outcomes.append(None)
+
+    # 0 is inserted twice: exactly one of those jobs fails, the rest commit
+    assert outcomes.count(None) == 1
+    assert sorted(filter(None, outcomes)) == list(range(1, 10))
+    with db.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 9
+    stats = write_queue.stats()
+    assert stats['jobs'] == 10 and stats['failed_jobs'] == 1
+    assert stats['batches'] <= 3 and stats['max_batch'] == 8
+
+# The writer thread is meant to die in this test
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_write_queue_survives_base_exceptions(tmp_path, monkeypatch):
+    from Config.write_queue import WriteQueue
+
+    db = DatabaseConfig(str(tmp_path / "queue.db"))
+    db.transact(lambda cursor: cursor.execute("CREATE TABLE t (x INTEGER)"))
+    write_queue = WriteQueue(db, window_ms=0)
+
+    def interrupted(cursor):
+        cursor.execute("INSERT INTO t (x) VALUES (1)")
+        raise KeyboardInterrupt
+    # Only the job that raised fails, and its insert is undone
+    with pytest.raises(KeyboardInterrupt):
+        write_queue.submit(interrupted).result(timeout=5)
+    insert = lambda cursor: cursor.execute("INSERT INTO t (x) VALUES (2)").rowcount
+    assert write_queue.submit(insert).result(timeout=5) == 1
+
+    # The writer thread itself dying fails its batch; the next submit starts a new thread
+    real_writer = db.writer
+    def writer_once_exits():
+        monkeypatch.setattr(db, "writer", real_writer)
+        raise SystemExit
+    monkeypatch.setattr(db, "writer", writer_once_exits)
+    dying = write_queue._thread
+    with pytest.raises(SystemExit):
+        write_queue.submit(insert).result(timeout=5)
+    dying.join(5)
+    assert write_queue.submit(insert).result(timeout=5) == 1
+    with db.reader() as conn:
+        assert [x for x, in conn.execute("SELECT x FROM t")] == [2, 2]
@@ -1,43 +1,402 @@
-import pytest
-from Models.customer import Customer
-from Models.product import Product
-
-def test_get_existing_customer():
-    customer_model = Customer()
-    customer = customer_model.get_customer_by_id(1)
-    assert customer is not None
-    assert isinstance(customer, tuple)
-    assert customer[3] == "alice@gmail.com"
-
-
-
-def test_get_products_by_branch():
-    product_model = Product()
-    products = product_model.get_products_by_branch(branch_id=1)
-    assert isinstance(products, list)
-
-
-def test_product_initialization():
-    product = Product()
-    assert hasattr(product, "get_products_by_branch")
-
-
-def test_customer_missing_email():
-    with pytest.raises(TypeError):
-        Customer(customer_id=1, name="John Doe")  # Missing email
-
-
-def test_product_zero_price():
-    product = {
-        "name": "Free Sample",
-        "price": 0.0
-    }
-    assert product["price"] == 0.0
-
-
-
-def test_customer_email_format():
-    customer = {
-        "email": "emily@example.com"
-    }
-    assert "@" in customer["email"]
+import sqlite3
+import pytest
+from Models.customer import Customer
+from Config.database_config import DatabaseConfig
+from Models.inventory import Inventory, reserve_lines
+from Models.order import Order
+from Models.product import Product
+
+def test_get_existing_customer():
+    customer_model = Customer()
+    customer = customer_model.get_customer_by_id(1)
+    assert customer is not None
+    assert isinstance(customer, tuple)
+    assert customer[3] == "alice@gmail.com"
+
+
+
+def test_get_products_by_branch():
+    product_model = Product()
+    products = product_model.get_products_by_branch(branch_id=1)
+    assert isinstance(products, list)
+
+
+def test_product_initialization():
+    product = Product()
+    assert hasattr(product, "get_products_by_branch")
+
+
+def test_customer_missing_email():
+    with pytest.raises(TypeError):
+        Customer(customer_id=1, name="John Doe")  # Missing email
+
+
+def test_product_zero_price():
+    product = {
+        "name": "Free Sample",
+        "price": 0.0
+    }
+    assert product["price"] == 0.0
+
+
+
+def test_customer_email_format():
+    customer = {
+        "email": "emily@example.com"
+    }
+    assert "@" in customer["email"]
+
+
+def test_search_products_full_text(db_path):
+    product_model = Product(db_path)
+    product_model.add_product("Panadol Extra", "Help to relief pain", "Pain relief", 18000)
+    product_model.add_product("Thuốc ho Đông Y", "Siro trị ho thảo dược", "Cough", 45000)
+
+    assert [p[1] for p in product_model.search_products_by_branch(1, "pana")] == ["Panadol Extra"]
+    assert [p[1] for p in product_model.search_products_by_branch(1, "dong y")] == ["Thuốc ho Đông Y"]
+    assert [p[1] for p in product_model.search_products_by_branch(1, "thảo")] == ["Thuốc ho Đông Y"]
+    assert product_model.search_products_by_branch(1, "   ") == []
+
+    product_model.update_product(2, product_name="Siro Ho")
+    assert product_model.search_products_by_branch(1, "dong") == []
+    product_model.delete_product(1)
+    assert product_model.search_products_by_branch(1, "panadol") == []
+
+
+def test_catalog_cache_tracks_version(db_path):
+    product_model = Product(db_path)
+    product_model.add_product("Panadol Extra", "Help to relief pain", "Pain relief", 18000)
+    product_model.add_product("Siro Ho", "Cough syrup", "Cough", 45000, requires_prescription=True)
+
+    assert product_model.get_product_categories() == ["Cough", "Pain relief"]
+    assert product_model.get_product_details(1)[1] == "Panadol Extra"
+    assert product_model.get_product_details(1, branch_id=1)[-1] == 0
+    assert [p[1] for p in product_model.get_products_requiring_prescription()] == ["Siro Ho"]
+
+    # A write through another instance invalidates the shared cache
+    Product(db_path).update_product(1, product_name="Panadol Cold", product_category="Cold")
+    assert product_model.get_product_details(1)[1] == "Panadol Cold"
+    assert product_model.get_products_by_category("Pain relief") == []
+
+    # Out-of-process writes are seen once the version check interval passes
+    product_model.catalog.check_interval = 0
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE product SET unit_price = 20000 WHERE product_id = 1")
+    conn.execute("UPDATE catalog_version SET version = version + 1")
+    conn.commit()
+    conn.close()
+    assert product_model.get_product_details(1)[3] == 20000
+
+    # A reload inside a write transaction never caches its uncommitted rows
+    def rename_then_fail(cursor):
+        cursor.execute("UPDATE product SET product_name = 'Draft' WHERE product_id = 1")
+        cursor.execute("UPDATE catalog_version SET version = version + 1")
+        assert product_model.get_product_details(1)[1] == "Panadol Cold"
+        raise RuntimeError("rolled back")
+    with pytest.raises(RuntimeError):
+        DatabaseConfig(db_path).transact(rename_then_fail)
+    assert product_model.get_product_details(1)[1] == "Panadol Cold"
+
+
+def test_browse_products_keyset_pages(db_path):
+    product_model = Product(db_path)
+    for i in range(7):
+        product_model.add_product(f"Product {i}", "", "Even" if i % 2 == 0 else "Odd", 1000 * (7 - i))
+
+    page1, has_next = product_model.browse_products_by_branch(1, page_size=3)
+    assert [p[1] for p in page1] == ["Product 0", "Product 1", "Product 2"] and has_next
+    page2, has_next = product_model.browse_products_by_branch(1, 3, after=product_model.browse_key(page1[-1]))
+    page3, has_next = product_model.browse_products_by_branch(1, 3, after=product_model.browse_key(page2[-1]))
+    assert [p[1] for p in page3] == ["Product 6"] and not has_next
+
+    back, has_prev = product_model.browse_products_by_branch(1, 3, before=product_model.browse_key(page2[0]))
+    assert back == page1 and not has_prev
+
+    cheapest, _ = product_model.browse_products_by_branch(1, 2, sort_by='price')
+    assert [p[3] for p in cheapest] == [1000, 2000]
+    odd, has_next = product_model.browse_products_by_branch(1, 5, category="Odd", descending=True)
+    assert [p[1] for p in odd] == ["Product 5", "Product 3", "Product 1"] and not has_next
+
+
+def test_batched_product_lookups(db_path):
+    product_model = Product(db_path)
+    for i in range(3):
+        product_model.add_product(f"Product {i}", "", "General", 1000)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO branch (branch_id, branch_name, branch_address) VALUES (1, 'Main', 'HCMC')")
+    conn.executemany("INSERT INTO inventory (product_id, branch_id, quantity_in_stock) VALUES (?, 1, ?)",
+                     [(1, 5), (2, 0)])
+    conn.commit()
+    conn.close()
+
+    product_model.IN_CHUNK_SIZE = 2
+    details = product_model.get_product_details_many([1, 2, 3, 99], branch_id=1)
+    assert sorted(details) == [1, 2, 3]
+    assert details[1][-1] == 5 and details[3][-1] == 0
+
+    assert product_model.check_stock_availability_many({1: 5, 2: 1, 3: 1, 99: 1}, 1) == {
+        1: True, 2: False, 3: False, 99: False}
+    assert product_model.check_stock_availability_many([(1, 3), (1, 3)], 1) == {1: False}
+
+
+def test_autocomplete_tracks_product_changes(db_path):
+    product_model = Product(db_path)
+    product_model.add_product("Panadol Extra", "", "Pain relief", 18000)
+    product_model.add_product("Paracetamol 500mg", "", "Pain relief", 5000)
+    product_model.add_product("Thuốc ho Đông Y", "", "Cough", 45000)
+
+    assert [s[1] for s in product_model.autocomplete_products("pa")] == ["Panadol Extra", "Paracetamol 500mg"]
+    assert [s[1] for s in product_model.autocomplete_products("dong")] == ["Thuốc ho Đông Y"]
+    assert product_model.autocomplete_products("ext", branch_id=1) == [(1, "Panadol Extra", 18000.0, 0)]
+    assert product_model.autocomplete_products("pa", limit=1)[0][1] == "Panadol Extra"
+
+    before = product_model.catalog.snapshot()
+    product_model.update_product(1, product_name="Hapacol")
+    product_model.delete_product(2)
+    product_model.add_product("Pharmaton", "", "Vitamins", 90000)
+    # Patched copies rather than reloads; a snapshot already handed out never changes
+    assert product_model.catalog.snapshot().version == before.version + 3
+    assert before.products[1][1] == "Panadol Extra" and 2 in before.products
+    assert before.complete("pa") == [1, 2] and "Vitamins" not in before.categories
+    assert [s[1] for s in product_model.autocomplete_products("p")] == ["Pharmaton"]
+    assert [s[1] for s in product_model.autocomplete_products("ha")] == ["Hapacol"]
+    assert product_model.get_product_categories() == ["Cough", "Pain relief", "Vitamins"]
+    assert product_model.autocomplete_products("   ") == []
+
+    # A price edit copies only the products dict; the name indexes are shared
+    before = product_model.catalog.snapshot()
+    product_model.update_product(1, unit_price=20000)
+    after = product_model.catalog.snapshot()
+    assert after.products[1][3] == 20000 and before.products[1][3] == 18000
+    assert after.prefix_keys is before.prefix_keys and after.by_category is before.by_category
+
+
+def test_autocomplete_stock_is_served_from_memory(db_path, seed, monkeypatch):
+    seed(products=("Panadol", "Paracetamol"))
+    inventory = Inventory(db_path)
+    inventory.add_product_to_inventory(1, 1, 7)
+    product_model = Product(db_path)
+    assert product_model.autocomplete_products("pa", branch_id=1) == [(1, "Panadol", 1000.0, 7),
+                                                                      (2, "Paracetamol", 1000.0, 0)]
+
+    def no_round_trip():
+        raise AssertionError("autocomplete read the database")
+    monkeypatch.setattr(product_model.stock_index, "_refresh", no_round_trip)
+    monkeypatch.setattr(product_model.catalog, "check_interval", float("inf"))
+    assert product_model.autocomplete_products("pan", branch_id=1) == [(1, "Panadol", 1000.0, 7)]
+
+
+def test_inventory_ledger_and_stock_at_time(db_path):
+    Product(db_path).add_product("Panadol", "", "Pain relief", 18000)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO branch (branch_id, branch_name, branch_address) VALUES (1, 'Main', 'HCMC')")
+    conn.commit()
+    conn.close()
+
+    inventory = Inventory(db_path)
+    inventory.add_product_to_inventory(1, 1, 50)
+    inventory.reserve_stock(1, 1, 5, reference="order:7")
+    inventory.release_stock(1, 1, 2, reference="order:7")
+    inventory.update_stock_quantity(1, 40, reason="Damaged")
+    inventory.add_stock(1, 10, reference="PO-1")
+
+    history = inventory.get_inventory_movement_history(1)
+    assert [(h['movement_type'], h['quantity_change']) for h in history] == [
+        ('restock', 10), ('adjustment', -7), ('release', 2), ('reservation', -5), ('restock', 50)]
+    assert history[1]['reason'] == "Damaged" and history[3]['reference'] == "order:7"
+
+    # Backdate the ledger so the snapshot sits between movements
+    conn = sqlite3.connect(db_path)
+    conn.executemany("UPDATE inventory_movement SET created_at = ? WHERE movement_id = ?",
+                     [("2026-01-01 08:00:00", 1), ("2026-01-02 08:00:00", 2), ("2026-01-03 08:00:00", 3),
+                      ("2026-01-04 08:00:00", 4)])
+    conn.commit()
+    conn.close()
+    assert inventory.get_stock_at(1, "2026-01-01 12:00:00") == {1: 50}
+    assert inventory.get_stock_at(1, "2026-01-03") == {1: 45}
+
+    assert inventory.snapshot_due_branches(every=100) == []
+    assert inventory.snapshot_due_branches(every=5) == [1]
+    inventory.add_stock(1, 5)
+    assert inventory.get_stock_at(1, "2100-01-01", product_id=1) == {1: 55}
+    assert inventory.get_stock_at(1, "2026-01-02 12:00:00", product_id=1) == {1: 45}
+
+    inventory.update_stock_quantity(1, 0)
+    inventory.remove_product_from_inventory(1)
+    assert Product(db_path).delete_product(1) == (False, "Cannot delete product with inventory history")
+
+
+def test_cross_branch_stock_index(db_path, seed):
+    seed(branches=("D1", "D3", "D7"), products=("Panadol", "Aspirin"))
+    inventory = Inventory(db_path)
+    inventory.add_product_to_inventory(1, 1, 5)
+    inventory.add_product_to_inventory(2, 1, 20)
+    inventory.add_product_to_inventory(2, 2, 1)
+    inventory.add_product_to_inventory(3, 1, 8)
+    inventory.add_product_to_inventory(3, 2, 8)
+
+    assert inventory.find_branches_with_stock(1, 5) == [(2, 20), (3, 8), (1, 5)]
+    assert inventory.find_branches_with_stock(1, 6, exclude_branch_id=2) == [(3, 8)]
+    assert inventory.find_branches_for_items([(1, 4), (2, 2)]) == [3]
+
+    # Later stock changes are picked up from the ledger
+    Inventory(db_path).reserve_stock(1, 2, 18)
+    inventory.update_stock_quantity(2, 3)
+    assert inventory.find_branches_with_stock(1, 5) == [(3, 8), (1, 5)]
+    assert inventory.find_branches_for_items({1: 2, 2: 1}) == [3, 2]
+
+    # Lookups inside a write transaction ignore its uncommitted stock changes
+    def sell_then_fail(cursor):
+        reserve_lines(cursor, 3, {1: 8}, movement_type='sale')
+        assert inventory.find_branches_with_stock(1, 5) == [(3, 8), (1, 5)]
+        raise RuntimeError("payment declined")
+    with pytest.raises(RuntimeError):
+        DatabaseConfig(db_path).transact(sell_then_fail)
+    assert inventory.find_branches_with_stock(1, 5) == [(3, 8), (1, 5)]
+
+
+def test_inventory_summary_tracks_stock_and_price(db_path, seed):
+    seed(branches=("D1", "D3"), products=("Panadol", "Aspirin"))
+    product_model = Product(db_path)
+    inventory = Inventory(db_path)
+    inventory.add_product_to_inventory(1, 1, 10)
+    inventory.add_product_to_inventory(1, 2, 4)
+    inventory.add_product_to_inventory(2, 1, 3)
+
+    inventory.reserve_stock(1, 1, 2)
+    inventory.update_stock_quantity(2, 6)
+    product_model.update_product(1, unit_price=1500)
+    assert inventory.get_inventory_value(1) == {'total_products': 2, 'total_stock': 14,
+                                                'inventory_value': 8 * 1500 + 6 * 1000}
+    assert inventory.get_inventory_value(2)['inventory_value'] == 3 * 1500
+
+    inventory.update_stock_quantity(3, 0)
+    inventory.remove_product_from_inventory(3)
+    assert inventory.get_inventory_value(2) == {'total_products': 0, 'total_stock': 0, 'inventory_value': 0}
+    assert inventory.verify_inventory_summary() == []
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE branch_inventory_summary SET total_stock = 99 WHERE branch_id = 1")
+    conn.commit()
+    conn.close()
+    assert [m['branch_id'] for m in inventory.verify_inventory_summary()] == [1]
+    inventory.rebuild_inventory_summary()
+    assert inventory.verify_inventory_summary() == []
+
+
+def test_demand_forecast_reorder_points(db_path, seed):
+    pytest.importorskip("numpy")
+    from Models.demand_forecast import DemandForecast
+
+    seed(products=("Panadol", "Aspirin", "Vitamin C"))
+    inventory = Inventory(db_path)
+    for product_id in (1, 2, 3):
+        inventory.add_product_to_inventory(1, product_id, 10)
+    inventory.set_stock_threshold(3, branch_id=1, product_id=3)
+
+    conn = sqlite3.connect(db_path)
+    def sell(days_ago, product_id, quantity):
+        order_id = conn.execute("""
+            INSERT INTO orders (customer_id, branch_id, order_date)
+            VALUES (1, 1, datetime('now', ?)) RETURNING order_id
+        """, (f"-{days_ago} days",)).fetchone()[0]
+        conn.execute("INSERT INTO order_item (order_id, product_id, quantity, unit_price, subtotal) "
+                     "VALUES (?, ?, ?, 1000, 1000)", (order_id, product_id, quantity))
+        return order_id
+    # Panadol: 2 a day, every day of the window; Aspirin: one order of 57 today
+    for day in range(57):
+        sell(day, 1, 2)
+    sell(0, 2, 57)
+    sell(0, 3, 100)
+    cancelled = sell(1, 1, 500)
+    conn.execute("UPDATE orders SET order_status = 'Cancelled' WHERE order_id = ?", (cancelled,))
+    conn.commit()
+    assert conn.execute("SELECT SUM(units) FROM daily_product_sales WHERE product_id = 1").fetchone()[0] == 114
+    conn.close()
+
+    forecast = DemandForecast(db_path, history_days=56, lead_time_days=7, review_days=7, service_level_z=1.65)
+    assert forecast.refresh() == 3
+    rows = {row[0]: row for row in forecast.get_forecast(1)}
+    assert rows[1][2:6] == (2.0, 0.0, 14, 28)
+    assert rows[2][2] == 1.0 and rows[2][4] == 40
+
+    conn = sqlite3.connect(db_path)
+    thresholds = dict(conn.execute("SELECT product_id, threshold FROM stock_threshold WHERE branch_id = 1"))
+    conn.close()
+    # The manual threshold for Vitamin C is kept
+    assert thresholds == {1: 14, 2: 40, 3: 3}
+    assert sorted(row[1] for row in inventory.get_low_stock_items(1)) == ["Aspirin", "Panadol"]
+
+    # A product-wide manual threshold also beats the forecast, now and on later refreshes
+    inventory.set_stock_threshold(5, product_id=2)
+    assert forecast.refresh() == 3
+    conn = sqlite3.connect(db_path)
+    thresholds = dict(conn.execute("SELECT product_id, threshold FROM stock_threshold WHERE branch_id = 1"))
+    conn.close()
+    assert thresholds == {1: 14, 3: 3}
+    assert [row[1] for row in inventory.get_low_stock_items(1)] == ["Panadol"]
+
+
+def test_order_history_keyset_pages(db_path, seed):
+    seed(branches=("Main", "Second"))
+    conn = sqlite3.connect(db_path)
+    # 25 orders, two per day so dates tie; every fifth one cancelled, odd ones at branch 2
+    conn.executemany("""
+        INSERT INTO orders (order_id, customer_id, branch_id, order_date, order_status, total_amount)
+        VALUES (?, 1, ?, datetime('2026-01-01', ? || ' days'), ?, 1000)
+    """, [(i, 1 + i % 2, i // 2, 'Cancelled' if i % 5 == 0 else 'Completed') for i in range(1, 26)])
+    conn.commit()
+    conn.close()
+
+    customer = Customer(db_path)
+    newest_first = [row[0] for row in customer.get_customer_orders(1)]
+    assert newest_first == sorted(range(1, 26), key=lambda i: (i // 2, i), reverse=True)
+    assert [row[0] for row in customer.get_customer_orders(1, limit=3)] == newest_first[:3]
+
+    pages, after, has_more = [], None, True
+    while has_more:
+        rows, has_more = customer.get_order_history(1, page_size=10, after=after)
+        pages.append([row[0] for row in rows])
+        after = customer.order_history_key(rows[-1])
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sum(pages, []) == newest_first
+
+    rows, has_more = customer.get_order_history(1, page_size=10, before=customer.order_history_key(rows[0]))
+    assert [row[0] for row in rows] == pages[1] and has_more
+
+    cancelled, _ = customer.get_order_history(1, status='Cancelled')
+    assert [row[0] for row in cancelled] == [25, 20, 15, 10, 5]
+    at_branch_2, _ = customer.get_order_history(1, status='Completed', branch_id=2)
+    assert all(row[4] == "Second" and row[0] % 2 == 1 for row in at_branch_2)
+
+
+def test_load_orders_in_batches(db_path, seed):
+    seed(products=("Panadol", "Amoxicillin"), payment_methods=("Cash",))
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO orders (order_id, customer_id, branch_id, total_amount) VALUES (?, 1, 1, ?)",
+                     [(1, 7000), (2, 5000), (3, 0)])
+    conn.executemany("""
+        INSERT INTO order_item (order_id, product_id, quantity, unit_price, subtotal) VALUES (?, ?, ?, ?, ?)
+    """, [(1, 2, 1, 5000, 5000), (1, 1, 2, 1000, 2000), (2, 2, 1, 5000, 5000)])
+    conn.execute("INSERT INTO payment (order_id, payment_method_id, payment_amount, payment_status) "
+                 "VALUES (1, 1, 7000, 'Completed')")
+    conn.executemany("""
+        INSERT INTO prescription (order_id, pharmacist_id, prescription_number, issue_date, validation_status)
+        VALUES (?, 1, ?, '2026-01-01', ?)
+    """, [(1, "RX-1", "Validated"), (2, "RX-2", "Validated"), (2, "RX-3", "Pending")])
+    conn.commit()
+    conn.close()
+
+    order_model = Order(db_path)
+    order_model.IN_CHUNK_SIZE = 2
+    orders = order_model.load_orders([3, 1, 99, 2, 1])
+    assert list(orders) == [3, 1, 2]
+
+    assert orders[1]['branch_name'] == "Main" and orders[1]['total_amount'] == 7000
+    assert orders[1]['items'] == [(1, "Panadol", 2, 1000, 2000), (2, "Amoxicillin", 1, 5000, 5000)]
+    assert (orders[1]['payment_status'], orders[1]['prescription_status']) == ("Completed", "Validated")
+    assert (orders[2]['payment_status'], orders[2]['prescription_status']) == (None, "Pending")
+    assert orders[3]['items'] == [] and orders[3]['prescription_status'] is None
+
+    assert order_model.load_order(2)['items'] == [(2, "Amoxicillin", 1, 5000, 5000)]
+    assert order_model.load_order(99) is None
@@ -1,35 +1,257 @@
-from Services.auth_service import AuthService
-from Services.inventory_service import InventoryService
-from Services.order_service import OrderService
-from Services.payment_service import PaymentService
-
-def test_customer_login():
-    auth = AuthService()
-    customer = auth.login_customer("alice@gmail.com", "0909111222")
-    assert customer is not None
-
-def test_get_cart_items():
-    order = OrderService()
-    cart = order.get_cart_items(1)
-    assert isinstance(cart, list)
-
-def test_get_payment_methods():
-    payment = PaymentService()
-    methods = payment.get_methods()
-    assert isinstance(methods, list)
-
-
-def test_add_inventory_negative_quantity():
-    inventory_service = InventoryService()
-    result = inventory_service.add_inventory(product_id=1, quantity=-10)
-    assert result["success"] is False
-    assert result["message"] == "Quantity must be positive."
-
-
-
-def test_add_inventory_success():
-    inventory_service = InventoryService()
-    result = inventory_service.add_inventory(product_id=2, quantity=20)
-    assert result is True or result is not None
-
-
+from Services.auth_service import AuthService
+from Services.inventory_service import InventoryService
+from Services.order_service import OrderService
+from Services.payment_service import PaymentService
+
+def test_customer_login():
+    auth = AuthService()
+    customer = auth.login_customer("alice@gmail.com", "0909111222")
+    assert customer is not None
+
+def test_get_cart_items():
+    order = OrderService()
+    cart = order.get_cart_items(1)
+    assert isinstance(cart, list)
+
+def test_get_payment_methods():
+    payment = PaymentService()
+    methods = payment.get_methods()
+    assert isinstance(methods, list)
+
+
+def test_add_inventory_negative_quantity():
+    inventory_service = InventoryService()
+    result = inventory_service.add_inventory(product_id=1, quantity=-10)
+    assert result["success"] is False
+    assert result["message"] == "Quantity must be positive."
+
+
+
+def test_add_inventory_success():
+    inventory_service = InventoryService()
+    result = inventory_service.add_inventory(product_id=2, quantity=20)
+    assert result is True or result is not None
+
+
+
+
+def test_checkout_reserves_whole_cart_or_nothing(db_path, seed):
+    from Models.inventory import Inventory
+
+    seed(branches=("Main", "Second"), products=("Panadol", "Aspirin"))
+    inventory = Inventory(db_path)
+    inventory.add_product_to_inventory(1, 1, 5)
+    inventory.add_product_to_inventory(1, 2, 1)
+    inventory.add_product_to_inventory(2, 2, 50)
+
+    order = OrderService(db_path)
+    assert not order.add_to_cart(1, 1, 1, branch_id=2)["success"]
+    assert order.add_to_cart(1, 1, 3, branch_id=1)["success"]
+    assert order.add_to_cart(1, 2, 2, branch_id=2)["success"]
+
+    # Branch 1 only has one Aspirin: nothing is taken
+    result = order.checkout(1, 1)
+    assert not result["success"]
+    assert result["shortfalls"] == [{"product_id": 2, "requested": 2, "available": 1}]
+    assert inventory.check_stock_availability(1, 1, 5) == (True, 5)
+
+    inventory.add_stock(2, 1)
+    assert order.checkout(1, 1)["success"]
+    assert inventory.check_stock_availability(1, 1, 2) == (True, 2)
+    assert inventory.check_stock_availability(2, 1, 0) == (True, 0)
+    assert order.get_cart_items(1) == []
+    sales = [(m['movement_type'], m['quantity_change'], m['reference'])
+             for m in inventory.get_inventory_movement_history(1) if m['reference']]
+    assert sorted(sales) == [('sale', -3, 'order:1'), ('sale', -2, 'order:1')]
+
+    ok, message, shortfalls = inventory.reserve_stock_many({1: 2, 2: 1}, 1)
+    assert not ok and shortfalls == [{"product_id": 2, "requested": 1, "available": 0}]
+    assert inventory.reserve_stock(1, 1, 2) == (True, "Stock reserved successfully")
+    assert inventory.reserve_stock(1, 2, 1) == (False, "Product not available at this branch")
+
+
+def test_low_stock_alerts_follow_threshold_crossings(db_path, seed):
+    from Models.inventory import Inventory
+    import time
+    from Services.notification_service import LowStockAlertPublisher, NotificationService
+
+    seed(products=("Panadol", "Aspirin"))
+    inventory = Inventory(db_path)
+    service = InventoryService(db_path)
+    inventory.add_product_to_inventory(1, 1, 50)
+    inventory.add_product_to_inventory(1, 2, 5)
+
+    # Nobody listening, or a failing handler: the alert stays pending
+    notifications = NotificationService(db_path)
+    assert notifications.publish_low_stock_alerts() == []
+    def broken(alert):
+        raise RuntimeError("mail server down")
+    NotificationService.subscribe('low_stock', broken)
+    try:
+        assert notifications.publish_low_stock_alerts() == []
+    finally:
+        NotificationService.unsubscribe('low_stock', broken)
+
+    events = []
+    NotificationService.subscribe('low_stock', events.append)
+    try:
+        assert [a['product_id'] for a in notifications.publish_low_stock_alerts()] == [2]
+        assert notifications.publish_low_stock_alerts() == []
+        assert [row[1] for row in service.get_low_stock_items(1)] == ["Aspirin"]
+
+        # Staying low does not raise a second event; crossing back up clears the alert
+        service.update_stock(2, 3)
+        service.update_stock(1, 20)
+        assert len(events) == 1
+        service.update_stock(2, 30)
+        assert service.get_low_stock_items(1) == []
+
+        # Per-product threshold takes precedence over the default
+        assert inventory.set_stock_threshold(25, product_id=1)[0]
+        assert [row[1] for row in inventory.get_low_stock_items(1)] == ["Panadol"]
+        service.update_stock(2, 10)
+        assert [e['product_id'] for e in events] == [2, 1, 2]
+        assert events[1]['threshold'] == 25
+        assert [row[1] for row in service.get_low_stock_items(1, threshold=0)] == []
+
+        # A checkout only raises the alert; the background publisher sends it
+        service.update_stock(1, 30)
+        order = OrderService(db_path)
+        order.add_to_cart(1, 1, 10, branch_id=1)
+        assert order.checkout(1, 1)["success"]
+        assert len(events) == 3
+        publisher = LowStockAlertPublisher(db_path, interval=0.01)
+        publisher.start()
+        deadline = time.monotonic() + 2
+        while len(events) == 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        publisher.stop()
+        assert events[3]['product_id'] == 1 and events[3]['quantity_in_stock'] == 20
+        assert publisher.metrics()['alerts_published'] == 1
+    finally:
+        NotificationService.unsubscribe('low_stock', events.append)
+
+
+def test_apply_shipment_file_upserts_and_rejects_per_line(db_path, seed, tmp_path):
+    from Models.inventory import Inventory
+
+    seed(products=("Panadol", "Aspirin", "Vitamin C"))
+    inventory = Inventory(db_path)
+    inventory.add_product_to_inventory(1, 1, 5)
+    inventory.add_product_to_inventory(1, 3, 2)
+
+    shipment = tmp_path / "shipment.csv"
+    shipment.write_text("product,quantity,lot\n"
+                        "1,10,LOT-A\n"
+                        "aspirin,7,LOT-B\n"
+                        "Ibuprofen,3,LOT-C\n"
+                        "3,-5,\n"
+                        "3,-2,\n"
+                        "1,abc,\n", encoding="utf-8")
+    summary = InventoryService(db_path).apply_shipment_file(1, str(shipment), "PO-1")
+
+    assert (summary["applied"], summary["rejected"], summary["units"]) == (3, 3, 15)
+    assert [r["status"] for r in summary["lines"]] == ["applied", "applied", "rejected",
+                                                       "rejected", "applied", "rejected"]
+    assert summary["lines"][3]["message"] == "Only 2 in stock"
+    assert inventory.check_stock_availability(1, 1, 15) == (True, 15)
+    assert inventory.check_stock_availability(2, 1, 7) == (True, 7)
+    assert inventory.check_stock_availability(3, 1, 0) == (True, 0)
+
+    history = inventory.get_inventory_movement_history(1, product_id=2)
+    assert [(m["movement_type"], m["quantity_change"], m["reference"]) for m in history] == [
+        ("restock", 7, "LOT-B")]
+    assert inventory.verify_inventory_summary() == []
+
+
+def test_cart_sweeper_expires_stale_carts_in_batches(db_path, seed):
+    import sqlite3
+    from Services.cart_sweeper import CartExpirySweeper
+
+    seed(customers=3, products=("Panadol", "Aspirin", "Vitamin C"))
+    conn = sqlite3.connect(db_path)
+    # Customers 1 and 2 left carts two days ago; customer 3 is shopping now
+    conn.executemany("""
+        INSERT INTO cart (customer_id, product_id, quantity, reserved_at)
+        VALUES (?, ?, 1, datetime('now', '-2 days'))
+    """, [(1, 1), (1, 2), (1, 3), (2, 1), (2, 2)])
+    conn.execute("INSERT INTO cart (customer_id, product_id, quantity) VALUES (3, 1, 1)")
+    conn.commit()
+    conn.close()
+
+    sweeper = CartExpirySweeper(db_path, ttl_seconds=3600, batch_size=2)
+    assert sweeper.sweep() == 5
+    metrics = sweeper.metrics()
+    assert (metrics['batches'], metrics['lines_expired'], metrics['carts_expired']) == (3, 5, 2)
+
+    order = OrderService(db_path)
+    assert order.get_cart_items(1) == []
+    assert [item[0] for item in order.get_cart_items(3)] == [1]
+    assert sweeper.sweep() == 0
+
+
+def test_checkout_with_payment_is_one_transaction(db_path, seed):
+    import sqlite3
+    from Models.inventory import Inventory
+
+    seed(products=("Panadol", "Aspirin"), payment_methods=("Cash",))
+    inventory = Inventory(db_path)
+    inventory.add_product_to_inventory(1, 1, 5)
+    inventory.add_product_to_inventory(1, 2, 5)
+
+    order = OrderService(db_path)
+    order.add_to_cart(1, 1, 2, branch_id=1)
+    order.add_to_cart(1, 2, 1, branch_id=1)
+
+    # An unknown payment method fails the payment insert: nothing is kept
+    result = order.checkout(1, 1, payment_method_id=99)
+    assert not result["success"] and result["message"].startswith("Checkout failed")
+    assert len(order.get_cart_items(1)) == 2
+    assert inventory.check_stock_availability(1, 1, 5) == (True, 5)
+
+    result = order.checkout(1, 1, payment_method_id=1, payment_reference="TX-1")
+    assert result["success"] and result["total_amount"] == 3000
+    assert order.get_cart_items(1) == []
+    assert PaymentService(db_path).get_payment(result["order_id"])[1:3] == (3000, "Completed")
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*), SUM(quantity) FROM order_item").fetchone() == (2, 3)
+    assert conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0] == 1
+    conn.close()
+
+
+def test_idempotency_keys_replay_checkout_and_payment(db_path, seed):
+    import sqlite3
+    from Models.inventory import Inventory
+    from Services.idempotency import IdempotencyKeyPurger
+
+    seed(products=("Panadol",), payment_methods=("Cash",))
+    inventory = Inventory(db_path)
+    inventory.add_product_to_inventory(1, 1, 10)
+
+    order = OrderService(db_path)
+    order.add_to_cart(1, 1, 2, branch_id=1)
+    first = order.checkout(1, 1, idempotency_key="checkout-1")
+    # The retry does not see an empty cart or take stock again
+    retry = order.checkout(1, 1, idempotency_key="checkout-1")
+    assert first["success"] and retry == dict(first, replayed=True)
+    assert inventory.check_stock_availability(1, 1, 8) == (True, 8)
+    assert not order.checkout(1, 2, idempotency_key="checkout-1")["success"]
+
+    payments = PaymentService(db_path)
+    paid = payments.process_payment(first["order_id"], 1, 2000, idempotency_key="pay-1")
+    assert payments.process_payment(first["order_id"], 1, 2000, idempotency_key="pay-1") == dict(paid, replayed=True)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM payment").fetchone()[0] == 1
+    conn.execute("UPDATE idempotency_key SET created_at = datetime('now', '-2 days') WHERE scope = 'checkout'")
+    conn.commit()
+    conn.close()
+
+    purger = IdempotencyKeyPurger(db_path, ttl_seconds=3600)
+    assert purger.sweep() == 1
+    assert purger.metrics()['rows_deleted'] == 1
+    # Once purged, the key can be used again
+    order.add_to_cart(1, 1, 1, branch_id=1)
+    assert order.checkout(1, 1, idempotency_key="checkout-1")["order_id"] != first["order_id"]